@@ -0,0 +1,1332 @@
+"""Benchmarks for the AI Resume Scanner
+
+Usage:
+    python benchmark.py importtime
+    python benchmark.py all --json bench_results.json
+
+Each benchmark prints a short report and returns a dict of results; with
+--json the results of every benchmark that ran are written to one file.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Vocabulary for synthetic resumes and job descriptions
+SKILL_WORDS = [
+    'python', 'java', 'javascript', 'sql', 'django', 'flask', 'react', 'angular',
+    'mysql', 'postgresql', 'mongodb', 'redis', 'docker', 'kubernetes', 'aws',
+    'azure', 'git', 'jenkins', 'linux', 'tensorflow', 'pytorch', 'leadership',
+    'communication', 'teamwork', 'analytical'
+]
+FILLER_WORDS = [
+    'designed', 'built', 'led', 'delivered', 'maintained', 'scalable', 'services',
+    'platform', 'customers', 'pipelines', 'data', 'team', 'project', 'reduced',
+    'latency', 'improved', 'reliability', 'features', 'product', 'engineers',
+    'migrated', 'automated', 'testing', 'deployment', 'monitoring', 'analytics',
+    'reporting', 'stakeholders', 'requirements', 'architecture', 'systems'
+]
+
+# Allowed growth of peak traced memory per resume (kB) in each stage of the
+# memory benchmark; --memory-budget-kb replaces all of them
+MEMORY_BUDGET_KB = {
+    'extract': 16,
+    'dedupe': 12,
+    'rank': 8,
+    'scan': 32,
+}
+
+
+def synthetic_resume(rng, words=400):
+    """Build a resume-like text with a header, contact lines and sections"""
+    first = rng.choice(['Alex', 'Sam', 'Jordan', 'Taylor', 'Casey', 'Morgan'])
+    last = rng.choice(['Smith', 'Lee', 'Garcia', 'Patel', 'Kim', 'Nguyen'])
+    skills = rng.sample(SKILL_WORDS, 8)
+    body = ' '.join(
+        rng.choice(FILLER_WORDS if rng.random() < 0.8 else SKILL_WORDS)
+        for _ in range(words)
+    )
+    return (
+        f"{first} {last}\n"
+        f"{first.lower()}.{last.lower()}@example.com | +1 (555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}\n"
+        f"linkedin.com/in/{first.lower()}{last.lower()}\n\n"
+        f"Summary\nSoftware engineer with experience in {', '.join(skills[:3])}.\n\n"
+        f"Experience\n{body}\n\n"
+        f"Skills\n{', '.join(skills)}\n\n"
+        f"Education\nB.Sc. Computer Science, State University\n\n"
+        f"Hobbies\nhiking, chess, {rng.choice(SKILL_WORDS)}\n"
+    )
+
+
+def synthetic_job_description(rng):
+    skills = rng.sample(SKILL_WORDS, 6)
+    return (
+        f"We are looking for a software engineer with strong {', '.join(skills)} skills. "
+        f"You will design scalable services, improve reliability and work with the data team."
+    )
+
+
+def timed(func, *args, repeat=1, **kwargs):
+    """Return (best wall time in seconds, last result) over repeat runs"""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def parse_importtime(stderr):
+    """Parse `python -X importtime` output into {module: cumulative microseconds}"""
+    cumulative = {}
+    for line in stderr.splitlines():
+        match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)', line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative
+
+
+def bench_importtime(args):
+    """Cold-start cost: importing main versus importing it and running warm_up()"""
+    def run(code):
+        totals = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', code],
+                cwd=HERE, capture_output=True, text=True, check=True
+            )
+            totals.append(time.perf_counter() - start)
+        return min(totals), parse_importtime(proc.stderr)
+
+    import_seconds, modules = run('import main')
+    warm_seconds, warm_modules = run('import main; main.warm_up()')
+    heaviest = sorted(
+        ((name, us) for name, us in warm_modules.items() if '.' not in name),
+        key=lambda item: item[1], reverse=True
+    )[:8]
+
+    print(f"import main:               {import_seconds * 1000:8.1f} ms "
+          f"(main cumulative {modules.get('main', 0) / 1000:.1f} ms)")
+    print(f"import main + warm_up():   {warm_seconds * 1000:8.1f} ms")
+    print("heaviest top-level imports after warm_up():")
+    for name, us in heaviest:
+        print(f"   {name:<24} {us / 1000:8.1f} ms")
+    return {
+        'import_main_ms': round(import_seconds * 1000, 1),
+        'import_main_cumulative_ms': round(modules.get('main', 0) / 1000, 1),
+        'import_and_warm_up_ms': round(warm_seconds * 1000, 1),
+        'heaviest_imports_ms': {name: round(us / 1000, 1) for name, us in heaviest},
+    }
+
+
+def _free_port():
+    import socket
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _post_json(url, payload, timeout=30):
+    import urllib.request
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def _wait_for_server(url, timeout=60):
+    import urllib.request
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=2).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not come up")
+
+
+def bench_prefork(args):
+    """Per-worker unique RSS of the pre-fork server with and without preloading"""
+    import signal
+    sys.path.insert(0, HERE)
+    from main import unique_rss_kb
+
+    rng = random.Random(args.seed)
+    payloads = [
+        {'job_description': synthetic_job_description(rng), 'resume_text': synthetic_resume(rng)}
+        for _ in range(50)
+    ]
+    results = {}
+    for preload in (False, True):
+        port = _free_port()
+        command = [sys.executable, os.path.join(HERE, 'main.py'), '--host', '127.0.0.1',
+                   '--port', str(port), '--workers', str(args.workers)]
+        if not preload:
+            command.append('--no-preload')
+        server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            base = f"http://127.0.0.1:{port}"
+            _wait_for_server(base + '/')
+            for payload in payloads:
+                _post_json(base + '/api/analyze', payload)
+            with open(f'/proc/{server.pid}/task/{server.pid}/children') as fh:
+                workers = [int(pid) for pid in fh.read().split()]
+            uss = [unique_rss_kb(pid) for pid in workers]
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+        label = 'preload' if preload else 'no_preload'
+        mean_uss = sum(uss) / len(uss) / 1024
+        print(f"{label:<11} workers={len(uss)} mean unique RSS per worker: {mean_uss:7.1f} MB")
+        results[label] = {'workers': len(uss), 'unique_rss_mb': [round(kb / 1024, 1) for kb in uss],
+                          'mean_unique_rss_mb': round(mean_uss, 1)}
+    return results
+
+
+def _ranks(values):
+    order = sorted(range(len(values)), key=lambda i: values[i], reverse=True)
+    ranks = [0] * len(values)
+    for rank, index in enumerate(order):
+        ranks[index] = rank
+    return ranks
+
+
+def spearman(a, b):
+    """Spearman rank correlation of two equally long score lists (ties broken by position)"""
+    n = len(a)
+    if n < 2:
+        return 1.0
+    ra, rb = _ranks(a), _ranks(b)
+    d2 = sum((x - y) ** 2 for x, y in zip(ra, rb))
+    return 1 - 6 * d2 / (n * (n * n - 1))
+
+
+def top_k_overlap(a, b, k=10):
+    top_a = set(sorted(range(len(a)), key=lambda i: a[i], reverse=True)[:k])
+    top_b = set(sorted(range(len(b)), key=lambda i: b[i], reverse=True)[:k])
+    return len(top_a & top_b) / max(len(top_a), 1)
+
+
+def bench_vectorizer(args):
+    """Throughput and ranking agreement of the TF-IDF and hashing feature engines"""
+    sys.path.insert(0, HERE)
+    from main import ResumeScanner
+
+    rng = random.Random(args.seed)
+    resumes = [synthetic_resume(rng) for _ in range(args.size)]
+    jd = synthetic_job_description(rng)
+
+    results = {}
+    scores = {}
+    for engine in ('tfidf', 'hashing'):
+        engine_scanner = ResumeScanner(feature_engine=engine)
+        engine_scanner.score_candidates(resumes[:5], jd)     # build vectorizers outside the timing
+        engine_scanner.idf_table = type(engine_scanner.idf_table)(engine_scanner.idf_table.n_features)
+        seconds, scores[engine] = timed(engine_scanner.score_candidates, resumes, jd)
+        results[engine] = {'seconds': round(seconds, 4), 'resumes_per_second': round(len(resumes) / seconds, 1)}
+        print(f"{engine:<8} {len(resumes)} resumes in {seconds:7.3f} s ({len(resumes) / seconds:9.1f} resumes/s)")
+
+    results['spearman'] = round(spearman(scores['tfidf'], scores['hashing']), 4)
+    results['top10_overlap'] = round(top_k_overlap(scores['tfidf'], scores['hashing'], 10), 2)
+    print(f"ranking agreement: spearman={results['spearman']} top-10 overlap={results['top10_overlap']}")
+    return results
+
+
+def bench_bm25(args):
+    """BM25F: building the term-frequency store versus scoring it against a job description"""
+    sys.path.insert(0, HERE)
+    from main import scanner
+
+    rng = random.Random(args.seed)
+    candidates = [{'filename': f'{i}.pdf', 'resume_text': synthetic_resume(rng)} for i in range(args.size)]
+    jd = synthetic_job_description(rng)
+    engine = scanner.scoring_engine('bm25')
+
+    build_seconds, store = timed(engine.build_store, candidates)
+    score_seconds, _ = timed(engine.score_store, store, jd, repeat=args.repeat)
+    print(f"store build: {build_seconds:7.3f} s for {store.n_docs} resumes "
+          f"({len(store.vocabulary)} terms)")
+    print(f"scoring:     {score_seconds * 1000:7.1f} ms ({store.n_docs / score_seconds:,.0f} resumes/s)")
+    return {'resumes': store.n_docs, 'build_seconds': round(build_seconds, 4),
+            'score_ms': round(score_seconds * 1000, 2)}
+
+
+def bench_serialize(args):
+    """Encoding a scan result of --size candidates: Flask's stdlib jsonify vs the response encoding layer"""
+    import gzip
+    import tracemalloc
+    import numpy as np
+    sys.path.insert(0, HERE)
+    import main
+    from flask.json.provider import DefaultJSONProvider
+
+    rng = random.Random(args.seed)
+    profiles = []
+    for _ in range(200):
+        text = synthetic_resume(rng)
+        profiles.append((main.scanner.extract_skills(text), main.scanner.extract_contact_info(text),
+                         main.content_hash(text)))
+
+    def scan_result(rounded):
+        candidates = []
+        for rank in range(1, args.size + 1):
+            skills, contact_info, text_hash = profiles[rank % len(profiles)]
+            score = rng.random()
+            candidates.append({
+                'filename': f'resume{rank}.pdf', 'rank': rank,
+                'similarity_score': round(score, main.SCORE_DECIMALS) if rounded else np.float64(score),
+                'percentage_match': round(score * 100, 2), 'prefilter_score': round(rng.random(), 4),
+                'skills': skills, 'contact_info': contact_info, 'resume_hash': text_hash
+            })
+        return {'scan_id': 'benchmark', 'ranked_candidates': candidates, 'total_candidates': args.size,
+                'offset': 0, 'top': args.size, 'average_match': 50.0, 'duplicates_collapsed': 0,
+                'failed_files': [], 'ranking_stats': {}}
+
+    raw, rounded = scan_result(False), scan_result(True)
+    stdlib = DefaultJSONProvider(main.app)
+    def streamed(encoding):
+        return lambda: main.iter_encoded(rounded, encoding)
+
+    # label -> function returning the body, or an iterator of body pieces when streamed
+    encoders = {
+        'jsonify, stdlib (before)': lambda: stdlib.response(raw).get_data(),
+        'orjson, NumPy scores': lambda: main.encode_json(raw),
+        'orjson, rounded scores': lambda: main.encode_json(rounded),
+        'orjson, streamed': streamed('json'),
+    }
+    if main.optional_module('msgpack') is not None:
+        msgpack = main.optional_module('msgpack')
+        encoders['msgpack, rounded scores'] = lambda: msgpack.packb(rounded, default=main._encode_default)
+        encoders['msgpack, streamed'] = streamed('msgpack')
+
+    def body_of(encode):
+        body = encode()
+        return body if isinstance(body, bytes) else b''.join(body)
+
+    def peak_bytes(encode):
+        # Streamed pieces are dropped as they come, as a WSGI server sending them would
+        tracemalloc.start()
+        body = encode()
+        if not isinstance(body, bytes):
+            for _ in body:
+                pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+
+    results = {}
+    for label, encode in encoders.items():
+        seconds, body = timed(body_of, encode, repeat=args.repeat)
+        peak = peak_bytes(encode)
+        results[label] = {'ms': round(seconds * 1000, 1), 'bytes': len(body),
+                          'gzip_bytes': len(gzip.compress(body, compresslevel=5)), 'peak_mb': round(peak / 1e6, 1)}
+        print(f"{label:<26} {seconds * 1000:8.1f} ms  {len(body) / 1e6:6.2f} MB  "
+              f"gzip {results[label]['gzip_bytes'] / 1e6:5.2f} MB  peak {peak / 1e6:6.1f} MB")
+    return results
+
+
+def _rss_kb():
+    with open('/proc/self/statm') as fh:
+        return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+def measure_memory(func, *args):
+    """Run func(*args) under tracemalloc while sampling RSS every 5 ms
+
+    Returns (result, peak traced bytes, traced bytes still held afterwards,
+    peak RSS growth in kB). Memory of the extraction sandbox processes is not
+    included; only this process is measured.
+    """
+    import gc
+    import threading
+    import tracemalloc
+
+    gc.collect()
+    baseline = _rss_kb()
+    peak_rss = [baseline]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(0.005):
+            peak_rss[0] = max(peak_rss[0], _rss_kb())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        done.set()
+        sampler.join()
+    return result, peak, retained, max(peak_rss[0], _rss_kb()) - baseline
+
+
+def slope(xs, ys):
+    """Least-squares slope of ys over xs"""
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread if spread else 0.0
+
+
+def bench_memory(args):
+    """Peak memory per pipeline stage over growing batches; fails when growth per resume exceeds its budget"""
+    import io
+    from werkzeug.datastructures import FileStorage
+    sys.path.insert(0, HERE)
+    import main
+
+    rng = random.Random(args.seed)
+    documents = [(f'resume{i}.docx', _docx_bytes(synthetic_resume(rng))) for i in range(args.size)]
+    jd = synthetic_job_description(rng)
+    sizes = sorted({max(args.size // 4, 1), max(args.size // 2, 1), args.size})
+    budgets = {stage: args.memory_budget_kb or budget for stage, budget in MEMORY_BUDGET_KB.items()}
+    main.scanner.score_memo = None      # keep results of earlier batches out of the measurements
+    client = main.app.test_client()
+
+    def extract(batch):
+        return main.extract_uploaded_files([FileStorage(io.BytesIO(data), filename=name) for name, data in batch])
+
+    def scan(batch):
+        response = client.post('/scan', data={
+            'job_description': jd, 'top': 50,
+            'resumes': [(io.BytesIO(data), name) for name, data in batch]
+        }, content_type='multipart/form-data')
+        result = response.get_json()
+        assert 'error' not in result, result
+        return result
+
+    # One small untraced pass so imports, models and pools are not charged to the first batch
+    main.warm_up()
+    candidates, _ = extract(documents[:5])
+    main.scanner.rank_candidates(main.collapse_duplicates(candidates, main.duplicate_index), jd)
+    scan(documents[:5])
+
+    measurements = {stage: [] for stage in MEMORY_BUDGET_KB}
+    for size in sizes:
+        batch = documents[:size]
+        main.scanner.extraction_cache.clear()
+        (candidates, _), *extract_memory = measure_memory(extract, batch)
+        unique, *dedupe_memory = measure_memory(
+            main.collapse_duplicates, candidates, main.NearDuplicateIndex(main.scanner.preprocess_text)
+        )
+        _, *rank_memory = measure_memory(main.scanner.rank_candidates, unique, jd)
+        main.scanner.extraction_cache.clear()
+        main.scan_results.clear()
+        main.resume_texts.clear()
+        _, *scan_memory = measure_memory(scan, batch)
+        for stage, (peak, retained, rss_kb) in (('extract', extract_memory), ('dedupe', dedupe_memory),
+                                                ('rank', rank_memory), ('scan', scan_memory)):
+            measurements[stage].append({'resumes': size, 'peak_kb': peak // 1024,
+                                        'retained_kb': retained // 1024, 'rss_growth_kb': rss_kb})
+            print(f"{stage:<8} {size:6d} resumes  peak {peak / 1e6:8.1f} MB  "
+                  f"retained {retained / 1e6:8.1f} MB  RSS +{rss_kb / 1024:7.1f} MB")
+
+    results = {'sizes': sizes, 'stages': {}, 'failures': []}
+    print()
+    for stage, rows in measurements.items():
+        per_resume = slope([row['resumes'] for row in rows], [row['peak_kb'] for row in rows])
+        retained = slope([row['resumes'] for row in rows], [row['retained_kb'] for row in rows])
+        ok = per_resume <= budgets[stage]
+        results['stages'][stage] = {'runs': rows, 'peak_kb_per_resume': round(per_resume, 1),
+                                    'retained_kb_per_resume': round(retained, 1), 'budget_kb': budgets[stage]}
+        if not ok:
+            results['failures'].append(f"{stage}: {per_resume:.1f} kB/resume over the {budgets[stage]} kB budget")
+        print(f"{stage:<8} peak {per_resume:7.1f} kB/resume, retained {retained:7.1f} kB/resume "
+              f"(budget {budgets[stage]} kB)  {'ok' if ok else 'OVER BUDGET'}")
+    return results
+
+
+def bench_sections(args):
+    """Cost of section segmentation per resume (budget: under 1 ms)"""
+    sys.path.insert(0, HERE)
+    from main import scanner
+
+    rng = random.Random(args.seed)
+    resumes = [synthetic_resume(rng) for _ in range(args.size)]
+    seconds, _ = timed(lambda: [scanner.segment_sections(text) for text in resumes], repeat=args.repeat)
+    per_resume_ms = seconds / len(resumes) * 1000
+    verdict = 'OK' if per_resume_ms < 1.0 else 'OVER BUDGET'
+    print(f"segment_sections: {per_resume_ms * 1000:8.1f} us per resume "
+          f"({len(resumes[0])} chars typical) [{verdict}]")
+    return {'per_resume_ms': round(per_resume_ms, 4), 'within_budget': per_resume_ms < 1.0}
+
+
+def legacy_extract_contact_info(text):
+    """The original two-regex contact extractor, kept as the comparison baseline"""
+    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+    phone_pattern = r'(\+\d{1,3}[-.\s]?)?\(?(\d{3})\)?[-.\s]?(\d{3})[-.\s]?(\d{4})'
+    emails = re.findall(email_pattern, text)
+    phones = re.findall(phone_pattern, text)
+    return {'emails': emails, 'phones': [''.join(phone) for phone in phones]}
+
+
+def bench_contacts(args):
+    """Single-pass contact extraction versus the original two-regex approach"""
+    sys.path.insert(0, HERE)
+    from main import scanner
+
+    rng = random.Random(args.seed)
+    resumes = [synthetic_resume(rng, words=1200) for _ in range(args.size)]
+    legacy_seconds, _ = timed(lambda: [legacy_extract_contact_info(t) for t in resumes], repeat=args.repeat)
+    new_seconds, _ = timed(lambda: [scanner.extract_contact_info(t) for t in resumes], repeat=args.repeat)
+    speedup = legacy_seconds / new_seconds
+    print(f"two-regex:   {len(resumes) / legacy_seconds:10,.0f} resumes/s")
+    print(f"single-pass: {len(resumes) / new_seconds:10,.0f} resumes/s ({speedup:.1f}x)")
+    return {'legacy_resumes_per_second': round(len(resumes) / legacy_seconds),
+            'resumes_per_second': round(len(resumes) / new_seconds), 'speedup': round(speedup, 1)}
+
+
+def bench_store(args):
+    """Candidate store: batched ingest rate and skill-filtered search latency"""
+    import tempfile
+    sys.path.insert(0, HERE)
+    from main import CandidateStore, scanner
+
+    rng = random.Random(args.seed)
+    candidates = [{'filename': f'{i}.pdf', 'resume_text': synthetic_resume(rng)} for i in range(args.size)]
+    jd = synthetic_job_description(rng)
+    with tempfile.TemporaryDirectory() as directory:
+        store = CandidateStore(scanner, os.path.join(directory, 'bench.db'))
+        batch = 500
+        start = time.perf_counter()
+        for i in range(0, len(candidates), batch):
+            store.add_many(candidates[i:i + batch])
+        ingest_seconds = time.perf_counter() - start
+        store.idf_table()
+
+        search_seconds, (ranked, matching) = timed(
+            store.search, jd, skills=['python', 'docker'], top=100, repeat=args.repeat
+        )
+    print(f"ingest: {len(candidates) / ingest_seconds:8.0f} resumes/s ({len(candidates)} in batches of {batch})")
+    print(f"search: {search_seconds * 1000:8.1f} ms for top-100 of {matching} matching 'python AND docker'")
+    return {'ingest_resumes_per_second': round(len(candidates) / ingest_seconds),
+            'search_ms': round(search_seconds * 1000, 2), 'matching': matching}
+
+
+def _request(url, payload, headers=None, timeout=60):
+    """POST JSON and return the HTTP status, without raising on 4xx/5xx"""
+    import urllib.error
+    import urllib.request
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode('utf-8'),
+        headers=dict({'Content-Type': 'application/json'}, **(headers or {}))
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def generate_load(base, phases, rng, resumes, jd, batch_size=40, low_share=0.3):
+    """Open-loop load: Poisson arrivals at each phase's rate, one thread per request
+
+    High-priority requests are single /api/analyze calls; low-priority ones are
+    bulk /api/candidates ingests from one of three tenants. Returns
+    {phase: {priority: [(status, seconds), ...]}}.
+    """
+    import threading
+    outcomes = {name: {'high': [], 'low': []} for name, _, _ in phases}
+    lock = threading.Lock()
+    threads = []
+
+    def fire(phase, priority, url, payload, headers):
+        start = time.perf_counter()
+        status = _request(url, payload, headers)
+        with lock:
+            outcomes[phase][priority].append((status, time.perf_counter() - start))
+
+    for name, rate, seconds in phases:
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            if rng.random() < low_share:
+                priority, url = 'low', base + '/api/candidates'
+                payload = {'resumes': [
+                    {'filename': f'{rng.random()}.pdf', 'resume_text': rng.choice(resumes) + f' ref{rng.random()}'}
+                    for _ in range(batch_size)
+                ]}
+                headers = {'X-Priority': 'low', 'X-Tenant': rng.choice(['acme', 'globex', 'initech'])}
+            else:
+                priority, url = 'high', base + '/api/analyze'
+                payload = {'job_description': jd, 'resume_text': rng.choice(resumes)}
+                headers = {'X-Priority': 'high', 'X-Tenant': f'recruiter-{rng.randint(1, 20)}'}
+            thread = threading.Thread(target=fire, args=(name, priority, url, payload, headers), daemon=True)
+            thread.start()
+            threads.append(thread)
+            time.sleep(rng.expovariate(rate))
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def bench_load(args):
+    """Latency and shedding under a synthetic burst, with and without admission control"""
+    import logging
+    import tempfile
+    import threading
+    from werkzeug.serving import make_server
+    sys.path.insert(0, HERE)
+    import main
+    from main import percentile
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    rng = random.Random(args.seed)
+    resumes = [synthetic_resume(rng) for _ in range(200)]
+    jd = synthetic_job_description(rng)
+    phases = [('steady', args.rate, args.duration), ('burst', args.rate * 5, args.duration),
+              ('recovery', args.rate, args.duration)]
+    unlimited = dict(max_active=10 ** 6, tenant_active=10 ** 6, latency_slo=float('inf'))
+    settings = {'unlimited': unlimited, 'scheduler': {'latency_slo': args.slo}}
+
+    main.warm_up()
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for label, options in settings.items():
+            main.candidate_store = main.CandidateStore(main.scanner, os.path.join(directory, f'{label}.db'))
+            main.scheduler = main.Scheduler(**options)
+            port = _free_port()
+            server = make_server('127.0.0.1', port, main.app, threaded=True)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                outcomes = generate_load(f'http://127.0.0.1:{port}', phases, random.Random(args.seed), resumes, jd)
+                metrics = main.scheduler.metrics()
+            finally:
+                server.shutdown()
+
+            results[label] = {'decisions': metrics['decisions'],
+                              'stage_limits': {name: stage['limit'] for name, stage in metrics['stages'].items()}}
+            for phase, by_priority in outcomes.items():
+                for priority, samples in by_priority.items():
+                    ok = [seconds for status, seconds in samples if status == 200]
+                    summary = {
+                        'requests': len(samples),
+                        'ok': len(ok),
+                        'shed': sum(1 for status, _ in samples if status in (429, 503)),
+                        'p50_ms': round(percentile(ok, 0.5) * 1000, 1),
+                        'p95_ms': round(percentile(ok, 0.95) * 1000, 1)
+                    }
+                    results[label][f'{phase}_{priority}'] = summary
+                    print(f"{label:<9} {phase:<8} {priority:<4} {summary['requests']:5d} req "
+                          f"{summary['ok']:5d} ok {summary['shed']:4d} shed  "
+                          f"p50 {summary['p50_ms']:8.1f} ms  p95 {summary['p95_ms']:8.1f} ms")
+            print(f"{label:<9} decisions: {metrics['decisions']}")
+    return results
+
+
+def _deflate_repeated(chunk, total_bytes):
+    """zlib stream of `chunk` repeated up to total_bytes, built without holding the expansion"""
+    import zlib
+    compressor = zlib.compressobj(9)
+    block = chunk * max(1, (1 << 20) // len(chunk))
+    parts = []
+    for _ in range(max(1, total_bytes // len(block))):
+        parts.append(compressor.compress(block))
+    parts.append(compressor.flush())
+    return b''.join(parts)
+
+
+def _pdf_with_stream(stream, deflated=True, page_entries=b''):
+    """Single-page PDF whose page content is the given stream (and extra page dictionary entries)"""
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R '
+        b'/Resources << /Font << /F1 5 0 R >> >>' + page_entries + b' >>',
+        (b'<< /Length %d%s >>\nstream\n' % (len(stream), b' /Filter /FlateDecode' if deflated else b''))
+        + stream + b'\nendstream',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _docx_bytes(text):
+    import io
+    import docx
+    document = docx.Document()
+    for line in text.split('\n'):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def hostile_corpus(rng, bomb_mb=400):
+    """(name, filename, bytes) of malformed and adversarial documents"""
+    import io
+    import zipfile
+    import PyPDF2
+
+    valid_pdf = _pdf_with_stream(b'BT /F1 12 Tf 72 720 Td (Python developer) Tj ET', deflated=False)
+    valid_docx = _docx_bytes(synthetic_resume(rng))
+    writer = PyPDF2.PdfWriter()
+    for _ in range(5000):
+        writer.add_blank_page(612, 792)
+    many_pages = io.BytesIO()
+    writer.write(many_pages)
+
+    # A DOCX whose document.xml inflates to bomb_mb of paragraphs
+    paragraph = b'<w:p><w:r><w:t>python docker kubernetes</w:t></w:r></w:p>'
+    bomb = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(valid_docx)) as source, zipfile.ZipFile(bomb, 'w', zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            if item.filename != 'word/document.xml':
+                target.writestr(item, source.read(item))
+        with target.open('word/document.xml', 'w', force_zip64=True) as fh:
+            fh.write(b'<?xml version="1.0" encoding="UTF-8"?><w:document xmlns:w='
+                     b'"http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>')
+            block = paragraph * ((1 << 20) // len(paragraph))
+            for _ in range(bomb_mb):
+                fh.write(block)
+            fh.write(b'</w:body></w:document>')
+
+    # Nesting far deeper than any real document: a PDF array in the page
+    # dictionary and DOCX elements inside the body
+    depth = 100000
+    nested_pdf = _pdf_with_stream(b'BT (python) Tj ET', deflated=False,
+                                  page_entries=b' /Nested ' + b'[' * depth + b']' * depth)
+    nested_docx = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(valid_docx)) as source, zipfile.ZipFile(nested_docx, 'w', zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            if item.filename != 'word/document.xml':
+                target.writestr(item, source.read(item))
+        target.writestr('word/document.xml', b'<?xml version="1.0" encoding="UTF-8"?><w:document xmlns:w='
+                        b'"http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+                        + b'<w:sdt><w:sdtContent>' * depth + b'</w:sdtContent></w:sdt>' * depth
+                        + b'</w:body></w:document>')
+
+    return [
+        ('random bytes (pdf)', 'random.pdf', bytes(rng.getrandbits(8) for _ in range(64 * 1024))),
+        ('random bytes (docx)', 'random.docx', bytes(rng.getrandbits(8) for _ in range(64 * 1024))),
+        ('truncated pdf', 'truncated.pdf', valid_pdf[:len(valid_pdf) // 2]),
+        ('truncated docx', 'truncated.docx', valid_docx[:len(valid_docx) // 2]),
+        ('5000 blank pages', 'pages.pdf', many_pages.getvalue()),
+        ('flate stream bomb', 'bomb.pdf', _pdf_with_stream(
+            _deflate_repeated(b'BT /F1 12 Tf (python developer) Tj ET\n', bomb_mb << 20))),
+        ('operator storm', 'storm.pdf', _pdf_with_stream(_deflate_repeated(b'BT (a) Tj ET\n', 20 << 20))),
+        ('docx xml bomb', 'bomb.docx', bomb.getvalue()),
+        ('deeply nested pdf', 'nested.pdf', nested_pdf),
+        ('deeply nested docx', 'nested.docx', nested_docx.getvalue()),
+        ('oversized file', 'huge.pdf', b'%PDF-1.4\n' + b'0' * (11 * 1024 * 1024)),
+    ]
+
+
+def bench_fuzz(args):
+    """Hostile documents mixed into a batch: each is contained, the valid resumes still extract"""
+    from concurrent.futures import ThreadPoolExecutor
+    sys.path.insert(0, HERE)
+    import main
+
+    rng = random.Random(args.seed)
+    hostile = hostile_corpus(rng, bomb_mb=args.bomb_mb)
+    valid = [('valid resume', f'valid{i}.docx', _docx_bytes(synthetic_resume(rng))) for i in range(20)]
+    batch = hostile + valid
+    rng.shuffle(batch)
+
+    sandbox = main.ExtractionSandbox(workers=args.workers, wall_seconds=5, cpu_seconds=3, memory_mb=256)
+    scanner = main.ResumeScanner()
+    scanner.text_extractor = sandbox.extract
+
+    def extract(item):
+        name, filename, data = item
+        start = time.perf_counter()
+        try:
+            outcome = 'ok' if scanner.extract_resume(filename, data) else 'unreadable'
+        except main.ExtractionFailed as e:
+            outcome = f'failed: {e}'[:60]
+        return name, len(data), outcome, time.perf_counter() - start
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            outcomes = list(pool.map(extract, batch))
+        batch_seconds = time.perf_counter() - start
+    finally:
+        sandbox.close()
+
+    results = {'hostile': {}, 'batch_seconds': round(batch_seconds, 2), 'sandbox': dict(sandbox.counters)}
+    for name, size, outcome, seconds in outcomes:
+        if name != 'valid resume':
+            results['hostile'][name] = {'bytes': size, 'outcome': outcome, 'seconds': round(seconds, 2)}
+            print(f"{name:<20} {size / 1024:9.0f} kB  {seconds:6.2f} s  {outcome}")
+    valid_ok = sum(1 for name, _, outcome, _ in outcomes if name == 'valid resume' and outcome == 'ok')
+    results['valid_extracted'] = f'{valid_ok}/{len(valid)}'
+    print(f"valid resumes extracted: {valid_ok}/{len(valid)}; whole batch {batch_seconds:.2f} s; {dict(sandbox.counters)}")
+    return results
+
+
+def bench_memo(args):
+    """Re-running an unchanged scan: cold scoring vs in-memory and on-disk memo hits"""
+    import tempfile
+    sys.path.insert(0, HERE)
+    import main
+
+    rng = random.Random(args.seed)
+    texts = [synthetic_resume(rng) for _ in range(args.size)]
+    jd = synthetic_job_description(rng)
+
+    def rescan(scanner):
+        candidates = [{'filename': f'{i}.pdf', 'resume_text': text} for i, text in enumerate(texts)]
+        stats = {}
+        ranked = scanner.rank_candidates(candidates, jd, stats=stats)
+        for candidate in ranked:
+            candidate['skills'] = scanner.extract_skills(candidate['resume_text'])
+        return [(c['filename'], c['similarity_score']) for c in ranked], stats['stage2_memo_hits']
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'memo.db')
+        scanner = main.ResumeScanner()
+        scanner.score_memo = main.ScoreMemo(path=path)
+        cold_seconds, (cold, _) = timed(rescan, scanner)
+        warm_seconds, (warm, hits) = timed(rescan, scanner, repeat=args.repeat)
+        # A fresh process: empty LRU, results read back from SQLite
+        restarted = main.ResumeScanner()
+        restarted.score_memo = main.ScoreMemo(path=path)
+        disk_seconds, (from_disk, _) = timed(rescan, restarted)
+        # Changing the taxonomy retires every memoized result
+        restarted.skill_keywords = dict(restarted.skill_keywords, extra=['rust'])
+        changed_seconds, (_, changed_hits) = timed(rescan, restarted)
+
+    assert cold == warm == from_disk, 'memoized ranking differs from the cold one'
+    for label, seconds in (('cold', cold_seconds), ('memory hit', warm_seconds),
+                           ('disk hit', disk_seconds), ('new taxonomy', changed_seconds)):
+        results[label.replace(' ', '_') + '_ms'] = round(seconds * 1000, 1)
+        print(f"{label:<13} {len(texts)} resumes: {seconds * 1000:9.1f} ms")
+    print(f"memo hits on re-run: {hits}/{len(texts)}; after taxonomy change: {changed_hits}")
+    results['hits'] = hits
+    return results
+
+
+def bench_percolator(args):
+    """Standing requisitions: incremental leaderboard updates vs rescoring the pool per JD"""
+    import tempfile
+    sys.path.insert(0, HERE)
+    from main import CandidateStore, Percolator, scanner
+
+    rng = random.Random(args.seed)
+    pool = [{'filename': f'pool{i}.pdf', 'resume_text': synthetic_resume(rng)} for i in range(args.size)]
+    arrivals = [{'filename': f'new{i}.pdf', 'resume_text': synthetic_resume(rng)} for i in range(500)]
+    jds = [synthetic_job_description(rng) for _ in range(args.requisitions)]
+    batch = 50
+    with tempfile.TemporaryDirectory() as directory:
+        store = CandidateStore(scanner, os.path.join(directory, 'bench.db'))
+        for i in range(0, len(pool), 500):
+            store.add_many(pool[i:i + 500])
+        store.idf_table()
+        percolator = Percolator(store)
+        store.on_insert = percolator.percolate
+        register_seconds, _ = timed(lambda: [percolator.register(jd, top_k=20) for jd in jds])
+
+        percolate_seconds = 0.0
+        for i in range(0, len(arrivals), batch):
+            chunk = arrivals[i:i + batch]
+            store.on_insert = None
+            baseline, _ = timed(store.add_many, [dict(c, resume_text=c['resume_text'] + ' x') for c in chunk])
+            store.on_insert = percolator.percolate
+            seconds, _ = timed(store.add_many, chunk)
+            percolate_seconds += max(seconds - baseline, 0.0)
+        # The alternative: rescore the whole pool for every requisition after a batch arrives
+        rescore_seconds, _ = timed(lambda: [store.search(jd, top=20) for jd in jds])
+
+        # After a restart every leaderboard is rebuilt in one pass over the stored vectors
+        reload_seconds, _ = timed(lambda: Percolator(store).open_requisitions())
+
+        ranked, _ = store.search(jds[0], top=20)
+        board = percolator.leaderboard(percolator.open_requisitions()[0]['requisition_id'])['ranked_candidates']
+        overlap = len({c['candidate_id'] for c in ranked} & {c['candidate_id'] for c in board}) / len(ranked)
+
+    per_resume_ms = percolate_seconds / len(arrivals) * 1000
+    rescore_per_resume_ms = rescore_seconds / batch * 1000
+    print(f"registering {len(jds)} requisitions over {len(pool)} resumes: {register_seconds:.2f} s")
+    print(f"reloading them after a restart: {reload_seconds:.2f} s")
+    print(f"percolation: {per_resume_ms:8.3f} ms per new resume against {len(jds)} requisitions")
+    print(f"rescoring:   {rescore_per_resume_ms:8.3f} ms per new resume (all JDs over the pool per batch of {batch})")
+    print(f"top-20 overlap with a fresh search: {overlap:.2f}")
+    return {'register_seconds': round(register_seconds, 2), 'reload_seconds': round(reload_seconds, 2),
+            'percolate_ms_per_resume': round(per_resume_ms, 3),
+            'rescore_ms_per_resume': round(rescore_per_resume_ms, 3), 'top20_overlap': overlap}
+
+
+def bench_shards(args):
+    """Scatter-gather search over local shard processes vs one in-process index"""
+    import signal
+    sys.path.insert(0, HERE)
+    import main
+
+    rng = random.Random(args.seed)
+    candidates = [{'filename': f'{i}.pdf', 'resume_text': synthetic_resume(rng)} for i in range(args.size)]
+    jds = [synthetic_job_description(rng) for _ in range(20)]
+
+    # Reference: the whole pool in one index with its own statistics
+    single = main.ShardIndex(main.scanner)
+    ingest_single, reply = timed(single.add, candidates)
+    single.set_idf(1, reply['df_indices'], reply['df_counts'], reply['n_docs'])
+    single.search(jds[0], (), 20, 1)
+    single_seconds, _ = timed(lambda: [single.search(jd, (), 20, 1) for jd in jds], repeat=args.repeat)
+
+    addresses, processes, authkey = main.start_local_shards(args.workers, _free_port())
+    try:
+        coordinator = main.ShardCoordinator(addresses, authkey=authkey, search_timeout=1.0)
+        coordinator.wait_until_ready()
+        ingest_sharded, _ = timed(lambda: [coordinator.add_many(candidates[i:i + 1000])
+                                           for i in range(0, len(candidates), 1000)])
+        coordinator.search(jds[0], top=20)
+        sharded_seconds, _ = timed(lambda: [coordinator.search(jd, top=20) for jd in jds], repeat=args.repeat)
+        agree = all(
+            [c['filename'] for c in coordinator.search(jd, top=20)[0]] ==
+            [c['filename'] for c in single.search(jd, (), 20, 1)['ranked_candidates']]
+            for jd in jds
+        )
+        # One shard hangs: searches return partial results once the timeout expires
+        os.kill(processes[0].pid, signal.SIGSTOP)
+        partial_seconds, (_, matching, status) = timed(coordinator.search, jds[0], top=20)
+        os.kill(processes[0].pid, signal.SIGCONT)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    n = len(jds)
+    print(f"ingest {len(candidates)} resumes: single {ingest_single:6.2f} s, {args.workers} shards {ingest_sharded:6.2f} s")
+    print(f"search: single {single_seconds / n * 1000:8.1f} ms, {args.workers} shards "
+          f"{sharded_seconds / n * 1000:8.1f} ms per JD; identical top-20: {agree}")
+    print(f"with one shard hung: {partial_seconds * 1000:.0f} ms, {status['responded']}/{status['total']} shards, "
+          f"{matching} of {len(candidates)} candidates searched")
+    return {'ingest_single_seconds': round(ingest_single, 2), 'ingest_sharded_seconds': round(ingest_sharded, 2),
+            'search_single_ms': round(single_seconds / n * 1000, 1),
+            'search_sharded_ms': round(sharded_seconds / n * 1000, 1),
+            'identical_top20': agree, 'partial_search_ms': round(partial_seconds * 1000),
+            'partial_status': status}
+
+
+def bench_archive(args):
+    """Resumes uploaded one by one vs as a zip or tar.gz archive through the extraction pipeline"""
+    import io
+    import tarfile
+    import zipfile
+    from werkzeug.datastructures import FileStorage
+    sys.path.insert(0, HERE)
+    import main
+
+    rng = random.Random(args.seed)
+    documents = [(f'resume{i}.docx', _docx_bytes(synthetic_resume(rng))) for i in range(args.size)]
+    zipped = io.BytesIO()
+    with zipfile.ZipFile(zipped, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in documents:
+            archive.writestr(f'agency/{name}', data)
+    tarred = io.BytesIO()
+    with tarfile.open(fileobj=tarred, mode='w:gz') as archive:
+        for name, data in documents:
+            info = tarfile.TarInfo(f'agency/{name}')
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+    uploads = {
+        'individual files': lambda: [FileStorage(io.BytesIO(data), filename=name) for name, data in documents],
+        'zip archive': lambda: [FileStorage(io.BytesIO(zipped.getvalue()), filename='agency.zip')],
+        'tar.gz archive': lambda: [FileStorage(io.BytesIO(tarred.getvalue()), filename='agency.tar.gz')],
+    }
+    main.extract_uploaded_files(uploads['individual files']()[:1])  # start the extraction workers
+    results = {}
+    for label, files in uploads.items():
+        best = None
+        for _ in range(args.repeat):
+            main.scanner.extraction_cache.clear()
+            seconds, (candidates, failed) = timed(main.extract_uploaded_files, files())
+            best = seconds if best is None else min(best, seconds)
+        results[label] = {'seconds': round(best, 2), 'resumes_per_second': round(len(candidates) / best, 1),
+                          'extracted': len(candidates), 'failed': len(failed)}
+        print(f"{label:<18} {best:7.2f} s  {len(candidates) / best:7.1f} resumes/s  "
+              f"({len(candidates)} extracted, {len(failed)} failed)")
+    return results
+
+
+def legacy_pair_scores(scanner, texts, job_description):
+    """The original TF-IDF path: one vectorizer fit per pair, re-analyzing the job description each time"""
+    from sklearn.metrics.pairwise import cosine_similarity
+    scores = []
+    for text in texts:
+        matrix = scanner.vectorizer.fit_transform([text, job_description])
+        scores.append(cosine_similarity(matrix[0:1], matrix[1:2])[0][0])
+    return scores
+
+
+def bench_prepare(args):
+    """Analyze-click latency with resumes and job description sent on click vs prepared while typing"""
+    sys.path.insert(0, HERE)
+    import main
+
+    rng = random.Random(args.seed)
+    texts = [synthetic_resume(rng) for _ in range(args.size)]
+    documents = [(f'resume{i}.docx', _docx_bytes(text)) for i, text in enumerate(texts[:min(args.size, 200)])]
+    main.scanner.score_memo = None     # every run scores from scratch
+    results = {}
+
+    # Scoring stage alone; each run gets a job description the cache has not seen
+    def pairwise(jd):
+        return timed(legacy_pair_scores, main.scanner, texts, jd)[0]
+
+    def in_scan(jd):
+        return timed(main.scanner.score_candidates, texts, jd)[0]
+
+    def prepared(jd):
+        main.scanner.prepare_job_description(jd)
+        return timed(main.scanner.score_candidates, texts, jd)[0]
+
+    legacy_pair_scores(main.scanner, texts[:5], synthetic_job_description(rng))   # build the vectorizer
+    for label, run in (('pairwise fit (before)', pairwise), ('JD analyzed in scan', in_scan),
+                       ('JD prepared ahead', prepared)):
+        best = min(run(synthetic_job_description(rng)) for _ in range(args.repeat))
+        results[label] = {'score_ms': round(best * 1000, 1)}
+        print(f"score {len(texts)} resumes, {label:<22} {best * 1000:8.1f} ms")
+    jd = synthetic_job_description(rng)
+    baseline = legacy_pair_scores(main.scanner, texts, jd)
+    results['max_score_difference'] = float(max(
+        abs(a - b) for a, b in zip(baseline, main.scanner.score_candidates(texts, jd))
+    ))
+    print(f"max score difference vs pairwise fit: {results['max_score_difference']:.2g}")
+
+    # Click to results through the app: uploads and JD analysis on click vs while typing
+    client = main.app.test_client()
+
+    def upload():
+        batch_id = client.post('/upload').get_json()['batch_id']
+        for i, (name, data) in enumerate(documents):
+            client.put(f'/upload/{batch_id}/f{i}?offset=0&size={len(data)}&filename={name}', data=data)
+        return batch_id
+
+    def scan(batch_id, jd):
+        result = client.post('/scan', data={'job_description': jd, 'batch_id': batch_id, 'top': 50}).get_json()
+        assert 'error' not in result, result
+        return result
+
+    def on_click(jd):
+        return timed(lambda: scan(upload(), jd))[0]
+
+    def ahead(jd):
+        batch_id = upload()
+        client.post('/api/jd/prepare', json={'job_description': jd})
+        main.uploads.wait(main.uploads.get(batch_id))     # extraction finished while the recruiter was typing
+        return timed(scan, batch_id, jd)[0]
+
+    for label, run in (('uploaded on click', on_click), ('prepared ahead', ahead)):
+        best = None
+        for _ in range(args.repeat):
+            main.scanner.extraction_cache.clear()
+            seconds = run(synthetic_job_description(rng))
+            best = seconds if best is None else min(best, seconds)
+        results[label] = {'click_to_results_ms': round(best * 1000, 1), 'resumes': len(documents)}
+        print(f"click to results, {len(documents)} resumes, {label:<18} {best * 1000:8.1f} ms")
+    return results
+
+
+# Replays a scan workload in a fresh process: (seconds since ready, latency) per request
+SNAPSHOT_REPLAY = '''
+import io, json, pickle, random, sys, time
+import main
+with open(sys.argv[1], 'rb') as fh:
+    documents, job_descriptions, requests, per_request, seed = pickle.load(fh)
+main.warm_up()      # as the pre-fork server does before it accepts requests
+main.cache_snapshot.start()
+client = main.app.test_client()
+rng = random.Random(seed)
+ready = time.perf_counter()
+timeline = []
+for _ in range(requests):
+    job_description = rng.choice(job_descriptions)
+    files = [(io.BytesIO(data), name) for name, data in rng.sample(documents, per_request)]
+    start = time.perf_counter()
+    result = client.post('/scan', data={'job_description': job_description, 'resumes': files}).get_json()
+    assert 'error' not in result, result
+    explained = client.post('/api/explain', json={
+        'job_description': job_description, 'scan_id': result['scan_id'], 'rank': 1
+    }).get_json()
+    assert 'error' not in explained, explained
+    now = time.perf_counter()
+    timeline.append((now - ready, now - start))
+main.cache_snapshot.stop()
+print(json.dumps({'timeline': timeline, 'status': main.cache_snapshot.status}))
+'''
+
+
+def _time_to_steady(timeline, steady, window=5, tolerance=1.5):
+    """Seconds until the median latency of a window of requests is within tolerance of steady state"""
+    for end in range(window, len(timeline) + 1):
+        latencies = sorted(latency for _, latency in timeline[end - window:end])
+        if latencies[window // 2] <= steady * tolerance:
+            return timeline[end - window][0] - timeline[end - window][1]
+    return None
+
+
+def bench_snapshot(args):
+    """Warm restart: latency after a restart with an empty cache vs one restored from a snapshot"""
+    import pickle
+    import statistics
+    import tempfile
+
+    rng = random.Random(args.seed)
+    pool = min(args.size, 100)
+    documents = [(f'resume{i}.docx', _docx_bytes(synthetic_resume(rng))) for i in range(pool)]
+    job_descriptions = [synthetic_job_description(rng) for _ in range(5)]
+    requests, per_request = pool, 10
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        workload = os.path.join(directory, 'workload.pickle')
+        with open(workload, 'wb') as fh:
+            pickle.dump((documents, job_descriptions, requests, per_request, args.seed), fh)
+        snapshot = os.path.join(directory, 'snapshot.json')
+
+        def deploy(path):
+            start = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, '-c', SNAPSHOT_REPLAY, workload], cwd=HERE, capture_output=True, text=True,
+                check=True, env=dict(os.environ, CACHE_SNAPSHOT_PATH=path, SCORE_MEMO_PATH='')
+            )
+            run = json.loads(proc.stdout.strip().splitlines()[-1])
+            return run, time.perf_counter() - start
+
+        # The first deploy starts cold and leaves a snapshot behind for the second
+        cold, cold_seconds = deploy(snapshot)
+        snapshot_bytes = os.path.getsize(snapshot)
+        warm, warm_seconds = deploy(snapshot)
+
+    steady = statistics.median(latency for _, latency in cold['timeline'][-requests // 4:])
+    print(f"snapshot: {snapshot_bytes / 1024:.0f} kB, restored {warm['status']['restored_entries']} entries "
+          f"in {warm['status']['restore_seconds'] * 1000:.0f} ms (background)")
+    print(f"steady-state latency: {steady * 1000:.1f} ms per scan of {per_request} resumes")
+    for label, run, seconds in (('cold start', cold, cold_seconds), ('from snapshot', warm, warm_seconds)):
+        latencies = [latency for _, latency in run['timeline']]
+        to_steady = _time_to_steady(run['timeline'], steady)
+        results[label.replace(' ', '_')] = {
+            'first_10_mean_ms': round(statistics.mean(latencies[:10]) * 1000, 1),
+            'first_request_ms': round(latencies[0] * 1000, 1),
+            'time_to_steady_state_s': None if to_steady is None else round(to_steady, 2),
+            'replay_seconds': round(run['timeline'][-1][0], 2),
+            'process_seconds': round(seconds, 2)
+        }
+        print(f"{label:<14} first request {latencies[0] * 1000:7.1f} ms, first 10 mean "
+              f"{statistics.mean(latencies[:10]) * 1000:7.1f} ms, steady state after "
+              f"{'never' if to_steady is None else f'{to_steady:.2f} s'}, "
+              f"{requests} requests in {run['timeline'][-1][0]:.2f} s")
+    results.update(snapshot_kb=round(snapshot_bytes / 1024, 1), steady_state_ms=round(steady * 1000, 1),
+                   restored_entries=warm['status']['restored_entries'],
+                   restore_ms=round(warm['status']['restore_seconds'] * 1000, 1))
+    return results
+
+
+def legacy_extract_skills(scanner, text):
+    """The original substring skill matcher over regex-cleaned text, kept as the comparison baseline"""
+    text = scanner.preprocess_text(text)
+    return {category: [skill for skill in skills if skill.lower() in text]
+            for category, skills in scanner.skill_keywords.items()}
+
+
+def bench_tokenizer(args):
+    """Shared token-id tokenizer vs sklearn's analyzer for hashed counts, and skill matching"""
+    from sklearn.feature_extraction.text import HashingVectorizer
+    sys.path.insert(0, HERE)
+    import main
+
+    rng = random.Random(args.seed)
+    resumes = [synthetic_resume(rng, words=800) for _ in range(args.size)]
+    scanner = main.ResumeScanner(feature_engine='hashing')
+    tokenizer = scanner.tokenizer
+    hashing = HashingVectorizer(stop_words='english', ngram_range=(1, 2), n_features=main.HASHING_N_FEATURES,
+                                alternate_sign=False, norm=None)
+    analyzer = hashing.build_analyzer()
+    tokens = sum(len(tokenizer.tokens(text)) for text in resumes)
+
+    steps = {
+        'analyze': (lambda: [analyzer(scanner.preprocess_text(text)) for text in resumes],
+                    lambda: [tokenizer.encode(tokenizer.tokens(text)) for text in resumes]),
+        'hashed counts': (lambda: hashing.transform([scanner.preprocess_text(text) for text in resumes]),
+                          lambda: tokenizer.hashed_counts(resumes)),
+        'skills': (lambda: [legacy_extract_skills(scanner, text) for text in resumes],
+                   lambda: [scanner._extract_skills(text) for text in resumes]),
+    }
+    tokenizer.hashed_counts(resumes)  # fill the vocabulary, as a running server would have
+    results = {'tokens': tokens}
+    for step, (baseline, shared) in steps.items():
+        baseline_seconds, _ = timed(baseline, repeat=args.repeat)
+        shared_seconds, _ = timed(shared, repeat=args.repeat)
+        results[step] = {'sklearn_tokens_per_second': round(tokens / baseline_seconds),
+                         'tokens_per_second': round(tokens / shared_seconds),
+                         'speedup': round(baseline_seconds / shared_seconds, 1)}
+        print(f"{step:<14} baseline {tokens / baseline_seconds:12,.0f} tokens/s   "
+              f"tokenizer {tokens / shared_seconds:12,.0f} tokens/s ({baseline_seconds / shared_seconds:.1f}x)")
+    same = (abs(hashing.transform([scanner.preprocess_text(t) for t in resumes]) - tokenizer.hashed_counts(resumes))).max() == 0
+    results['identical_counts'] = bool(same)
+    print(f"hashed counts identical to HashingVectorizer: {same}")
+    return results
+
+
+def _disk_bytes(*paths):
+    return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+
+def bench_textarchive(args):
+    """Resume text archive: compression ratio and random-read latency vs raw text rows in SQLite"""
+    import sqlite3
+    import tempfile
+    sys.path.insert(0, HERE)
+    import main
+
+    rng = random.Random(args.seed)
+    texts = {}
+    for _ in range(args.size):
+        text = synthetic_resume(rng)
+        texts[main.content_hash(text)] = text
+    text_bytes = sum(len(text.encode('utf-8')) for text in texts.values())
+    probes = [rng.choice(list(texts)) for _ in range(2000)]
+
+    def read_latencies(read):
+        latencies = []
+        for text_hash in probes:
+            start = time.perf_counter()
+            read(text_hash)
+            latencies.append(time.perf_counter() - start)
+        return (main.percentile(latencies, 0.5) * 1e6, main.percentile(latencies, 0.99) * 1e6)
+
+    results = {'records': len(texts), 'text_bytes': text_bytes}
+    with tempfile.TemporaryDirectory() as directory:
+        # Baseline: resume_text strings in a SQLite table keyed by text hash
+        path = os.path.join(directory, 'raw.db')
+        connection = sqlite3.connect(path)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('CREATE TABLE texts (text_hash TEXT PRIMARY KEY, resume_text TEXT NOT NULL) WITHOUT ROWID')
+        start = time.perf_counter()
+        with connection:
+            connection.executemany('INSERT INTO texts VALUES (?, ?)', texts.items())
+        ingest = time.perf_counter() - start
+        connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        p50, p99 = read_latencies(lambda h: connection.execute(
+            'SELECT resume_text FROM texts WHERE text_hash = ?', (h,)).fetchone())
+        disk = _disk_bytes(path, path + '-wal')
+        results['raw sqlite'] = {'disk_bytes': disk, 'ratio': round(text_bytes / disk, 2),
+                                 'ingest_seconds': round(ingest, 2), 'read_p50_us': round(p50), 'read_p99_us': round(p99)}
+
+        configs = [('zlib, no dictionary, 4 KB blocks', 'zlib', 4096, False),
+                   ('zlib + dictionary, 4 KB blocks', 'zlib', 4096, True),
+                   ('zlib + dictionary, 16 KB blocks', 'zlib', 16384, True),
+                   ('zlib + dictionary, 64 KB blocks', 'zlib', 65536, True),
+                   ('zstd + dictionary, 4 KB blocks', 'zstd', 4096, True),
+                   ('zstd + dictionary, 16 KB blocks', 'zstd', 16384, True)]
+        for label, codec, block_bytes, dictionary in configs:
+            path = os.path.join(directory, label.replace(' ', '_').replace(',', '') + '.db')
+            try:
+                archive = main.ResumeTextArchive(path, block_bytes=block_bytes, codec=codec,
+                                                 train_after=1 if dictionary else float('inf'))
+            except ValueError as e:
+                print(f"{label:<34} skipped: {e}")
+                continue
+            items = list(texts.items())
+            start = time.perf_counter()
+            for i in range(0, len(items), 500):
+                archive.put_many(dict(items[i:i + 500]))
+            ingest = time.perf_counter() - start
+            archive.connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+            def uncached_read(text_hash):
+                archive.block_cache.clear()
+                return archive.get(text_hash)
+            p50, p99 = read_latencies(uncached_read)
+            disk = _disk_bytes(path, path + '-wal', archive.data_path)
+            archive.close()
+            results[label] = {'disk_bytes': disk, 'ratio': round(text_bytes / disk, 2),
+                              'ingest_seconds': round(ingest, 2), 'read_p50_us': round(p50), 'read_p99_us': round(p99)}
+
+    print(f"{len(texts)} resumes, {text_bytes / 2**20:.1f} MB of text")
+    for label, row in results.items():
+        if isinstance(row, dict):
+            print(f"{label:<34} {row['disk_bytes'] / 2**20:7.2f} MB on disk  ratio {row['ratio']:5.2f}  "
+                  f"read p50 {row['read_p50_us']:5d} us  p99 {row['read_p99_us']:5d} us  ingest {row['ingest_seconds']:.2f} s")
+    return results
+
+
+BENCHMARKS = {
+    'archive': bench_archive,
+    'bm25': bench_bm25,
+    'contacts': bench_contacts,
+    'fuzz': bench_fuzz,
+    'importtime': bench_importtime,
+    'load': bench_load,
+    'memo': bench_memo,
+    'memory': bench_memory,
+    'percolator': bench_percolator,
+    'prefork': bench_prefork,
+    'prepare': bench_prepare,
+    'sections': bench_sections,
+    'serialize': bench_serialize,
+    'shards': bench_shards,
+    'snapshot': bench_snapshot,
+    'store': bench_store,
+    'textarchive': bench_textarchive,
+    'tokenizer': bench_tokenizer,
+    'vectorizer': bench_vectorizer,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS) + ['all'])
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement (best is kept)')
+    parser.add_argument('--size', type=int, default=1000, help='number of synthetic resumes')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=4, help='worker processes for server benchmarks')
+    parser.add_argument('--rate', type=float, default=20.0, help='baseline arrivals per second for the load benchmark')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per load phase')
+    parser.add_argument('--slo', type=float, default=1.0, help='p95 latency SLO in seconds for the load benchmark')
+    parser.add_argument('--requisitions', type=int, default=200, help='open requisitions for the percolator benchmark')
+    parser.add_argument('--bomb-mb', type=int, default=400, help='inflated size of the decompression bombs in the fuzz corpus')
+    parser.add_argument('--memory-budget-kb', type=float, help='peak memory growth allowed per resume in every memory stage')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    names = sorted(BENCHMARKS) if args.benchmark == 'all' else [args.benchmark]
+    results = {}
+    for name in names:
+        print(f"== {name} ==")
+        results[name] = BENCHMARKS[name](args)
+        print()
+
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(results, fh, indent=2)
+        print(f"results written to {args.json}")
+
+    # Benchmarks with a budget report what they exceeded; any failure fails the run
+    failures = [f"{name}: {failure}" for name, result in results.items()
+                if isinstance(result, dict) for failure in result.get('failures', [])]
+    for failure in failures:
+        print(f"FAILED {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
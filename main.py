@@ -1,25 +1,1073 @@
 import re
 import string
-import numpy as np
-from flask import Flask, request, jsonify, render_template_string
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from flask import Flask, Request, request, jsonify, Response, g
+from flask.json.provider import DefaultJSONProvider
 from collections import Counter
-import PyPDF2
-import docx
 import io
 import json
+import os
+import time
+import uuid
+import gzip
+import zlib
+import shutil
+import sqlite3
+import tempfile
+import hashlib
+import heapq
+import importlib
+import math
+import functools
+import threading
+from collections import OrderedDict
+
+# numpy, scikit-learn, PyPDF2 and python-docx are imported on first use (or by
+# warm_up()) so that a new worker can start serving without paying for them.
 
 app = Flask(__name__)
 
-class ResumeScanner:
-    def __init__(self):
-        self.vectorizer = TfidfVectorizer(
-            stop_words='english',
-            lowercase=True,
-            max_features=1000,
-            ngram_range=(1, 2)
+# Cascaded ranking: candidates kept by the cheap prefilter before exact scoring
+CASCADE_TOP_N = int(os.environ.get('CASCADE_TOP_N', 300))
+CASCADE_MIN_PREFILTER_SCORE = float(os.environ.get('CASCADE_MIN_PREFILTER_SCORE', 0.0))
+CASCADE_KEY_TERMS = 30
+
+# Feature engine used for similarity: 'tfidf' (vocabulary fitted per comparison)
+# or 'hashing' (stateless feature hashing with a separately maintained IDF table)
+FEATURE_ENGINES = ('tfidf', 'hashing')
+FEATURE_ENGINE = os.environ.get('FEATURE_ENGINE', 'tfidf')
+HASHING_N_FEATURES = 2 ** 20
+
+# One tokenizer feeds skill matching and both feature engines. Punctuated skill
+# names (and any in the skill taxonomy) are kept as single tokens.
+TOKENIZER_VERSION = 1
+SKILL_TOKENS = ('c++', 'c#', 'f#', '.net', 'asp.net', 'node.js', 'vue.js', 'react.js', 'next.js')
+TOKENIZER_MAX_VOCABULARY = int(os.environ.get('TOKENIZER_MAX_VOCABULARY', 500000))
+
+# Scoring engines selectable per request; BM25F field weights apply to resume sections
+SCORING_ENGINES = ('cosine', 'bm25')
+DEFAULT_SCORING_ENGINE = 'cosine'
+BM25_K1 = 1.2
+BM25_B = 0.75
+BM25F_FIELD_WEIGHTS = {
+    'skills': 2.0,
+    'experience': 1.5,
+    'education': 1.0,
+    'body': 1.0
+}
+
+# Resume sections: header synonyms (matched as whole lines, optionally followed
+# by a colon) and how much a skill mentioned in each section counts
+SECTION_HEADERS = {
+    'summary': ['summary', 'professional summary', 'profile', 'objective', 'about me'],
+    'experience': ['experience', 'work experience', 'professional experience',
+                   'employment history', 'work history', 'employment'],
+    'projects': ['projects', 'personal projects', 'key projects'],
+    'skills': ['skills', 'technical skills', 'core competencies', 'competencies',
+               'technologies', 'tools and technologies'],
+    'education': ['education', 'academic background', 'qualifications', 'certifications'],
+    'hobbies': ['hobbies', 'interests', 'activities', 'hobbies and interests']
+}
+SECTION_WEIGHTS = {
+    'experience': 1.0,
+    'skills': 1.0,
+    'projects': 0.8,
+    'summary': 0.8,
+    'education': 0.6,
+    'header': 0.5,
+    'hobbies': 0.2
+}
+# Contact details usually sit at the top: scan this many characters first and
+# only fall back to the rest of the resume when no email or phone is found there
+CONTACT_HEADER_CHARS = 1500
+DEFAULT_PHONE_COUNTRY_CODE = os.environ.get('DEFAULT_PHONE_COUNTRY_CODE', '1')
+
+# Emails, profile/web links and phone numbers matched in a single scan
+CONTACT_PATTERN = re.compile(r"""
+    (?P<email>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}\b)
+  | (?P<url>(?:https?://|www\.)[^\s<>()"'|]+
+      | \b(?:[a-z]{2,3}\.)?(?:linkedin\.com|github\.com)/[^\s<>()"'|,;]+)
+  | (?P<phone>(?<![\w+])(?:\+|00)?\(?\d[\d \t().-]{7,18}\d(?![\w@]))
+""", re.VERBOSE | re.IGNORECASE)
+# Cheap test for lines that could hold any contact at all
+CONTACT_HINT_PATTERN = re.compile(r'[@/\d]|www\.', re.IGNORECASE)
+WHITESPACE_PATTERN = re.compile(r'\s')
+
+EXTRACTION_CACHE_SIZE = int(os.environ.get('EXTRACTION_CACHE_SIZE', 2048))
+
+# Scan results are kept server-side and returned in pages
+SCAN_RESULT_CACHE_SIZE = int(os.environ.get('SCAN_RESULT_CACHE_SIZE', 64))
+# SQLite file that shares scan results and their resume texts between worker processes;
+# the pre-fork server uses a private temporary file when none is set
+SCAN_RESULT_PATH = os.environ.get('SCAN_RESULT_PATH', '')
+SCAN_PAGE_SIZE = 50
+SCAN_MAX_PAGE_SIZE = 500
+GZIP_MIN_BYTES = 1024
+# Responses are encoded with orjson when it is installed, and as msgpack when the
+# client's Accept header prefers it. Lists longer than RESPONSE_STREAM_MIN_ITEMS
+# are streamed RESPONSE_STREAM_CHUNK items at a time instead of encoded in one piece;
+# keep the threshold below SCAN_MAX_PAGE_SIZE, or scan pages are never streamed.
+RESPONSE_STREAM_MIN_ITEMS = int(os.environ.get('RESPONSE_STREAM_MIN_ITEMS', 200))
+RESPONSE_STREAM_CHUNK = 100
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+# Scores in results are rounded once, when the result is built
+SCORE_DECIMALS = 6
+
+# Chunked uploads are staged on disk per batch and extracted as each file completes
+UPLOAD_STAGING_DIR = os.environ.get('UPLOAD_STAGING_DIR') or os.path.join(
+    tempfile.gettempdir(), 'resume_scanner_uploads'
+)
+UPLOAD_CHUNK_MAX_BYTES = 8 * 1024 * 1024
+# Multipart requests larger than this write their files to temporary files instead of memory
+UPLOAD_SPOOL_MAX_BYTES = int(os.environ.get('UPLOAD_SPOOL_MAX_BYTES', 1024 * 1024))
+UPLOAD_FILE_MAX_BYTES = 10 * 1024 * 1024
+UPLOAD_BATCH_TTL = 3600
+EXTRACTION_WORKERS = int(os.environ.get('EXTRACTION_WORKERS', os.cpu_count() or 4))
+UPLOAD_FILE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+UPLOAD_BATCH_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+# How often collect() checks for extraction results published by another worker process
+UPLOAD_POLL_SECONDS = 0.02
+
+# Untrusted documents are parsed in sandboxed worker processes with per-file limits
+EXTRACTION_SANDBOX = os.environ.get('EXTRACTION_SANDBOX', '1').lower() not in ('0', 'false', 'no', 'off')
+EXTRACT_WALL_SECONDS = float(os.environ.get('EXTRACT_WALL_SECONDS', 30.0))
+EXTRACT_CPU_SECONDS = int(os.environ.get('EXTRACT_CPU_SECONDS', 20))
+EXTRACT_MEMORY_MB = int(os.environ.get('EXTRACT_MEMORY_MB', 512))
+EXTRACT_MAX_BYTES = UPLOAD_FILE_MAX_BYTES
+EXTRACT_MAX_PAGES = int(os.environ.get('EXTRACT_MAX_PAGES', 50))
+EXTRACT_MAX_CHARS = 200000
+# Arrays and dictionaries nested deeper than this (outside content streams) mark a
+# PDF as malformed; the parser would otherwise recurse until it gives up silently
+EXTRACT_MAX_NESTING = 100
+PDF_STREAM_PATTERN = re.compile(rb'stream\r?\n.*?endstream', re.DOTALL)
+PDF_NESTING_PATTERN = re.compile(rb'\[|\]|<<|>>')
+SANDBOX_MAX_TASKS = 500
+
+# Zip and tar archives of resumes, expanded member by member
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+RESUME_EXTENSIONS = ('.pdf', '.docx')
+ARCHIVE_MAX_MEMBERS = int(os.environ.get('ARCHIVE_MAX_MEMBERS', 2000))
+ARCHIVE_MAX_BYTES = int(os.environ.get('ARCHIVE_MAX_MB', 500)) * 1024 * 1024
+ARCHIVE_MAX_RATIO = 100
+
+# Admission control and adaptive stage concurrency (per process)
+SCHEDULER_MAX_ACTIVE = int(os.environ.get('SCHEDULER_MAX_ACTIVE', 32))
+SCHEDULER_TENANT_ACTIVE = int(os.environ.get('SCHEDULER_TENANT_ACTIVE', 4))
+# Per-tenant overrides, e.g. "acme=8,trial=1"
+SCHEDULER_TENANT_LIMITS = os.environ.get('SCHEDULER_TENANT_LIMITS', '')
+SCHEDULER_LATENCY_SLO = float(os.environ.get('SCHEDULER_LATENCY_SLO', 5.0))
+SCHEDULER_QUEUE_TIMEOUT = float(os.environ.get('SCHEDULER_QUEUE_TIMEOUT', 10.0))
+SCHEDULER_WINDOW_SECONDS = 30.0
+SCHEDULER_ADJUST_INTERVAL = 1.0
+SCHEDULER_LATENCY_TOLERANCE = 2.0
+SCHEDULER_MIN_SAMPLES = 10
+SCORING_WORKERS = int(os.environ.get('SCORING_WORKERS', os.cpu_count() or 4))
+PRIORITIES = ('high', 'low')
+
+# Persistent candidate store (SQLite)
+CANDIDATE_DB_PATH = os.environ.get('CANDIDATE_DB_PATH', 'candidates.db')
+
+# Retained text of stored candidates: compressed blocks in an append-only file,
+# indexed in SQLite; an empty path keeps no text
+RESUME_ARCHIVE_PATH = os.environ.get('RESUME_ARCHIVE_PATH', 'resume_texts.db')
+RESUME_ARCHIVE_CODEC = os.environ.get('RESUME_ARCHIVE_CODEC', '')
+RESUME_ARCHIVE_BLOCK_BYTES = int(os.environ.get('RESUME_ARCHIVE_BLOCK_BYTES', 16384))
+RESUME_ARCHIVE_TRAIN_RECORDS = 1000
+RESUME_ARCHIVE_TRAIN_SAMPLES = 5000
+RESUME_ARCHIVE_DICT_BYTES = {'zstd': 65536, 'zlib': 32768}
+RESUME_ARCHIVE_BLOCK_CACHE = 256
+STORE_SEARCH_TOP = 100
+STORE_VECTOR_CHUNK = 5000
+
+# Standing job descriptions (requisitions) scored against every newly stored resume
+PERCOLATOR_TOP_K = 50
+PERCOLATOR_MAX_TOP_K = 1000
+# Rebuild the JD matrix once the stored pool has grown by this fraction since its IDF snapshot
+PERCOLATOR_IDF_REFRESH = 0.1
+
+# Sharded candidate pool: scoring processes reached over multiprocessing.connection
+# "host:port,host:port"; empty keeps the pool in the local SQLite store
+SHARD_ADDRESSES = os.environ.get('SHARD_ADDRESSES', '')
+# Shard messages are pickled, so there is no default key: shards and coordinators refuse to
+# start without one (--local-shards generates a random key for the shards it starts)
+SHARD_AUTHKEY = os.environ.get('SHARD_AUTHKEY', '').encode('utf-8')
+SHARD_SEARCH_TIMEOUT = float(os.environ.get('SHARD_SEARCH_TIMEOUT', 2.0))
+SHARD_INGEST_TIMEOUT = float(os.environ.get('SHARD_INGEST_TIMEOUT', 60.0))
+
+# Memoized scores and skill matches, keyed by content hashes and model/taxonomy version.
+# Bump SCORING_MODEL_VERSION whenever a code change alters scores.
+SCORING_MODEL_VERSION = 1
+SCORE_MEMO_SIZE = int(os.environ.get('SCORE_MEMO_SIZE', 200000))
+# SQLite file that keeps the memo across restarts; empty keeps it in memory only
+SCORE_MEMO_PATH = os.environ.get('SCORE_MEMO_PATH', '')
+
+# Warm restarts: hot caches and runtime structures are saved to this file periodically
+# and at shutdown, and restored in the background on startup; empty disables snapshots.
+# The default is in a per-user cache directory created readable by its owner only.
+CACHE_SNAPSHOT_PATH = os.environ.get('CACHE_SNAPSHOT_PATH', os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'resume_scanner', 'cache_snapshot.json'
+))
+CACHE_SNAPSHOT_INTERVAL = float(os.environ.get('CACHE_SNAPSHOT_INTERVAL', 300))
+CACHE_SNAPSHOT_VERSION = 3
+
+# Score explanations: computed on request only, cached per (JD, resume, feature engine)
+EXPLAIN_TOP_TERMS = 15
+EXPLAIN_CACHE_SIZE = 1024
+RESUME_TEXT_CACHE_SIZE = int(os.environ.get('RESUME_TEXT_CACHE_SIZE', 10000))
+
+# Analyzed job descriptions (tokens, skills, key terms, vector inputs) keyed by content hash.
+# The UI prepares the JD while it is being typed, so a scan usually finds it here.
+JD_CACHE_SIZE = int(os.environ.get('JD_CACHE_SIZE', 256))
+# Vectorizer settings that only shape analysis; dropped when fitting pre-analyzed terms
+ANALYSIS_PARAMS = {
+    'preprocessor': None, 'tokenizer': None, 'stop_words': None,
+    'token_pattern': None, 'ngram_range': (1, 1), 'strip_accents': None, 'lowercase': False
+}
+# TfidfVectorizer settings under which pair_tfidf_similarity equals fitting on the pair
+PAIR_TFIDF_DEFAULTS = {
+    'min_df': 1, 'max_df': 1.0, 'binary': False, 'norm': 'l2', 'use_idf': True,
+    'smooth_idf': True, 'vocabulary': None
+}
+
+# Near-duplicate detection (MinHash signatures + LSH banding)
+DEDUP_NUM_PERM = 64
+DEDUP_BANDS = 16
+DEDUP_SHINGLE_SIZE = 5
+DEDUP_THRESHOLD = float(os.environ.get('DEDUP_THRESHOLD', 0.8))
+DEDUP_MAX_ENTRIES = int(os.environ.get('DEDUP_MAX_ENTRIES', 1000000))
+MINHASH_PRIME = (1 << 31) - 1
+
+# Small stop list for picking job description key terms in the prefilter
+PREFILTER_STOP_WORDS = frozenset([
+    'and', 'the', 'for', 'with', 'you', 'our', 'are', 'will', 'have', 'has',
+    'this', 'that', 'from', 'your', 'who', 'all', 'can', 'work', 'team',
+    'experience', 'years', 'looking', 'ability', 'strong', 'knowledge',
+    'skills', 'required', 'preferred', 'plus', 'etc', 'including', 'using'
+])
+
+def _compile_section_pattern():
+    alternatives = []
+    for name, headers in SECTION_HEADERS.items():
+        # Longest synonyms first so 'work experience' wins over 'experience'
+        options = '|'.join(re.escape(h) for h in sorted(headers, key=len, reverse=True))
+        alternatives.append(f'(?P<{name}>{options})')
+    return re.compile(
+        r'^[ \t]*(?:' + '|'.join(alternatives) + r')[ \t]*(?::|$)',
+        re.IGNORECASE | re.MULTILINE
+    )
+
+
+SECTION_PATTERN = _compile_section_pattern()
+
+
+class LRUCache:
+    """Thread-safe mapping that keeps at most max_entries items, evicting the least recently used"""
+    
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+    
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+    
+    def discard_where(self, predicate):
+        """Remove every entry whose key matches predicate"""
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+    
+    def items(self):
+        """(key, value) pairs from least to most recently used"""
+        with self._lock:
+            return list(self._data.items())
+    
+    def restore(self, items):
+        """Add (key, value) pairs given oldest first, as less recently used than every current entry
+        
+        Keys that are already present keep their current value.
+        """
+        with self._lock:
+            for key, value in reversed(items):
+                if key not in self._data:
+                    self._data[key] = value
+                    self._data.move_to_end(key, last=False)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+    
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+    
+    def __len__(self):
+        return len(self._data)
+
+
+class SharedLRUCache(LRUCache):
+    """LRUCache that can also keep its entries in a SQLite table shared by several processes
+    
+    Until share() is called it is a plain in-process LRU. After that every put
+    is also written to the table, and a local miss is looked up there, so an
+    entry stored by one worker process can be read by the others. Keys are
+    strings and values are JSON. The table keeps the max_entries most recently
+    written rows.
+    """
+    
+    def __init__(self, max_entries, table):
+        super().__init__(max_entries)
+        self.table = table
+        self.path = None
+        self._local = threading.local()
+    
+    def share(self, path):
+        """Keep entries in the SQLite file at path from now on"""
+        self.path = path
+    
+    @property
+    def connection(self):
+        """One SQLite connection per thread (and process), created on first use"""
+        if getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(f'CREATE TABLE IF NOT EXISTS {self.table} (key TEXT PRIMARY KEY, value BLOB NOT NULL)')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+    
+    def get(self, key, default=None):
+        value = super().get(key)
+        if value is not None or not self.path:
+            return default if value is None else value
+        row = self.connection.execute(f'SELECT value FROM {self.table} WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return default
+        value = json.loads(row[0])
+        super().put(key, value)
+        return value
+    
+    def put(self, key, value):
+        self.put_many({key: value})
+    
+    def put_many(self, values):
+        """Store several entries, in one transaction when shared"""
+        for key, value in values.items():
+            super().put(key, value)
+        if self.path and values:
+            with self.connection:
+                # A replaced row gets a new rowid, so rowids order rows by last write
+                self.connection.executemany(
+                    f'INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)',
+                    [(key, encode_json(value)) for key, value in values.items()]
+                )
+                self.connection.execute(
+                    f'DELETE FROM {self.table} WHERE rowid <= '
+                    f'(SELECT rowid FROM {self.table} ORDER BY rowid DESC LIMIT 1 OFFSET ?)',
+                    (self.max_entries,)
+                )
+
+
+class ScoreMemo:
+    """Memoized results keyed by (kind, version, key), in an LRU with optional SQLite persistence
+    
+    Keys are content hashes, so a changed resume or job description simply
+    misses. The version covers the model and taxonomy: the first time a kind is
+    used with a new version, entries of every other version of that kind are
+    deleted from disk and from the in-memory LRU, so changing the model never
+    serves stale results. Entries of other kinds are kept.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS memo (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            version TEXT NOT NULL,
+            value TEXT NOT NULL,
+            PRIMARY KEY (kind, key)
+        ) WITHOUT ROWID;
+    """
+    
+    def __init__(self, max_entries=SCORE_MEMO_SIZE, path=SCORE_MEMO_PATH):
+        self.cache = LRUCache(max_entries)
+        self.path = path
+        self._versions = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+    
+    @property
+    def connection(self):
+        """One SQLite connection per thread, created on first use"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(self.SCHEMA)
+            self._local.connection = connection
+        return connection
+    
+    def version(self, kind, version):
+        """Register the current version of a kind, retiring results of any other version"""
+        if self._versions.get(kind) == version:
+            return version
+        with self._lock:
+            previous = self._versions.get(kind)
+            if previous == version:
+                return version
+            if previous is not None:
+                self.cache.discard_where(lambda key: key[0] == kind and key[1] != version)
+            if self.path:
+                with self.connection:
+                    self.connection.execute('DELETE FROM memo WHERE kind = ? AND version != ?', (kind, version))
+            self._versions[kind] = version
+        return version
+    
+    def get_many(self, kind, version, keys):
+        """Map of key -> value for the keys that are memoized"""
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.cache.get((kind, version, key))
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing and self.path:
+            for start in range(0, len(missing), 500):
+                part = missing[start:start + 500]
+                rows = self.connection.execute(
+                    'SELECT key, value FROM memo WHERE kind = ? AND version = ? AND key IN ({})'.format(
+                        ','.join('?' * len(part))),
+                    [kind, version] + part
+                )
+                for key, value in rows:
+                    found[key] = json.loads(value)
+                    self.cache.put((kind, version, key), found[key])
+        return found
+    
+    def put_many(self, kind, version, values):
+        for key, value in values.items():
+            self.cache.put((kind, version, key), value)
+        if self.path and values:
+            with self.connection:
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO memo (kind, key, version, value) VALUES (?, ?, ?, ?)',
+                    [(kind, key, version, json.dumps(value)) for key, value in values.items()]
+                )
+    
+    def clear(self):
+        self.cache.clear()
+        if self.path:
+            with self.connection:
+                self.connection.execute('DELETE FROM memo')
+
+
+class _TokenVocabulary(dict):
+    """token -> id; an unseen token gets the next id, its text and its feature column"""
+    
+    def __init__(self, feature):
+        import numpy as np
+        super().__init__()
+        self.feature = feature
+        self.terms = []
+        # Hashed column of each token id, -1 for tokens that are not features
+        self.features = np.empty(1024, dtype=np.int64)
+        # (id << 32 | next id) -> hashed column of the bigram
+        self.bigrams = {}
+        self.lock = threading.Lock()
+    
+    def __missing__(self, token):
+        import numpy as np
+        with self.lock:
+            token_id = dict.get(self, token)
+            if token_id is not None:
+                return token_id
+            token_id = len(self.terms)
+            if token_id == len(self.features):
+                # Readers index whichever array they fetched; every id they hold is in both
+                features = np.empty(2 * token_id, dtype=np.int64)
+                features[:token_id] = self.features
+                self.features = features
+            self.features[token_id] = self.feature(token)
+            self.terms.append(token)
+            dict.__setitem__(self, token, token_id)
+            return token_id
+    
+    def size(self):
+        return len(self.terms) + len(self.bigrams)
+    
+    def extend(self, terms, features, bigrams):
+        """Append tokens with their known feature columns, plus known bigram columns"""
+        import numpy as np
+        with self.lock:
+            start = len(self.terms)
+            if start + len(terms) > len(self.features):
+                grown = np.empty(max(2 * len(self.features), start + len(terms)), dtype=np.int64)
+                grown[:start] = self.features[:start]
+                self.features = grown
+            self.features[start:start + len(terms)] = features
+            for token_id, term in enumerate(terms, start):
+                dict.__setitem__(self, term, token_id)
+            self.terms.extend(terms)
+            self.bigrams.update(bigrams)
+
+
+class Tokenizer:
+    """Skill-aware tokenizer producing token-id arrays and hashed n-gram counts
+    
+    One precompiled pattern splits lowercased text into alphanumeric runs. The
+    punctuated skill names (c++, c#, node.js, ...) are tried first, so they stay
+    single tokens. Each distinct token gets an integer id the first time it is
+    seen, together with its feature column. A document therefore becomes one
+    int32 array, and unigram/bigram hashing works on those arrays instead of
+    on strings.
+    
+    Features follow HashingVectorizer: English stop words and one-character
+    tokens are dropped before bigrams are formed, and a term's column is the
+    murmurhash of its text. Counts match HashingVectorizer on text without
+    punctuated skill names; where HashingVectorizer split 'c++' or 'node.js'
+    into other terms, this tokenizer keeps one term, so those vectors differ.
+    Vectors are therefore tagged with TOKENIZER_VERSION, and a candidate store
+    built with another version has to be reindexed (CandidateStore.reindex).
+    
+    Skill tokens are registered first, so their ids are the same in every
+    vocabulary. Once the vocabulary (plus the bigram cache) holds
+    max_vocabulary entries, it is started over.
+    """
+    
+    def __init__(self, skills=(), n_features=HASHING_N_FEATURES, ngram_range=(1, 2),
+                 max_vocabulary=TOKENIZER_MAX_VOCABULARY):
+        if not 1 <= ngram_range[0] <= ngram_range[1] <= 2:
+            raise ValueError('Tokenizer supports unigrams and bigrams only')
+        self.skills = [skill.lower() for skill in skills]
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.max_vocabulary = max_vocabulary
+        punctuated = set(SKILL_TOKENS)
+        for skill in self.skills:
+            punctuated.update(word for word in skill.split() if not word.isalnum())
+        # Longest first, since the first matching alternative wins
+        self.pattern = re.compile('|'.join(
+            re.escape(token) + (r'(?![a-z0-9])' if token[-1].isalnum() else '')
+            for token in sorted(punctuated, key=len, reverse=True)
+        ) + '|[a-z0-9]+')
+        self._stop_words = None
+        self._murmurhash = None
+        self._vocabulary = None
+        self._skill_bits = None
+        self._skill_sequences = None
+        self._skill_ids = 0
+        self._lock = threading.Lock()
+    
+    def __repr__(self):
+        # Part of the scoring model version, so it must not vary between processes
+        return f'Tokenizer(version={TOKENIZER_VERSION}, n_features={self.n_features}, ngram_range={self.ngram_range})'
+    
+    @property
+    def stop_words(self):
+        if self._stop_words is None:
+            from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+            self._stop_words = ENGLISH_STOP_WORDS
+        return self._stop_words
+    
+    def column(self, term):
+        """Hashed feature column of a term, as HashingVectorizer computes it"""
+        if self._murmurhash is None:
+            from sklearn.utils import murmurhash3_32
+            self._murmurhash = murmurhash3_32
+        h = self._murmurhash(term, seed=0)
+        if h == -2147483648:
+            return (2147483647 - (self.n_features - 1)) % self.n_features
+        return abs(h) % self.n_features
+    
+    def _token_column(self, token):
+        if len(token) < 2 or token in self.stop_words:
+            return -1
+        return self.column(token)
+    
+    @property
+    def vocabulary(self):
+        """Current token vocabulary, replaced by a fresh one once it is full"""
+        vocabulary = self._vocabulary
+        if vocabulary is None or vocabulary.size() >= self.max_vocabulary:
+            with self._lock:
+                if self._vocabulary is None or self._vocabulary.size() >= self.max_vocabulary:
+                    self._vocabulary = self._new_vocabulary()
+                vocabulary = self._vocabulary
+        return vocabulary
+    
+    def vocabulary_state(self):
+        """(terms, feature columns, bigram columns) of the current vocabulary; None before first use"""
+        vocabulary = self._vocabulary
+        if vocabulary is None:
+            return None
+        with vocabulary.lock:
+            terms = list(vocabulary.terms)
+            return terms, vocabulary.features[:len(terms)].copy(), dict(vocabulary.bigrams)
+    
+    def restore_vocabulary(self, terms, features, bigrams):
+        """Replace the vocabulary with a saved one if it is larger; returns whether it was used
+        
+        Token ids only have to agree within one vocabulary, so swapping it does
+        not affect calls that already hold the previous one.
+        """
+        if len(terms) + len(bigrams) >= self.max_vocabulary:
+            return False
+        vocabulary = self._new_vocabulary()
+        reserved = len(vocabulary.terms)
+        if list(terms[:reserved]) != vocabulary.terms:
+            return False
+        vocabulary.extend(terms[reserved:], features[reserved:], bigrams)
+        with self._lock:
+            if self._vocabulary is not None and self._vocabulary.size() >= vocabulary.size():
+                return False
+            self._vocabulary = vocabulary
+        return True
+    
+    def _new_vocabulary(self):
+        vocabulary = _TokenVocabulary(self._token_column)
+        bits, sequences = {}, []
+        for bit, skill in enumerate(self.skills):
+            ids = tuple(vocabulary[token] for token in self.tokens(skill))
+            if len(ids) == 1:
+                bits[ids[0]] = bits.get(ids[0], 0) | 1 << bit
+            elif ids:
+                sequences.append((ids, 1 << bit))
+        # Same skills, same order: these are identical for every vocabulary
+        self._skill_bits, self._skill_sequences, self._skill_ids = bits, sequences, len(vocabulary.terms)
+        return vocabulary
+    
+    def tokens(self, text):
+        """Lowercased tokens of a text, punctuated skill names kept whole"""
+        return self.pattern.findall(text.lower())
+    
+    def words(self, text):
+        """Tokens of two or more characters: the token stream TF-IDF n-grams are built from"""
+        return [token for token in self.tokens(text) if len(token) > 1]
+    
+    def encode(self, tokens, vocabulary=None):
+        """Token ids as an int32 array (ids are only comparable within one vocabulary)"""
+        import numpy as np
+        vocabulary = vocabulary if vocabulary is not None else self.vocabulary
+        return np.fromiter(map(vocabulary.__getitem__, tokens), dtype=np.int32, count=len(tokens))
+    
+    def skill_mask(self, tokens):
+        """Integer bitset of the skills present in a token list; bit i is skills[i]"""
+        import numpy as np
+        vocabulary = self.vocabulary
+        ids = self.encode(tokens, vocabulary)
+        mask = 0
+        bits = self._skill_bits
+        for token_id in np.unique(ids[ids < self._skill_ids]).tolist():
+            mask |= bits.get(token_id, 0)
+        for sequence, bit in self._skill_sequences:
+            windows = len(ids) - len(sequence) + 1
+            if windows <= 0 or mask & bit:
+                continue
+            hit = ids[:windows] == sequence[0]
+            for offset, token_id in enumerate(sequence[1:], 1):
+                hit &= ids[offset:offset + windows] == token_id
+            if hit.any():
+                mask |= bit
+        return mask
+    
+    def hashed_counts(self, texts):
+        """Hashed term counts of texts as a CSR matrix (documents x n_features), like HashingVectorizer
+        
+        Bigram columns are looked up once per distinct (id, next id) pair of the
+        whole batch, and hashed only the first time the pair is ever seen.
+        """
+        import numpy as np
+        from scipy import sparse
+        vocabulary = self.vocabulary
+        unigrams, pairs = [], []
+        for text in texts:
+            ids = self.encode(self.tokens(text), vocabulary)
+            columns = vocabulary.features[ids]
+            kept = ids[columns >= 0]
+            unigrams.append(columns[columns >= 0] if self.ngram_range[0] == 1 else columns[:0])
+            if self.ngram_range[1] == 2 and len(kept) > 1:
+                pairs.append((kept[:-1].astype(np.int64) << 32) | kept[1:])
+            else:
+                pairs.append(np.zeros(0, dtype=np.int64))
+        
+        bigram_columns = np.zeros(0, dtype=np.int64)
+        if pairs:
+            keys, inverse = np.unique(np.concatenate(pairs), return_inverse=True)
+            bigrams, terms = vocabulary.bigrams, vocabulary.terms
+            found = []
+            for key in keys.tolist():
+                column = bigrams.get(key)
+                if column is None:
+                    column = bigrams[key] = self.column(terms[key >> 32] + ' ' + terms[key & 0xffffffff])
+                found.append(column)
+            bigram_columns = np.array(found, dtype=np.int64)[inverse.ravel()]
+        
+        parts, indptr, offset = [], [0], 0
+        for unigram, pair in zip(unigrams, pairs):
+            parts.append(unigram)
+            parts.append(bigram_columns[offset:offset + len(pair)])
+            offset += len(pair)
+            indptr.append(indptr[-1] + len(unigram) + len(pair))
+        indices = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+        counts = sparse.csr_matrix((np.ones(len(indices)), indices, indptr), shape=(len(texts), self.n_features))
+        counts.sum_duplicates()
+        return counts
+    
+    def terms(self, text):
+        """Feature terms of a text as strings: unigrams and bigrams in document order"""
+        stop_words = self.stop_words
+        words = [token for token in self.tokens(text) if len(token) > 1 and token not in stop_words]
+        terms = words if self.ngram_range[0] == 1 else []
+        if self.ngram_range[1] == 2:
+            terms = terms + [a + ' ' + b for a, b in zip(words, words[1:])]
+        return terms
+
+
+class HashedIdfTable:
+    """Document frequencies over hashed feature columns
+    
+    Kept separately from the (stateless) hashing vectorizer so vectorization can
+    run anywhere while IDF statistics are accumulated as resumes are ingested.
+    Memory is one counter per hashed feature regardless of corpus size, plus
+    the content hashes of documents counted by key, so that rescanning the
+    same resumes does not count them again.
+    """
+    
+    def __init__(self, n_features=HASHING_N_FEATURES):
+        self.n_features = n_features
+        self.n_docs = 0
+        self.keys = set()
+        self._df = None
+        self._lock = threading.Lock()
+        # Cleared while saved statistics are being restored: partial_fit waits for them
+        self.ready = threading.Event()
+        self.ready.set()
+    
+    def _local_df(self, counts):
+        import numpy as np
+        return np.bincount(counts.indices, minlength=self.n_features)
+    
+    def partial_fit(self, counts, keys=None):
+        """Add the documents of a hashed term-count matrix to the statistics
+        
+        With keys (one content hash per row), documents already counted are skipped.
+        """
+        import numpy as np
+        self.ready.wait()
+        if keys is not None:
+            with self._lock:
+                rows = []
+                for row, key in enumerate(keys):
+                    if key not in self.keys:
+                        self.keys.add(key)
+                        rows.append(row)
+            if len(rows) < counts.shape[0]:
+                counts = counts[rows]
+            if not rows:
+                return
+        local_df = self._local_df(counts)
+        with self._lock:
+            if self._df is None:
+                self._df = np.zeros(self.n_features, dtype=np.int64)
+            self._df += local_df
+            self.n_docs += counts.shape[0]
+    
+    def add_document_frequencies(self, indices, counts, n_docs, keys=()):
+        """Merge sparse document frequencies (feature indices, counts) of n_docs documents"""
+        import numpy as np
+        with self._lock:
+            self.keys.update(keys)
+            if self._df is None:
+                self._df = np.zeros(self.n_features, dtype=np.int64)
+            np.add.at(self._df, indices, counts)
+            self.n_docs += n_docs
+    
+    def merge_saved(self, indices, counts, n_docs, keys):
+        """Merge saved statistics unless some of their documents were counted since; returns whether merged
+        
+        Saved frequencies are totals that cannot be split per document, so merging
+        them over a document counted twice would inflate its terms' frequencies.
+        """
+        import numpy as np
+        with self._lock:
+            if not self.keys.isdisjoint(keys):
+                return False
+            self.keys.update(keys)
+            if self._df is None:
+                self._df = np.zeros(self.n_features, dtype=np.int64)
+            np.add.at(self._df, indices, counts)
+            self.n_docs += n_docs
+            return True
+    
+    def nonzero(self):
+        """(feature indices, document frequencies, n_docs) of the features seen so far"""
+        import numpy as np
+        with self._lock:
+            if self._df is None:
+                return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int64), self.n_docs
+            indices = np.flatnonzero(self._df).astype(np.int32)
+            return indices, self._df[indices], self.n_docs
+    
+    def idf(self, extra_counts=None):
+        """Smoothed IDF vector, optionally counting extra documents without storing them"""
+        import numpy as np
+        df = np.zeros(self.n_features, dtype=np.int64) if self._df is None else self._df.copy()
+        n_docs = self.n_docs
+        if extra_counts is not None:
+            df += self._local_df(extra_counts)
+            n_docs += extra_counts.shape[0]
+        return np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+    
+    def transform(self, counts, idf):
+        """Weight a hashed term-count matrix by IDF and L2-normalize its rows"""
+        from sklearn.preprocessing import normalize
+        return normalize(counts.multiply(idf).tocsr())
+
+
+class ScoringEngine:
+    """Interface for scoring a batch of candidates against a job description"""
+    
+    name = None
+    
+    def score(self, candidates, job_description):
+        """Return one score between 0 and 1 per candidate, in input order"""
+        raise NotImplementedError
+    
+    def params(self):
+        """Everything besides the code that determines scores; part of the memo version"""
+        return ()
+    
+    def memo_scope(self, candidates):
+        """What a score depends on besides its (JD, resume) pair
+        
+        '' means scores are a pure function of the pair, a string identifies the
+        batch statistics they depend on, and None means they cannot be memoized.
+        """
+        return None
+
+
+class CosineScoringEngine(ScoringEngine):
+    """Cosine similarity of TF-IDF vectors from the deployment's feature engine"""
+    
+    name = 'cosine'
+    
+    def __init__(self, scanner):
+        self.scanner = scanner
+    
+    def score(self, candidates, job_description):
+        return self.scanner.score_candidates(
+            [candidate['resume_text'] for candidate in candidates], job_description
         )
+    
+    def params(self):
+        return (self.scanner.feature_engine, sorted(self.scanner.vectorizer_params.items()))
+    
+    def memo_scope(self, candidates):
+        # Hashing scores move with the running IDF table, TF-IDF scores are fit per pair
+        return '' if self.scanner.feature_engine == 'tfidf' else None
+
+
+class TermFrequencyStore:
+    """Sparse per-field term-frequency arrays plus the corpus statistics BM25 needs
+    
+    Documents are added as {field: text} dicts. Each field is kept as a CSR
+    matrix (documents x vocabulary) of raw term counts together with per-document
+    field lengths, so scoring never has to re-tokenize stored documents.
+    """
+    
+    def __init__(self, tokenize, fields):
+        self.tokenize = tokenize
+        self.fields = tuple(fields)
+        self.vocabulary = {}
+        self.n_docs = 0
+        self._indices = {field: [] for field in self.fields}
+        self._counts = {field: [] for field in self.fields}
+        self._indptr = {field: [0] for field in self.fields}
+        self._lengths = {field: [] for field in self.fields}
+        self._matrices = {}
+    
+    def add(self, field_texts):
+        """Add one document and return its row number"""
+        for field in self.fields:
+            tokens = self.tokenize(field_texts.get(field) or '')
+            for term, count in Counter(tokens).items():
+                self._indices[field].append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                self._counts[field].append(count)
+            self._indptr[field].append(len(self._indices[field]))
+            self._lengths[field].append(len(tokens))
+        self._matrices.clear()
+        self.n_docs += 1
+        return self.n_docs - 1
+    
+    def matrix(self, field):
+        """Term counts of one field as a CSR matrix"""
+        if field not in self._matrices:
+            import numpy as np
+            from scipy import sparse
+            self._matrices[field] = sparse.csr_matrix(
+                (np.asarray(self._counts[field], dtype=np.float64),
+                 np.asarray(self._indices[field], dtype=np.int32),
+                 np.asarray(self._indptr[field], dtype=np.int64)),
+                shape=(self.n_docs, len(self.vocabulary))
+            )
+        return self._matrices[field]
+    
+    def lengths(self, field):
+        import numpy as np
+        return np.asarray(self._lengths[field], dtype=np.float64)
+    
+    def doc_freq(self):
+        """Number of documents containing each term in any field"""
+        import numpy as np
+        combined = self.matrix(self.fields[0])
+        for field in self.fields[1:]:
+            combined = combined + self.matrix(field)
+        combined = combined.tocsr()
+        combined.sum_duplicates()
+        return np.bincount(combined.indices, minlength=len(self.vocabulary))
+
+
+class BM25Engine(ScoringEngine):
+    """BM25F over a TermFrequencyStore, scored with sparse matrix operations
+    
+    Each field's term frequencies are length-normalized per field, weighted and
+    summed before BM25 saturation. Candidates without section data are scored
+    on the 'body' field only, which reduces to plain BM25. Raw scores are
+    divided by their upper bound (every query term fully saturated) to give
+    0-1 values.
+    """
+    
+    name = 'bm25'
+    
+    def __init__(self, scanner, k1=BM25_K1, b=BM25_B, field_weights=None):
+        self.scanner = scanner
+        self.k1 = k1
+        self.b = b
+        self.field_weights = dict(field_weights or BM25F_FIELD_WEIGHTS)
+    
+    def tokenize(self, text):
+        tokenizer = self.scanner.tokenizer
+        return [token for token in tokenizer.tokens(text) if token not in tokenizer.stop_words]
+    
+    def candidate_fields(self, candidate):
+        """Split a candidate into BM25F fields using its precomputed section offsets"""
+        text = candidate['resume_text']
+        if not candidate.get('sections'):
+            return {'body': text}
+        fields = {}
+        for name, section_text in self.scanner.section_texts(text, candidate['sections']).items():
+            field = name if name in self.field_weights else 'body'
+            if name == 'projects' and 'experience' in self.field_weights:
+                field = 'experience'
+            fields[field] = fields[field] + '\n' + section_text if field in fields else section_text
+        return fields
+    
+    def build_store(self, candidates):
+        store = TermFrequencyStore(self.tokenize, self.field_weights)
+        for candidate in candidates:
+            store.add(self.candidate_fields(candidate))
+        return store
+    
+    def score(self, candidates, job_description):
+        if not candidates:
+            return []
+        return self.score_store(self.build_store(candidates), job_description)
+    
+    def params(self):
+        return (self.k1, self.b, sorted(self.field_weights.items()))
+    
+    def memo_scope(self, candidates):
+        # Document frequencies and field lengths come from the batch itself
+        return content_hash('\n'.join(sorted(content_hash(c['resume_text']) for c in candidates)))
+    
+    def _saturate(self, tf):
+        return tf * (self.k1 + 1) / (self.k1 + tf)
+    
+    def score_store(self, store, job_description):
+        """Score every document of a store against a job description"""
+        import numpy as np
+        from scipy import sparse
+        
+        query = sorted(set(self.tokenize(job_description)))
+        if not query or not store.n_docs:
+            return [0.0] * store.n_docs
+        
+        # Lucene-style IDF, always positive; unseen terms get the maximum weight
+        df = store.doc_freq()
+        query_df = np.array([df[store.vocabulary[t]] if t in store.vocabulary else 0 for t in query])
+        idf = np.log(1.0 + (store.n_docs - query_df + 0.5) / (query_df + 0.5))
+        
+        known = [i for i, term in enumerate(query) if term in store.vocabulary]
+        columns = np.array([store.vocabulary[query[i]] for i in known], dtype=np.int64)
+        
+        combined = None
+        for field, weight in self.field_weights.items():
+            lengths = store.lengths(field)
+            average = max(lengths.mean(), 1.0)
+            norm = weight / (1.0 - self.b + self.b * lengths / average)
+            part = sparse.diags(norm) @ store.matrix(field)[:, columns]
+            combined = part if combined is None else combined + part
+        combined = sparse.csr_matrix(combined)
+        combined.data = self._saturate(combined.data)
+        raw_scores = combined @ idf[known]
+        
+        # Saturation is bounded by k1 + 1, which bounds the score of any document
+        best = float(np.sum(idf)) * (self.k1 + 1)
+        return [min(float(score) / best, 1.0) if best > 0 else 0.0 for score in raw_scores]
+
+
+class ResumeScanner:
+    def __init__(self, feature_engine=None):
+        self.feature_engine = feature_engine or FEATURE_ENGINE
+        if self.feature_engine not in FEATURE_ENGINES:
+            raise ValueError(f"Unknown feature engine: {self.feature_engine}")
+        
+        self.vectorizer_params = {
+            'stop_words': 'english',
+            'lowercase': True,
+            'max_features': 1000,
+            'ngram_range': (1, 2)
+        }
+        self._vectorizer = None
+        
+        # Feature hashing: fixed width, no vocabulary and nothing to fit. Counts are
+        # computed by the shared tokenizer with HashingVectorizer's feature columns
+        self.hashing_params = {
+            'ngram_range': (1, 2),
+            'n_features': HASHING_N_FEATURES
+        }
+        self.idf_table = HashedIdfTable(self.hashing_params['n_features'])
+        
+        # Extracted text and section offsets keyed by file content hash
+        self.extraction_cache = LRUCache(EXTRACTION_CACHE_SIZE)
+        # Callable (filename, bytes) -> text used for parsing; None parses in-process
+        self.text_extractor = None
+        self.explanation_cache = LRUCache(EXPLAIN_CACHE_SIZE)
+        self.job_description_cache = LRUCache(JD_CACHE_SIZE)
+        # Scores and skill matches of earlier scans; None disables memoization
+        self.score_memo = ScoreMemo() if SCORE_MEMO_SIZE else None
+        
+        # Scoring engines selectable per request
+        self.scoring_engines = {
+            'cosine': CosineScoringEngine(self),
+            'bm25': BM25Engine(self)
+        }
         
         # Predefined skill categories
         self.skill_keywords = {
@@ -44,94 +1092,3235 @@ class ResumeScanner:
                 'analytical', 'creative', 'adaptable', 'organized'
             ]
         }
+        
+        # Flat skill list; bit i of a skill bitmask is set when _all_skills[i] is present
+        self._all_skills = [
+            skill.lower() for skills in self.skill_keywords.values() for skill in skills
+        ]
+        
+        # One tokenizer for skill matching, TF-IDF n-grams and hashed counts
+        self.tokenizer = Tokenizer(self._all_skills, **self.hashing_params)
+        if 'tokenizer' not in self.vectorizer_params:
+            self.vectorizer_params.update(tokenizer=self.tokenizer.words, token_pattern=None)
+    
+    @property
+    def vectorizer(self):
+        """TfidfVectorizer built from vectorizer_params on first use"""
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            self._vectorizer = TfidfVectorizer(**self.vectorizer_params)
+        return self._vectorizer
+    
+    @vectorizer.setter
+    def vectorizer(self, vectorizer):
+        self._vectorizer = vectorizer
+        # Prepared job descriptions hold terms produced by the old vectorizer's analyzer
+        self.job_description_cache.clear()
+    
+    def _pair_scorer(self):
+        """Function (resume term counts, JD term counts) -> cosine similarity of the vectorizer fit on the pair
+        
+        A TfidfVectorizer with default document-frequency, IDF and norm settings is
+        reproduced directly from the counts, skipping sklearn's per-fit overhead;
+        any other vectorizer is fitted on each pair of pre-analyzed documents.
+        """
+        import numpy as np
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        vectorizer = self.vectorizer
+        params = vectorizer.get_params(deep=False)
+        if type(vectorizer) is TfidfVectorizer and all(
+            params[name] == value for name, value in PAIR_TFIDF_DEFAULTS.items()
+        ) and params['dtype'] is np.float64:
+            return functools.partial(
+                pair_tfidf_similarity, max_features=params['max_features'], sublinear_tf=params['sublinear_tf']
+            )
+        
+        pair_vectorizer = type(vectorizer)(**dict(params, **ANALYSIS_PARAMS, analyzer=_pre_analyzed))
+        
+        def fitted_similarity(resume_counts, jd_counts):
+            from sklearn.metrics.pairwise import cosine_similarity
+            try:
+                tfidf_matrix = pair_vectorizer.fit_transform(
+                    [list(resume_counts.elements()), list(jd_counts.elements())]
+                )
+            except ValueError:
+                # Empty vocabulary, e.g. nothing but stop words
+                return 0.0
+            return float(cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0])
+        return fitted_similarity
+    
+    def prepare_job_description(self, job_description):
+        """Analyze a job description once for every ranking stage, cached by content hash
+        
+        Holds its tokens, skill bitmask, skills, prefilter key terms, hashed counts
+        and (for the TF-IDF engine) analyzed terms. Nothing in it depends on the
+        resumes, so it can be built before the scan arrives.
+        """
+        key = content_hash(job_description)
+        prepared = self.job_description_cache.get(key)
+        if prepared is not None:
+            return prepared
+        
+        tokens = self.tokenizer.tokens(job_description)
+        prepared = {
+            'hash': key,
+            'tokens': tokens,
+            'skill_mask': self.tokenizer.skill_mask(tokens),
+            'skills': self.extract_skills(job_description),
+            'key_terms': self._key_terms(tokens),
+            'counts': self.hashed_counts([job_description]),
+            'term_counts': None
+        }
+        if self.feature_engine == 'tfidf':
+            prepared['term_counts'] = Counter(self.vectorizer.build_analyzer()(job_description))
+        self.job_description_cache.put(key, prepared)
+        return prepared
+    
+    def hashed_counts(self, texts):
+        """Hashed unigram/bigram term counts of raw texts (documents x n_features CSR matrix)"""
+        return self.tokenizer.hashed_counts(texts)
     
     def extract_text_from_pdf(self, file_content):
-        """Extract text from PDF file"""
+        """Extract text from PDF file (at most EXTRACT_MAX_PAGES pages and EXTRACT_MAX_CHARS characters)"""
+        if pdf_nesting_depth(file_content, EXTRACT_MAX_NESTING) > EXTRACT_MAX_NESTING:
+            return f"Error reading PDF: objects nested deeper than {EXTRACT_MAX_NESTING} levels"
         try:
+            import PyPDF2
             pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-            return text
+            parts = []
+            length = 0
+            for page_number, page in enumerate(pdf_reader.pages):
+                if page_number >= EXTRACT_MAX_PAGES or length >= EXTRACT_MAX_CHARS:
+                    break
+                parts.append(page.extract_text())
+                length += len(parts[-1])
+            return "".join(parts)[:EXTRACT_MAX_CHARS]
+        except MemoryError:
+            raise
         except Exception as e:
             return f"Error reading PDF: {str(e)}"
     
     def extract_text_from_docx(self, file_content):
-        """Extract text from DOCX file"""
+        """Extract text from DOCX file (at most EXTRACT_MAX_CHARS characters)"""
         try:
+            import docx
             doc = docx.Document(io.BytesIO(file_content))
-            text = ""
+            parts = []
+            length = 0
             for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+                if length >= EXTRACT_MAX_CHARS:
+                    break
+                parts.append(paragraph.text + "\n")
+                length += len(parts[-1])
+            return "".join(parts)[:EXTRACT_MAX_CHARS]
+        except MemoryError:
+            raise
         except Exception as e:
             return f"Error reading DOCX: {str(e)}"
     
-    def preprocess_text(self, text):
-        """Clean and preprocess text"""
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove special characters and extra whitespace
-        text = re.sub(r'[^a-zA-Z0-9\s]', ' ', text)
-        text = re.sub(r'\s+', ' ', text)
-        
-        return text.strip()
+    def extract_text(self, filename, file_content):
+        """Raw text of a PDF or DOCX file, or None for unsupported file types"""
+        if filename.lower().endswith('.pdf'):
+            return self.extract_text_from_pdf(file_content)
+        elif filename.lower().endswith('.docx'):
+            return self.extract_text_from_docx(file_content)
+        return None
+    
+    def extract_resume(self, filename, file_content):
+        """Extract text and section offsets from an uploaded resume file
+        
+        Returns {'text': ..., 'sections': [[name, start, end], ...]} or None for
+        unsupported files and files without text. Results are cached by content
+        hash, so re-uploading the same file skips parsing and segmentation.
+        Raises ExtractionFailed when the file is malformed (truncated, corrupt or
+        too deeply nested to parse) or breaks a size or resource limit.
+        """
+        key = content_hash(file_content)
+        cached = self.extraction_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        if len(file_content) > EXTRACT_MAX_BYTES:
+            raise ExtractionFailed('file exceeds the size limit')
+        text = (self.text_extractor or self.extract_text)(filename, file_content)
+        if text and text.startswith(('Error reading PDF:', 'Error reading DOCX:')):
+            raise ExtractionFailed(text)
+        if not text:
+            return None
+        
+        extracted = {'text': text, 'sections': self.segment_sections(text)}
+        self.extraction_cache.put(key, extracted)
+        return extracted
+    
+    def segment_sections(self, text):
+        """Split a resume into sections in one pass over its header lines
+        
+        Returns [name, start, end] character ranges of each section's body. Text
+        before the first recognised header is the 'header' section.
+        """
+        sections = []
+        name, start = 'header', 0
+        for match in SECTION_PATTERN.finditer(text):
+            if match.start() > start or name != 'header':
+                sections.append([name, start, match.start()])
+            name, start = match.lastgroup, match.end()
+        sections.append([name, start, len(text)])
+        return sections
+    
+    def section_texts(self, text, sections):
+        """Join the text of each section name from precomputed offsets"""
+        texts = {}
+        for name, start, end in sections:
+            texts[name] = texts[name] + '\n' + text[start:end] if name in texts else text[start:end]
+        return texts
+    
+    def weighted_skills(self, text, sections):
+        """Map each skill found to the weight of the most important section mentioning it"""
+        weights = {}
+        for name, section_text in self.section_texts(text, sections).items():
+            weight = SECTION_WEIGHTS.get(name, 0.5)
+            mask = self.tokenizer.skill_mask(self.tokenizer.tokens(section_text))
+            bit = 0
+            while mask:
+                if mask & 1:
+                    skill = self._all_skills[bit]
+                    weights[skill] = max(weights.get(skill, 0.0), weight)
+                mask >>= 1
+                bit += 1
+        return weights
+    
+    def preprocess_text(self, text):
+        """Clean and preprocess text"""
+        # Convert to lowercase
+        text = text.lower()
+        
+        # Remove special characters and extra whitespace
+        text = re.sub(r'[^a-zA-Z0-9\s]', ' ', text)
+        text = re.sub(r'\s+', ' ', text)
+        
+        return text.strip()
+    
+    def taxonomy_version(self):
+        return content_hash(json.dumps([TOKENIZER_VERSION, self.skill_keywords], sort_keys=True))
+    
+    def model_version(self, engine):
+        """Version of a scoring engine's results: code version, engine parameters and skill taxonomy"""
+        return content_hash(repr((SCORING_MODEL_VERSION, engine.name, engine.params(), self.taxonomy_version())))
+    
+    def extract_skills(self, text):
+        """Extract skills from resume text (memoized by text hash and taxonomy version)"""
+        if self.score_memo is None:
+            return self._extract_skills(text)
+        version = self.score_memo.version('skills', self.taxonomy_version())
+        key = content_hash(text)
+        skills = self.score_memo.get_many('skills', version, [key]).get(key)
+        if skills is None:
+            skills = self._extract_skills(text)
+            self.score_memo.put_many('skills', version, {key: skills})
+        return skills
+    
+    def _extract_skills(self, text):
+        # Skills are matched as whole tokens (or token sequences), bit i being _all_skills[i]
+        mask = self.tokenizer.skill_mask(self.tokenizer.tokens(text))
+        found_skills = {}
+        
+        bit = 0
+        for category, skills in self.skill_keywords.items():
+            found_skills[category] = []
+            for skill in skills:
+                if mask >> bit & 1:
+                    found_skills[category].append(skill)
+                bit += 1
+        
+        return found_skills
+    
+    def extract_contact_info(self, text):
+        """Extract contact information from resume
+        
+        Emails, phone numbers and LinkedIn/GitHub/other links are matched by one
+        precompiled pattern over the header region, falling back to the rest of the text when no
+        email or phone is found there. Values are normalized (lowercase emails,
+        E.164-style phones, https URLs) and deduplicated in order of appearance.
+        """
+        contacts = {'emails': [], 'phones': [], 'linkedin': [], 'github': [], 'urls': []}
+        
+        boundary = WHITESPACE_PATTERN.search(text, CONTACT_HEADER_CHARS)
+        cut = boundary.start() if boundary else len(text)
+        self._scan_contacts(text[:cut], contacts)
+        if cut < len(text) and not (contacts['emails'] or contacts['phones']):
+            self._scan_contacts(text[cut:], contacts)
+        return contacts
+    
+    def _scan_contacts(self, text, contacts):
+        for line in text.splitlines():
+            # Most lines hold no '@', '/', 'www.' or digit and are skipped without running the full pattern
+            if CONTACT_HINT_PATTERN.search(line):
+                self._match_contacts(line, contacts)
+    
+    def _match_contacts(self, line, contacts):
+        for match in CONTACT_PATTERN.finditer(line):
+            kind = match.lastgroup
+            value = match.group(kind)
+            if kind == 'email':
+                key, value = 'emails', value.lower()
+            elif kind == 'phone':
+                key, value = 'phones', normalize_phone(value)
+            else:
+                value = normalize_url(value)
+                host = value.split('/')[2]
+                key = 'linkedin' if host.endswith('linkedin.com') else 'github' if host.endswith('github.com') else 'urls'
+            if value and value not in contacts[key]:
+                contacts[key].append(value)
+    
+    def calculate_similarity(self, resume_text, job_description):
+        """Calculate similarity between resume and job description using TF-IDF and cosine similarity"""
+        documents = [resume_text, job_description]
+        
+        try:
+            if self.feature_engine == 'hashing':
+                counts = self.hashed_counts(documents)
+                tfidf_matrix = self.idf_table.transform(counts, self.idf_table.idf(counts))
+                return float(tfidf_matrix[0].multiply(tfidf_matrix[1]).sum())
+            jd_counts = self.prepare_job_description(job_description)['term_counts']
+            resume_counts = Counter(self.vectorizer.build_analyzer()(resume_text))
+            return self._pair_scorer()(resume_counts, jd_counts)
+        except Exception as e:
+            return 0.0
+    
+    def explain(self, resume_text, job_description, top_terms=EXPLAIN_TOP_TERMS):
+        """Break a cosine similarity score down into per-term contributions and skill matches
+        
+        Each term's contribution is the product of its normalized TF-IDF weights in
+        the resume and the job description, so contributions sum to the score.
+        Nothing here runs during ranking; results are cached per content pair.
+        """
+        key = (content_hash(job_description), content_hash(resume_text), self.feature_engine, top_terms)
+        cached = self.explanation_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        documents = [resume_text, job_description]
+        if self.feature_engine == 'hashing':
+            terms = self._explain_hashed(documents)
+        else:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            vectorizer = TfidfVectorizer(**self.vectorizer_params)
+            try:
+                matrix = vectorizer.fit_transform(documents).tocsc()
+            except ValueError:
+                matrix = None
+            terms = []
+            if matrix is not None:
+                names = vectorizer.get_feature_names_out()
+                resume_weights = matrix[0].toarray().ravel()
+                jd_weights = matrix[1].toarray().ravel()
+                for column in (resume_weights * jd_weights).nonzero()[0]:
+                    terms.append((names[column], resume_weights[column], jd_weights[column]))
+        
+        contributions = sorted(
+            ({'term': term, 'resume_weight': round(float(r), 4), 'jd_weight': round(float(j), 4),
+              'contribution': float(r * j)} for term, r, j in terms),
+            key=lambda item: item['contribution'], reverse=True
+        )
+        score = sum(item['contribution'] for item in contributions)
+        for item in contributions:
+            item['contribution'] = round(item['contribution'], 4)
+        
+        resume_skills = self.extract_skills(resume_text)
+        jd_skills = self.prepare_job_description(job_description)['skills']
+        explanation = {
+            'similarity_score': score,
+            'percentage_match': round(score * 100, 2),
+            'top_terms': contributions[:top_terms],
+            'matched_skills': {
+                category: [skill for skill in skills if skill in resume_skills[category]]
+                for category, skills in jd_skills.items()
+            },
+            'missing_skills': {
+                category: [skill for skill in skills if skill not in resume_skills[category]]
+                for category, skills in jd_skills.items()
+            }
+        }
+        self.explanation_cache.put(key, explanation)
+        return explanation
+    
+    def _explain_hashed(self, documents):
+        """(term, resume weight, JD weight) for terms shared in hashed feature space"""
+        counts = self.hashed_counts(documents)
+        matrix = self.idf_table.transform(counts, self.idf_table.idf(counts)).tocsc()
+        shared = set(self.tokenizer.terms(documents[0])) & set(self.tokenizer.terms(documents[1]))
+        # Hashed columns have no names: map the shared terms back to their columns,
+        # keeping one term per column so colliding terms are not counted twice
+        columns = {}
+        for term in sorted(shared):
+            columns.setdefault(self.tokenizer.column(term), term)
+        return [(term, matrix[0, column], matrix[1, column]) for column, term in columns.items()]
+    
+    def scoring_engine(self, name=None):
+        """Look up a scoring engine by name"""
+        name = name or DEFAULT_SCORING_ENGINE
+        if name not in self.scoring_engines:
+            raise ValueError(f"Unknown scoring engine: {name}")
+        return self.scoring_engines[name]
+    
+    def similarity(self, resume_text, job_description, engine=None):
+        """Score a single resume with the given scoring engine"""
+        if (engine or DEFAULT_SCORING_ENGINE) == 'cosine':
+            return self.calculate_similarity(resume_text, job_description)
+        candidate = {
+            'filename': '',
+            'resume_text': resume_text,
+            'sections': self.segment_sections(resume_text)
+        }
+        return self.scoring_engine(engine).score([candidate], job_description)[0]
+    
+    def score_candidates(self, resume_texts, job_description):
+        """Similarity of each resume to the job description, in input order
+        
+        The hashing engine vectorizes the whole batch at once, adds resumes it has
+        not seen before to the IDF table and scores the batch with a single sparse
+        product, so scanning the same resumes again gives the same scores; the TF-IDF engine
+        compares each resume to the job description separately, analyzing the
+        job description only once.
+        """
+        prepared = self.prepare_job_description(job_description)
+        if self.feature_engine != 'hashing':
+            analyzer = self.vectorizer.build_analyzer()
+            pair_similarity = self._pair_scorer()
+            return [pair_similarity(Counter(analyzer(text)), prepared['term_counts']) for text in resume_texts]
+        if not resume_texts:
+            return []
+        
+        counts = self.hashed_counts(resume_texts)
+        self.idf_table.partial_fit(counts, keys=[content_hash(text) for text in resume_texts])
+        idf = self.idf_table.idf()
+        resumes = self.idf_table.transform(counts, idf)
+        jd = self.idf_table.transform(prepared['counts'], idf)
+        return [float(score) for score in resumes.dot(jd.T).toarray().ravel()]
+    
+    def key_terms(self, job_description, limit=CASCADE_KEY_TERMS):
+        """Pick the most frequent informative terms of a job description"""
+        return self._key_terms(self.prepare_job_description(job_description)['tokens'], limit)
+    
+    def _key_terms(self, tokens, limit=CASCADE_KEY_TERMS):
+        words = [word for word in tokens if len(word) > 2 and word not in PREFILTER_STOP_WORDS]
+        return {word for word, _ in Counter(words).most_common(limit)}
+    
+    def prefilter_candidates(self, candidates, job_description,
+                             top_n=CASCADE_TOP_N, min_score=CASCADE_MIN_PREFILTER_SCORE):
+        """Stage 1 of cascaded ranking: cut the pool using cheap skill and key-term overlap
+        
+        Returns (kept, dropped_by_threshold, dropped_by_top_n).
+        """
+        prepared = self.prepare_job_description(job_description)
+        jd_mask = prepared['skill_mask']
+        jd_skill_count = bin(jd_mask).count('1')
+        key_terms = prepared['key_terms']
+        
+        scored = []
+        dropped_by_threshold = 0
+        for candidate in candidates:
+            tokens = self.tokenizer.tokens(candidate['resume_text'])
+            skill_overlap = 0.0
+            if jd_skill_count and candidate.get('sections'):
+                # Skills only mentioned in e.g. hobbies count for less
+                weights = self.weighted_skills(candidate['resume_text'], candidate['sections'])
+                skill_overlap = sum(
+                    weights.get(skill, 0.0) for bit, skill in enumerate(self._all_skills)
+                    if jd_mask >> bit & 1
+                ) / jd_skill_count
+            elif jd_skill_count:
+                skill_overlap = bin(self.tokenizer.skill_mask(tokens) & jd_mask).count('1') / jd_skill_count
+            term_overlap = 0.0
+            if key_terms:
+                term_overlap = len(key_terms.intersection(tokens)) / len(key_terms)
+            
+            if jd_skill_count and key_terms:
+                prefilter_score = 0.6 * skill_overlap + 0.4 * term_overlap
+            else:
+                prefilter_score = skill_overlap or term_overlap
+            
+            if prefilter_score < min_score:
+                dropped_by_threshold += 1
+                continue
+            candidate['prefilter_score'] = round(prefilter_score, 4)
+            scored.append(candidate)
+        
+        scored.sort(key=lambda x: x['prefilter_score'], reverse=True)
+        kept = scored[:top_n] if top_n else scored
+        return kept, dropped_by_threshold, len(scored) - len(kept)
+    
+    def memoized_scores(self, scoring_engine, candidates, job_description):
+        """Scores of the candidates, reusing earlier results for unchanged (JD, resume) pairs
+        
+        Returns (scores, number of memo hits). Engines whose scores depend on the
+        batch are memoized per batch, so only an identical batch is a hit.
+        """
+        memo = self.score_memo
+        scope = scoring_engine.memo_scope(candidates) if memo is not None else None
+        if scope is None or not candidates:
+            return scoring_engine.score(candidates, job_description), 0
+        
+        kind = 'score:' + scoring_engine.name
+        version = memo.version(kind, self.model_version(scoring_engine))
+        prefix = content_hash(job_description) + scope + ':'
+        keys = [prefix + content_hash(candidate['resume_text']) for candidate in candidates]
+        found = memo.get_many(kind, version, keys)
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        if missing:
+            # Batch-dependent scores are only valid together, so a partial hit rescores all
+            if scope:
+                missing = list(range(len(candidates)))
+            computed = scoring_engine.score([candidates[i] for i in missing], job_description)
+            computed = {keys[i]: float(score) for i, score in zip(missing, computed)}
+            memo.put_many(kind, version, computed)
+            found.update(computed)
+        return [found[key] for key in keys], len(candidates) - len(missing)
+    
+    def rank_candidates(self, candidates, job_description, cascade=False,
+                        top_n=CASCADE_TOP_N, min_prefilter_score=CASCADE_MIN_PREFILTER_SCORE,
+                        stats=None, engine=None):
+        """Rank candidates based on their similarity to job description
+        
+        engine selects the scoring engine ('cosine' or 'bm25'). With cascade=True
+        a cheap prefilter first cuts the pool to at most top_n candidates and only
+        those are scored exactly. If a stats dict is passed it is filled with
+        per-stage counts and timings.
+        """
+        scoring_engine = self.scoring_engine(engine)
+        total = len(candidates)
+        stage1_seconds = 0.0
+        dropped_by_threshold = dropped_by_top_n = 0
+        
+        if cascade:
+            start = time.perf_counter()
+            candidates, dropped_by_threshold, dropped_by_top_n = self.prefilter_candidates(
+                candidates, job_description, top_n=top_n, min_score=min_prefilter_score
+            )
+            stage1_seconds = time.perf_counter() - start
+        
+        ranked_candidates = []
+        
+        start = time.perf_counter()
+        scores, memo_hits = self.memoized_scores(scoring_engine, candidates, job_description)
+        for candidate, similarity_score in zip(candidates, scores):
+            candidate['similarity_score'] = float(similarity_score)
+            candidate['percentage_match'] = round(float(similarity_score) * 100, 2)
+            ranked_candidates.append(candidate)
+        stage2_seconds = time.perf_counter() - start
+        
+        # Sort by similarity score in descending order
+        ranked_candidates.sort(key=lambda x: x['similarity_score'], reverse=True)
+        
+        if stats is not None:
+            dropped = dropped_by_threshold + dropped_by_top_n
+            per_candidate = stage2_seconds / len(ranked_candidates) if ranked_candidates else 0.0
+            stats.update({
+                'engine': scoring_engine.name,
+                'cascade': cascade,
+                'input_candidates': total,
+                'stage1_dropped_below_threshold': dropped_by_threshold,
+                'stage1_dropped_beyond_top_n': dropped_by_top_n,
+                'stage2_scored': len(ranked_candidates),
+                'stage2_memo_hits': memo_hits,
+                'stage1_seconds': round(stage1_seconds, 4),
+                'stage2_seconds': round(stage2_seconds, 4),
+                'estimated_seconds_saved': round(max(per_candidate * dropped - stage1_seconds, 0.0), 4)
+            })
+        
+        return ranked_candidates
+
+def normalize_phone(raw, default_country_code=DEFAULT_PHONE_COUNTRY_CODE):
+    """Normalize a phone number to E.164 style (+<country><number>), or None if implausible"""
+    digits = re.sub(r'\D', '', raw)
+    stripped = raw.lstrip()
+    if stripped.startswith('+'):
+        international = True
+    elif stripped.startswith('00'):
+        international, digits = True, digits[2:]
+    else:
+        international = False
+    
+    if international:
+        return '+' + digits if 8 <= len(digits) <= 15 else None
+    if len(digits) == 10:
+        return '+' + default_country_code + digits
+    # A bare 11-digit run is more likely an ID than a phone: require separators
+    if len(digits) == 11 and digits.startswith(default_country_code) and len(digits) < len(raw.strip()):
+        return '+' + digits
+    return None
+
+
+def normalize_url(raw):
+    """Normalize a matched link to https://host/path with a lowercase host"""
+    url = raw.rstrip('.,;:!?')
+    url = re.sub(r'^https?://', '', url, flags=re.IGNORECASE)
+    host, _, path = url.partition('/')
+    host = host.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    path = path.rstrip('/')
+    return 'https://' + host + ('/' + path if path else '')
+
+
+def pdf_nesting_depth(data, limit=None):
+    """Deepest nesting of arrays and dictionaries in a PDF's objects, skipping stream data
+    
+    Stops counting once limit is exceeded.
+    """
+    depth = deepest = 0
+    for part in PDF_STREAM_PATTERN.split(data):
+        for token in PDF_NESTING_PATTERN.findall(part):
+            if token == b'[' or token == b'<<':
+                depth += 1
+                if depth > deepest:
+                    deepest = depth
+                    if limit is not None and deepest > limit:
+                        return deepest
+            elif depth:
+                depth -= 1
+    return deepest
+
+
+def content_hash(data):
+    """Stable hex digest used to key resumes and job descriptions by content"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha1(data).hexdigest()
+
+
+def _pre_analyzed(terms):
+    """Analyzer for documents that are already lists of terms"""
+    return terms
+
+
+@functools.lru_cache(maxsize=1)
+def _pair_idf():
+    """Smoothed IDF of a term in one or in both documents of a two-document fit, as sklearn computes it"""
+    import numpy as np
+    idf = np.log(np.array([3.0, 3.0]) / np.array([2.0, 3.0])) + 1.0
+    return float(idf[0]), float(idf[1])
+
+
+def pair_tfidf_similarity(counts_a, counts_b, max_features=None, sublinear_tf=False):
+    """Cosine similarity of two documents under a TfidfVectorizer fitted on just the pair
+    
+    Takes the term counts of both analyzed documents. Keeps the max_features
+    most frequent terms (ties broken by the same argsort over the sorted
+    vocabulary as sklearn), weights by smoothed IDF and L2-normalizes, so the
+    result equals fit_transform plus cosine_similarity up to float rounding.
+    """
+    terms = counts_a.keys() | counts_b.keys()
+    if not terms:
+        return 0.0
+    if max_features is not None and len(terms) > max_features:
+        import numpy as np
+        terms = sorted(terms)
+        totals = np.array([counts_a.get(term, 0) + counts_b.get(term, 0) for term in terms], dtype=np.float64)
+        terms = [terms[i] for i in (-totals).argsort()[:max_features]]
+    
+    idf_one, idf_both = _pair_idf()
+    dot = norm_a = norm_b = 0.0
+    for term in terms:
+        a = counts_a.get(term, 0)
+        b = counts_b.get(term, 0)
+        if sublinear_tf:
+            a = 1.0 + math.log(a) if a else 0.0
+            b = 1.0 + math.log(b) if b else 0.0
+        if a and b:
+            a *= idf_both
+            b *= idf_both
+            dot += a * b
+        else:
+            a *= idf_one
+            b *= idf_one
+        norm_a += a * a
+        norm_b += b * b
+    if not dot:
+        return 0.0
+    return dot / math.sqrt(norm_a * norm_b)
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index that groups near-duplicate resumes at ingest
+    
+    Each resume is reduced to a fixed-size MinHash signature over word shingles
+    of its preprocessed text. Signatures are split into bands and every band is
+    hashed into a bucket, so a lookup only compares against resumes sharing at
+    least one bucket instead of the whole pool. Memory is bounded: once more than
+    max_entries groups are stored the least recently seen ones are evicted.
+    """
+    
+    def __init__(self, preprocess, num_perm=DEDUP_NUM_PERM, bands=DEDUP_BANDS,
+                 shingle_size=DEDUP_SHINGLE_SIZE, threshold=DEDUP_THRESHOLD,
+                 max_entries=DEDUP_MAX_ENTRIES, seed=1):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        self.preprocess = preprocess
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.seed = seed
+        self._a = self._b = None           # permutation coefficients, drawn on first use
+        
+        self._signatures = OrderedDict()   # group id -> signature, in recency order
+        self._bands = {}                   # group id -> band bucket keys
+        self._buckets = {}                 # band bucket key -> set of group ids
+        self._lock = threading.Lock()
+    
+    def _permutations(self):
+        import numpy as np
+        if self._a is None:
+            rng = np.random.RandomState(self.seed)
+            self._a = rng.randint(1, MINHASH_PRIME, size=self.num_perm).astype(np.uint64)
+            self._b = rng.randint(0, MINHASH_PRIME, size=self.num_perm).astype(np.uint64)
+        return self._a, self._b
+    
+    def signature(self, text):
+        """Compute the MinHash signature of a resume"""
+        import numpy as np
+        a, b = self._permutations()
+        words = self.preprocess(text).split()
+        k = self.shingle_size
+        if len(words) <= k:
+            shingles = {' '.join(words)}
+        else:
+            shingles = {' '.join(words[i:i + k]) for i in range(len(words) - k + 1)}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) & MINHASH_PRIME for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        # (a * x + b) mod p stays below 2**63 because a, b, x < 2**31
+        permuted = (np.outer(a, hashes) + b[:, None]) % MINHASH_PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+    
+    def _band_keys(self, signature):
+        return [
+            hash((band, signature[band * self.rows:(band + 1) * self.rows].tobytes()))
+            for band in range(self.bands)
+        ]
+    
+    def add(self, key, text):
+        """Index a resume and return the group id it belongs to
+        
+        The group id is the key of the first resume seen in the group, so a
+        return value different from key means text is a near duplicate.
+        """
+        # A resume that is already indexed (an unchanged re-scan) needs no signature
+        with self._lock:
+            if key in self._signatures:
+                self._signatures.move_to_end(key)
+                return key
+        
+        signature = self.signature(text)
+        band_keys = self._band_keys(signature)
+        
+        with self._lock:
+            if key in self._signatures:
+                self._signatures.move_to_end(key)
+                return key
+            
+            best_group, best_similarity = None, self.threshold
+            seen = set()
+            for band_key in band_keys:
+                for group in self._buckets.get(band_key, ()):
+                    if group in seen:
+                        continue
+                    seen.add(group)
+                    similarity = float((self._signatures[group] == signature).mean())
+                    if similarity >= best_similarity:
+                        best_group, best_similarity = group, similarity
+            
+            if best_group is not None:
+                self._signatures.move_to_end(best_group)
+                return best_group
+            
+            self._signatures[key] = signature
+            self._bands[key] = band_keys
+            for band_key in band_keys:
+                self._buckets.setdefault(band_key, set()).add(key)
+            
+            while len(self._signatures) > self.max_entries:
+                self._evict_oldest()
+            return key
+    
+    def _evict_oldest(self):
+        group, _ = self._signatures.popitem(last=False)
+        for band_key in self._bands.pop(group):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(group)
+                if not bucket:
+                    del self._buckets[band_key]
+    
+    def __len__(self):
+        return len(self._signatures)
+
+
+def collapse_duplicates(candidates, index):
+    """Collapse near-duplicate candidates onto the first one of each group
+    
+    Duplicates are not returned for scoring; their filenames are listed under
+    the representative's 'duplicates' key instead.
+    """
+    representatives = {}
+    unique = []
+    for candidate in candidates:
+        text = candidate['resume_text']
+        group = index.add(content_hash(text), text)
+        representative = representatives.get(group)
+        if representative is None:
+            candidate['duplicates'] = []
+            representatives[group] = candidate
+            unique.append(candidate)
+        else:
+            representative['duplicates'].append(candidate['filename'])
+    return unique
+
+
+_extraction_pool = None
+_extraction_pool_pid = None
+
+
+def get_extraction_pool():
+    """Thread pool for text extraction, created on first use in each process"""
+    global _extraction_pool, _extraction_pool_pid
+    # A pool inherited through fork has no live threads, so pre-fork workers build their own
+    if _extraction_pool is None or _extraction_pool_pid != os.getpid():
+        from concurrent.futures import ThreadPoolExecutor
+        _extraction_pool = ThreadPoolExecutor(max_workers=EXTRACTION_WORKERS)
+        _extraction_pool_pid = os.getpid()
+    return _extraction_pool
+
+
+class ExtractionFailed(Exception):
+    """A document could not be extracted within its size or resource limits"""
+
+
+def _rss_bytes(pid):
+    try:
+        with open(f'/proc/{pid}/statm') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _sandbox_worker(fd, cpu_seconds, memory_mb):
+    """Extraction worker process: parse (filename, bytes) tasks from the connection on fd until it closes
+    
+    The address space is capped at its size after start-up plus memory_mb, and
+    before each task the CPU limit is moved to cpu_seconds past the time used
+    so far, so a runaway parse is killed by SIGXCPU.
+    """
+    import resource
+    import signal
+    from multiprocessing.connection import Connection
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    conn = Connection(fd)
+    with open('/proc/self/statm') as fh:
+        virtual = int(fh.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    resource.setrlimit(resource.RLIMIT_AS, (virtual + memory_mb * 1024 * 1024, resource.RLIM_INFINITY))
+    
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        filename, file_content = task
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        used = int(usage.ru_utime + usage.ru_stime)
+        resource.setrlimit(resource.RLIMIT_CPU, (used + cpu_seconds + 1, resource.RLIM_INFINITY))
+        try:
+            reply = ('ok', scanner.extract_text(filename, file_content))
+        except MemoryError:
+            reply = ('memory', 'memory limit exceeded')
+        except Exception as e:
+            reply = ('error', str(e))
+        conn.send(reply)
+
+
+class ExtractionSandbox:
+    """Parses documents in worker processes under per-file wall time, CPU time and memory limits
+    
+    A file that exceeds a limit gets its worker killed and replaced, and
+    extract() raises ExtractionFailed for that file only; the other files of
+    the batch keep being parsed by the remaining workers. Workers are fresh
+    interpreters started on first use (never forks of the threaded server)
+    and are recycled after SANDBOX_MAX_TASKS files.
+    """
+    
+    def __init__(self, workers=EXTRACTION_WORKERS, wall_seconds=EXTRACT_WALL_SECONDS,
+                 cpu_seconds=EXTRACT_CPU_SECONDS, memory_mb=EXTRACT_MEMORY_MB, max_tasks=SANDBOX_MAX_TASKS):
+        self.workers = workers
+        self.wall_seconds = wall_seconds
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.max_tasks = max_tasks
+        self.counters = Counter()
+        self._lock = threading.Lock()
+        self._reset()
+    
+    def _reset(self):
+        import queue
+        self._idle = queue.Queue()
+        self._started = 0
+        self._pid = os.getpid()
+    
+    def _spawn(self):
+        import socket
+        import subprocess
+        import sys
+        from multiprocessing.connection import Connection
+        parent_sock, child_sock = socket.socketpair()
+        module = os.path.splitext(os.path.basename(__file__))[0]
+        code = (
+            f"import sys; sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r}); "
+            f"import {module}; {module}._sandbox_worker({child_sock.fileno()}, {self.cpu_seconds}, {self.memory_mb})"
+        )
+        process = subprocess.Popen(
+            [sys.executable, '-c', code], pass_fds=(child_sock.fileno(),), stdin=subprocess.DEVNULL
+        )
+        child_sock.close()
+        with self._lock:
+            self.counters['workers_started'] += 1
+        return {'process': process, 'conn': Connection(parent_sock.detach()), 'tasks': 0}
+    
+    def _kill(self, worker):
+        if worker['process'].poll() is None:
+            worker['process'].kill()
+        worker['process'].wait()
+        worker['conn'].close()
+    
+    def _checkout(self):
+        import queue
+        with self._lock:
+            # Workers of a parent process are not ours after a fork
+            if self._pid != os.getpid():
+                self._reset()
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                if self._started < self.workers:
+                    self._started += 1
+                    return None
+        return self._idle.get()
+    
+    def extract(self, filename, file_content):
+        """Text of a PDF or DOCX file parsed in a worker, None for unsupported types"""
+        worker = self._checkout()
+        try:
+            if worker is None or worker['process'].poll() is not None or worker['tasks'] >= self.max_tasks:
+                if worker is not None:
+                    self._kill(worker)
+                worker = self._spawn()
+            worker['tasks'] += 1
+            try:
+                worker['conn'].send((filename, file_content))
+            except OSError:
+                # The worker died while idle: replace it and retry once
+                self._kill(worker)
+                worker = self._spawn()
+                worker['conn'].send((filename, file_content))
+            status, value = self._wait(worker)
+            if status == 'ok':
+                return value
+            if status != 'error':
+                # Limit violations leave the worker in an unknown state
+                self._kill(worker)
+            with self._lock:
+                self.counters[f'failed_{status}'] += 1
+            raise ExtractionFailed(value)
+        finally:
+            self._idle.put(worker)
+    
+    def _wait(self, worker):
+        """Reply of the worker, or (limit, message) once it breaks a limit or dies"""
+        import signal
+        process, conn = worker['process'], worker['conn']
+        deadline = time.monotonic() + self.wall_seconds
+        memory_bytes = self.memory_mb * 1024 * 1024
+        while True:
+            try:
+                if conn.poll(0.05):
+                    return conn.recv()
+            except (EOFError, OSError):
+                pass
+            if process.poll() is not None:
+                if process.returncode == -signal.SIGXCPU:
+                    return 'cpu', 'CPU time limit exceeded'
+                return 'crash', f'extraction worker died (exit code {process.returncode})'
+            if time.monotonic() > deadline:
+                self._kill(worker)
+                return 'timeout', 'wall time limit exceeded'
+            if _rss_bytes(process.pid) > memory_bytes:
+                self._kill(worker)
+                return 'memory', 'memory limit exceeded'
+    
+    def close(self):
+        import queue
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            if worker is not None:
+                self._kill(worker)
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list of numbers (0.0 when empty)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Overloaded(Exception):
+    """A request was refused by admission control"""
+    
+    def __init__(self, reason, status=503, retry_after=1):
+        super().__init__(reason)
+        self.reason = reason
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AdaptiveLimit:
+    """Counting semaphore whose limit can change while slots are held
+    
+    High-priority waiters always go first; low-priority work only gets a slot
+    when no high-priority request is waiting, so it is deferred under load.
+    """
+    
+    def __init__(self, limit, minimum, maximum):
+        self.limit = limit
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_use = 0
+        self.peak = 0
+        self.waiting = {priority: 0 for priority in PRIORITIES}
+        self._cond = threading.Condition()
+    
+    def _available(self, priority):
+        if self.in_use >= self.limit:
+            return False
+        return priority == 'high' or self.waiting['high'] == 0
+    
+    def acquire(self, priority='high', timeout=None):
+        with self._cond:
+            self.waiting[priority] += 1
+            try:
+                if not self._cond.wait_for(lambda: self._available(priority), timeout):
+                    return False
+            finally:
+                self.waiting[priority] -= 1
+            self.in_use += 1
+            self.peak = max(self.peak, self.in_use)
+            return True
+    
+    def release(self):
+        with self._cond:
+            self.in_use -= 1
+            self._cond.notify_all()
+    
+    def resize(self, limit):
+        with self._cond:
+            self.limit = max(self.minimum, min(self.maximum, limit))
+            self.peak = self.in_use
+            self._cond.notify_all()
+            return self.limit
+
+
+class LatencyWindow:
+    """Latency samples of the last SCHEDULER_WINDOW_SECONDS"""
+    
+    def __init__(self, seconds=SCHEDULER_WINDOW_SECONDS, max_samples=2048):
+        from collections import deque
+        self.seconds = seconds
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self.count = 0
+    
+    def record(self, value):
+        with self._lock:
+            self._samples.append((time.monotonic(), value))
+            self.count += 1
+    
+    def values(self):
+        cutoff = time.monotonic() - self.seconds
+        with self._lock:
+            while self._samples and self._samples[0][0] < cutoff:
+                self._samples.popleft()
+            return [value for _, value in self._samples]
+
+
+class Scheduler:
+    """Admission control, load shedding and adaptive concurrency for the screening stages
+    
+    Requests are admitted against a global and a per-tenant limit on active
+    batches. While the p95 request latency is above SCHEDULER_LATENCY_SLO,
+    low-priority work is shed with a Retry-After instead of queueing.
+    
+    Each stage (extract, score) runs under an AdaptiveLimit that is resized
+    from its own measurements: the limit shrinks when the median service time
+    rises well above the stage's no-load baseline (more concurrency is only
+    adding contention), grows by one while work is queueing and latency is
+    healthy, and decays when slots sit idle.
+    """
+    
+    def __init__(self, stages=None, max_active=SCHEDULER_MAX_ACTIVE, tenant_active=SCHEDULER_TENANT_ACTIVE,
+                 tenant_limits=SCHEDULER_TENANT_LIMITS, latency_slo=SCHEDULER_LATENCY_SLO,
+                 queue_timeout=SCHEDULER_QUEUE_TIMEOUT):
+        if stages is None:
+            stages = {'extract': EXTRACTION_WORKERS, 'score': SCORING_WORKERS}
+        self.limits = {name: AdaptiveLimit(workers, 1, workers) for name, workers in stages.items()}
+        self.service_times = {name: LatencyWindow() for name in stages}
+        self.queue_times = {name: LatencyWindow() for name in stages}
+        self.baselines = {name: None for name in stages}
+        self.request_times = LatencyWindow()
+        self.max_active = max_active
+        self.tenant_active = tenant_active
+        self.tenant_limits = {}
+        for item in tenant_limits.split(','):
+            if '=' in item:
+                tenant, limit = item.split('=', 1)
+                self.tenant_limits[tenant.strip()] = int(limit)
+        self.latency_slo = latency_slo
+        self.queue_timeout = queue_timeout
+        self.active = Counter()
+        self.counters = Counter()
+        from collections import deque
+        self.decisions = deque(maxlen=50)
+        self._lock = threading.Lock()
+        self._last_adjust = time.monotonic()
+    
+    def _decide(self, kind, **detail):
+        self.counters[kind] += 1
+        self.decisions.append(dict(detail, kind=kind, time=round(time.time(), 3)))
+    
+    def slo_breached(self):
+        latencies = self.request_times.values()
+        return len(latencies) >= SCHEDULER_MIN_SAMPLES and percentile(latencies, 0.95) > self.latency_slo
+    
+    def admit(self, tenant='default', priority='high'):
+        """Context manager around one request; raises Overloaded when it should not run now"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'")
+        with self._lock:
+            if self.active[tenant] >= self.tenant_limits.get(tenant, self.tenant_active):
+                self._decide('rejected_tenant_limit', tenant=tenant, priority=priority)
+                raise Overloaded('Too many concurrent batches for this tenant', status=429)
+            if sum(self.active.values()) >= self.max_active:
+                self._decide('shed_queue_full', tenant=tenant, priority=priority)
+                raise Overloaded('Server is at capacity')
+            if priority == 'low' and self.slo_breached():
+                self._decide('shed_slo', tenant=tenant, priority=priority)
+                raise Overloaded('Latency SLO breached; low-priority work is deferred',
+                                 retry_after=max(1, int(self.latency_slo)))
+            self.active[tenant] += 1
+            self.counters['admitted'] += 1
+        return _Admission(self, tenant, priority)
+    
+    def _finish(self, tenant, seconds):
+        with self._lock:
+            self.active[tenant] -= 1
+            if self.active[tenant] <= 0:
+                del self.active[tenant]
+        self.request_times.record(seconds)
+    
+    def stage(self, name, priority='high'):
+        """Context manager holding one slot of a stage for the duration of the block"""
+        return _StageSlot(self, name, priority)
+    
+    def run(self, name, priority, func, *args, **kwargs):
+        """Call func under a slot of the given stage (for use inside worker threads)"""
+        with self.stage(name, priority):
+            return func(*args, **kwargs)
+    
+    def _record_stage(self, name, queued, service):
+        self.queue_times[name].record(queued)
+        self.service_times[name].record(service)
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_adjust < SCHEDULER_ADJUST_INTERVAL:
+                return
+            self._last_adjust = now
+        for stage in self.limits:
+            self.adjust(stage)
+    
+    def adjust(self, name):
+        """Resize one stage's limit from its recent service times and queue depth"""
+        limit = self.limits[name]
+        times = self.service_times[name].values()
+        if len(times) < SCHEDULER_MIN_SAMPLES:
+            return
+        median = percentile(times, 0.5)
+        # The baseline tracks the lowest median seen, drifting up slowly so it follows workload changes
+        baseline = self.baselines[name]
+        baseline = median if baseline is None else min(median, baseline * 1.05)
+        self.baselines[name] = baseline
+        
+        current = limit.limit
+        queued = sum(limit.waiting.values())
+        if median > baseline * SCHEDULER_LATENCY_TOLERANCE and current > limit.minimum:
+            target = max(limit.minimum, int(current * 0.75))
+            reason = 'latency'
+        elif queued and current < limit.maximum:
+            target = current + 1
+            reason = 'queue'
+        elif not queued and limit.peak < current - 1:
+            target = current - 1
+            reason = 'idle'
+        else:
+            limit.resize(current)
+            return
+        limit.resize(target)
+        with self._lock:
+            self._decide('resize', stage=name, reason=reason, limit=target, previous=current,
+                         median_ms=round(median * 1000, 1), baseline_ms=round(baseline * 1000, 1),
+                         queued=queued)
+    
+    def metrics(self):
+        latencies = self.request_times.values()
+        with self._lock:
+            active = dict(self.active)
+            counters = dict(self.counters)
+            decisions = list(self.decisions)
+        return {
+            'requests': {
+                'active': sum(active.values()),
+                'active_by_tenant': active,
+                'p50_ms': round(percentile(latencies, 0.5) * 1000, 1),
+                'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+                'slo_ms': round(self.latency_slo * 1000, 1),
+                'slo_breached': self.slo_breached(),
+                'completed': self.request_times.count
+            },
+            'stages': {
+                name: {
+                    'limit': limit.limit,
+                    'max_limit': limit.maximum,
+                    'in_use': limit.in_use,
+                    'queued': dict(limit.waiting),
+                    'service_p50_ms': round(percentile(self.service_times[name].values(), 0.5) * 1000, 1),
+                    'service_p95_ms': round(percentile(self.service_times[name].values(), 0.95) * 1000, 1),
+                    'queue_p95_ms': round(percentile(self.queue_times[name].values(), 0.95) * 1000, 1),
+                    'baseline_ms': round((self.baselines[name] or 0.0) * 1000, 1),
+                    'completed': self.service_times[name].count
+                }
+                for name, limit in self.limits.items()
+            },
+            'decisions': counters,
+            'recent_decisions': decisions
+        }
+
+
+class _Admission:
+    def __init__(self, scheduler, tenant, priority):
+        self.scheduler = scheduler
+        self.tenant = tenant
+        self.priority = priority
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        self.scheduler._finish(self.tenant, time.perf_counter() - self.start)
+        return False
+
+
+class _StageSlot:
+    def __init__(self, scheduler, name, priority):
+        self.scheduler = scheduler
+        self.name = name
+        self.priority = priority
+    
+    def __enter__(self):
+        start = time.perf_counter()
+        limit = self.scheduler.limits[self.name]
+        if not limit.acquire(self.priority, self.scheduler.queue_timeout):
+            with self.scheduler._lock:
+                self.scheduler._decide('shed_stage_timeout', stage=self.name, priority=self.priority)
+            raise Overloaded(f"Timed out waiting for the {self.name} stage")
+        self.started = time.perf_counter()
+        self.queued = self.started - start
+        return self
+    
+    def __exit__(self, *exc):
+        self.scheduler.limits[self.name].release()
+        self.scheduler._record_stage(self.name, self.queued, time.perf_counter() - self.started)
+        return False
+
+
+def _write_json(path, value):
+    """Write JSON to a temporary file renamed over path, so readers never see a partial file"""
+    fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(encode_json(value))
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def _read_json(path):
+    try:
+        with open(path, 'rb') as fh:
+            return json.loads(fh.read())
+    except FileNotFoundError:
+        return None
+
+
+class UploadBatch:
+    """Files of one chunked upload, staged on disk until each is complete and extracted
+    
+    All state lives in the batch directory, so any worker process can accept
+    the chunks, report the status or collect the batch. For each file there is
+    the staged data (bytes received = its size), '<id>.json' with the filename
+    and declared size, '<id>.pid' naming the process extracting the complete
+    file, and '<id>.result' with the extracted candidates and failures.
+    """
+    
+    def __init__(self, batch_id, directory):
+        self.batch_id = batch_id
+        self.directory = directory
+    
+    def path(self, file_id, suffix=''):
+        return os.path.join(self.directory, file_id + suffix)
+    
+    def file_ids(self):
+        return sorted(name[:-5] for name in os.listdir(self.directory)
+                      if name.endswith('.json') and not name.startswith('.'))
+    
+    def entry(self, file_id):
+        """(manifest, bytes received, extraction started) of a file, or None if no chunk arrived"""
+        manifest = _read_json(self.path(file_id, '.json'))
+        if manifest is None:
+            return None
+        try:
+            received = os.path.getsize(self.path(file_id))
+        except FileNotFoundError:
+            received = 0
+        return manifest, received, os.path.exists(self.path(file_id, '.pid'))
+    
+    def status(self):
+        status = {}
+        for file_id in self.file_ids():
+            entry = self.entry(file_id)
+            if entry is not None:
+                manifest, received, complete = entry
+                status[file_id] = {
+                    'filename': manifest['filename'],
+                    'size': manifest['size'],
+                    'received': received,
+                    'complete': complete
+                }
+        return status
+
+
+class UploadManager:
+    """Chunked, resumable uploads with extraction starting as soon as each file lands
+    
+    Chunks must arrive in order per file; a chunk whose offset does not match
+    the bytes already received is rejected with the current offset, which is
+    how clients resume an interrupted upload. Batches are kept in the staging
+    directory rather than in memory, so with pre-forked workers the chunks of
+    a batch and the scan that collects it may each reach a different worker.
+    """
+    
+    def __init__(self, root=UPLOAD_STAGING_DIR, ttl=UPLOAD_BATCH_TTL):
+        self.root = root
+        self.ttl = ttl
+    
+    def create_batch(self):
+        self.expire()
+        batch_id = uuid.uuid4().hex
+        os.makedirs(os.path.join(self.root, batch_id))
+        return batch_id
+    
+    def get(self, batch_id):
+        """The batch, or None if it is unknown, expired or already collected"""
+        if not UPLOAD_BATCH_ID_PATTERN.match(batch_id):
+            return None
+        directory = os.path.join(self.root, batch_id)
+        if not os.path.isdir(directory) or os.path.exists(os.path.join(directory, '.collected')):
+            return None
+        return UploadBatch(batch_id, directory)
+    
+    def write_chunk(self, batch, file_id, filename, offset, size, data):
+        """Append a chunk to a staged file and return (accepted, bytes received so far)"""
+        import fcntl
+        if not UPLOAD_FILE_ID_PATTERN.match(file_id):
+            raise ValueError('Invalid file id')
+        if size > (ARCHIVE_MAX_BYTES if is_archive(filename) else UPLOAD_FILE_MAX_BYTES):
+            raise ValueError('File too large')
+        
+        path = batch.path(file_id)
+        with open(path, 'ab') as fh:
+            # Serializes chunks of one file across threads and worker processes
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            entry = batch.entry(file_id)
+            if entry is None:
+                manifest = {'filename': filename, 'size': size}
+                _write_json(batch.path(file_id, '.json'), manifest)
+                received, started = 0, False
+            else:
+                manifest, received, started = entry
+            if offset != received or started:
+                return False, received
+            if offset + len(data) > manifest['size']:
+                raise ValueError('Chunk exceeds declared file size')
+            
+            fh.write(data)
+            fh.flush()
+            received += len(data)
+            if received == manifest['size']:
+                with open(batch.path(file_id, '.pid'), 'w') as marker:
+                    marker.write(str(os.getpid()))
+                args = (path, manifest['filename'], batch.path(file_id, '.result'))
+                if is_archive(manifest['filename']):
+                    # Members go to the extraction pool from a thread of their own, so a
+                    # pool worker never waits on other pool work
+                    threading.Thread(target=self._extract_staged, args=args, daemon=True).start()
+                else:
+                    get_extraction_pool().submit(self._extract_staged, *args)
+            return True, received
+    
+    @staticmethod
+    def _extract_staged(path, filename, result_path):
+        """Extract a complete file and publish its candidates and failures for collect()"""
+        try:
+            with open(path, 'rb') as fh:
+                if is_archive(filename):
+                    candidates, failed = extract_files(iter_archive_members(filename, fh))
+                    results = candidates + failed
+                else:
+                    results = UploadManager._extract_one(filename, fh.read())
+        except Exception as e:
+            results = [{'filename': filename, 'error': str(e)}]
+        _write_json(result_path, results)
+    
+    @staticmethod
+    def _extract_one(filename, file_content):
+        try:
+            extracted = scheduler.run('extract', 'high', scanner.extract_resume, filename, file_content)
+        except ExtractionFailed as e:
+            return [{'filename': filename, 'error': str(e)}]
+        except Overloaded as e:
+            return [{'filename': filename, 'error': f'server busy, retry later ({e.reason})'}]
+        if not extracted:
+            return [{'filename': filename, 'error': 'unsupported or unreadable file'}]
+        return [{
+            'filename': filename,
+            'resume_text': extracted['text'],
+            'sections': extracted['sections']
+        }]
+    
+    def wait(self, batch):
+        """Wait for the extraction of every complete file of a batch; returns {file_id: results}
+        
+        Files whose upload never finished, files whose extracting process exited
+        before publishing a result and archives without resumes are reported as
+        failures.
+        """
+        results = {}
+        for file_id in batch.file_ids():
+            manifest, received, started = batch.entry(file_id)
+            if not started:
+                results[file_id] = [{
+                    'filename': manifest['filename'],
+                    'error': f"upload incomplete ({received} of {manifest['size']} bytes received)"
+                }]
+                continue
+            result_path = batch.path(file_id, '.result')
+            while True:
+                published = _read_json(result_path)
+                if published is not None:
+                    # An archive without a single resume member is reported too
+                    results[file_id] = published or [{'filename': manifest['filename'],
+                                                      'error': 'no resumes found in archive'}]
+                    break
+                if not self._extractor_alive(batch.path(file_id, '.pid')) and not os.path.exists(result_path):
+                    results[file_id] = [{'filename': manifest['filename'],
+                                         'error': 'extraction was interrupted'}]
+                    break
+                time.sleep(UPLOAD_POLL_SECONDS)
+        return results
+    
+    @staticmethod
+    def _extractor_alive(pid_path):
+        try:
+            with open(pid_path) as fh:
+                pid = int(fh.read() or 0)
+        except (FileNotFoundError, ValueError):
+            # Written right after the last chunk; a missing or half-written pid means it is starting
+            return True
+        if pid == os.getpid():
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+    
+    def collect(self, batch_id):
+        """Wait for every file of a batch and return (candidates, failed files); the batch is then removed"""
+        batch = self.get(batch_id)
+        if batch is None:
+            raise KeyError(batch_id)
+        try:
+            # Only one request may collect a batch
+            fd = os.open(os.path.join(batch.directory, '.collected'), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            raise KeyError(batch_id)
+        os.close(fd)
+        try:
+            candidates = []
+            failed = []
+            for results in self.wait(batch).values():
+                for candidate in results:
+                    if 'error' in candidate:
+                        failed.append(candidate)
+                    else:
+                        candidates.append(candidate)
+            return candidates, failed
+        finally:
+            shutil.rmtree(batch.directory, ignore_errors=True)
+    
+    def expire(self):
+        """Drop batches idle for longer than the TTL together with their staged files"""
+        cutoff = time.time() - self.ttl
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return
+        for name in names:
+            directory = os.path.join(self.root, name)
+            try:
+                expired = UPLOAD_BATCH_ID_PATTERN.match(name) and os.path.getmtime(directory) < cutoff
+            except FileNotFoundError:
+                continue
+            if expired:
+                shutil.rmtree(directory, ignore_errors=True)
+
+
+def snapshot_encode(value):
+    """JSON-ready form of a cached value
+    
+    Lists, str-keyed dicts and scalars are kept as they are. Tuples, sets,
+    Counters, other dicts, NumPy arrays and sparse matrices become a one-key
+    dict naming the type, which snapshot_decode turns back into it.
+    """
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, list):
+        return [snapshot_encode(item) for item in value]
+    if isinstance(value, tuple):
+        return {'__tuple__': [snapshot_encode(item) for item in value]}
+    if isinstance(value, (set, frozenset)):
+        return {'__set__': [snapshot_encode(item) for item in value]}
+    if isinstance(value, Counter):
+        return {'__counter__': [[snapshot_encode(key), count] for key, count in value.items()]}
+    if isinstance(value, dict):
+        if all(isinstance(key, str) and not key.startswith('__') for key in value):
+            return {key: snapshot_encode(item) for key, item in value.items()}
+        return {'__dict__': [[snapshot_encode(key), snapshot_encode(item)] for key, item in value.items()]}
+    if hasattr(value, 'tocsr'):
+        matrix = value.tocsr()
+        return {'__csr__': [list(matrix.shape), snapshot_encode(matrix.data),
+                            snapshot_encode(matrix.indices), snapshot_encode(matrix.indptr)]}
+    if hasattr(value, 'dtype'):
+        if getattr(value, 'ndim', 0) == 0:
+            return value.item()
+        return {'__array__': [value.dtype.str, value.tolist()]}
+    raise TypeError(f'Object of type {type(value).__name__} cannot be stored in a snapshot')
+
+
+def snapshot_decode(value):
+    """Inverse of snapshot_encode; unknown type names are an error"""
+    if isinstance(value, list):
+        return [snapshot_decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if len(value) == 1:
+        (kind, data), = value.items()
+        if kind == '__tuple__':
+            return tuple(snapshot_decode(item) for item in data)
+        if kind == '__set__':
+            return {snapshot_decode(item) for item in data}
+        if kind == '__counter__':
+            return Counter({snapshot_decode(key): count for key, count in data})
+        if kind == '__dict__':
+            return {snapshot_decode(key): snapshot_decode(item) for key, item in data}
+        if kind == '__array__':
+            import numpy as np
+            return np.array(data[1], dtype=np.dtype(data[0]))
+        if kind == '__csr__':
+            from scipy import sparse
+            shape, data, indices, indptr = data
+            return sparse.csr_matrix((snapshot_decode(data), snapshot_decode(indices), snapshot_decode(indptr)),
+                                     shape=tuple(shape))
+        if kind.startswith('__'):
+            raise ValueError(f'Unknown snapshot type {kind}')
+    return {key: snapshot_decode(item) for key, item in value.items()}
+
+
+class CacheSnapshot:
+    """Warm restarts: hot caches and runtime structures saved to one local file and restored on startup
+    
+    A snapshot holds the named LRU caches in recency order, the in-memory score
+    memo, the tokenizer vocabulary (token ids with their hashed columns) and the
+    hashing engine's IDF table. It is written as JSON (see snapshot_encode), so
+    loading one never runs code, to a temporary file that is then renamed over
+    the previous snapshot, so a crash never leaves a partial one. A fingerprint
+    of the scoring model, skill taxonomy and extraction settings is stored with
+    it, and a snapshot taken under other settings is ignored. The file holds
+    resume text, so it and its directory are created private to their owner,
+    and a snapshot another user could have written is not loaded.
+    """
+    
+    def __init__(self, scanner, caches, path=CACHE_SNAPSHOT_PATH, interval=CACHE_SNAPSHOT_INTERVAL):
+        self.scanner = scanner
+        self.caches = dict(caches)
+        self.path = path
+        self.interval = interval
+        self.status = {'restored_entries': 0, 'restore_seconds': None, 'saved_at': None, 'save_seconds': None}
+        self._restored = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+    
+    def fingerprint(self):
+        scanner = self.scanner
+        return content_hash(repr((
+            CACHE_SNAPSHOT_VERSION, scanner.feature_engine, scanner.taxonomy_version(),
+            [scanner.model_version(engine) for _, engine in sorted(scanner.scoring_engines.items())],
+            EXTRACT_MAX_PAGES, EXTRACT_MAX_CHARS, SECTION_HEADERS
+        )))
+    
+    def save(self):
+        """Write a snapshot of the current state; returns its size in bytes"""
+        start = time.perf_counter()
+        memo = self.scanner.score_memo
+        state = snapshot_encode({
+            'fingerprint': self.fingerprint(),
+            'caches': {name: cache.items() for name, cache in self.caches.items()},
+            'score_memo': memo.cache.items() if memo is not None else [],
+            'vocabulary': self.scanner.tokenizer.vocabulary_state(),
+            'idf': self.scanner.idf_table.nonzero(),
+            'idf_keys': sorted(self.scanner.idf_table.keys)
+        })
+        with self._lock:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            fd, temporary = tempfile.mkstemp(dir=directory, prefix='.snapshot-')
+            try:
+                with os.fdopen(fd, 'wb') as fh:
+                    fh.write(encode_json(state))
+                os.replace(temporary, self.path)
+            except BaseException:
+                os.unlink(temporary)
+                raise
+        self.status.update(saved_at=time.time(), save_seconds=round(time.perf_counter() - start, 3))
+        return os.path.getsize(self.path)
+    
+    def restore(self):
+        """Merge a saved snapshot into the running caches; returns the number of cache entries restored
+        
+        Entries added by requests served in the meantime are kept and stay the
+        most recently used. A missing, unreadable or stale snapshot restores nothing.
+        """
+        start = time.perf_counter()
+        try:
+            with open(self.path, 'rb') as fh:
+                # Cached results are served as they are: only trust a file nobody else can have written
+                for stat in (os.fstat(fh.fileno()), os.stat(os.path.dirname(os.path.abspath(self.path)))):
+                    if stat.st_uid != os.getuid() or stat.st_mode & 0o022:
+                        print(f"♻️  Cache snapshot {self.path} is writable by other users, not loading it")
+                        return 0
+                state = snapshot_decode(json.loads(fh.read()))
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            print(f"♻️  Cache snapshot {self.path} could not be read: {e}")
+            return 0
+        if state.get('fingerprint') != self.fingerprint():
+            return 0
+        
+        restored = 0
+        for name, items in state['caches'].items():
+            if name in self.caches:
+                self.caches[name].restore(items)
+                restored += len(items)
+        if self.scanner.score_memo is not None:
+            self.scanner.score_memo.cache.restore(state['score_memo'])
+            restored += len(state['score_memo'])
+        if state['vocabulary'] is not None:
+            self.scanner.tokenizer.restore_vocabulary(*state['vocabulary'])
+        indices, frequencies, n_docs = state['idf']
+        if n_docs and not self.scanner.idf_table.merge_saved(indices, frequencies, n_docs, state['idf_keys']):
+            # Only when restore() runs after traffic: start() holds IDF updates until it is done
+            print(f"♻️  Cache snapshot {self.path}: resumes counted since startup overlap it, IDF not restored")
+        self.status.update(restored_entries=restored, restore_seconds=round(time.perf_counter() - start, 3))
+        return restored
+    
+    def start(self):
+        """Restore in a background thread, then save every interval seconds until stop()
+        
+        Requests are served during the restore, but IDF updates wait for it, so
+        a resume scanned meanwhile is not counted both live and in the snapshot.
+        """
+        if not self.path:
+            return
+        idf_table = self.scanner.idf_table
+        idf_table.ready.clear()
+        def run():
+            try:
+                self.restore()
+            finally:
+                idf_table.ready.set()
+                self._restored.set()
+            while not self._stopping.wait(self.interval):
+                try:
+                    self.save()
+                except Exception as e:
+                    print(f"♻️  Cache snapshot {self.path} could not be written: {e}")
+        threading.Thread(target=run, daemon=True).start()
+    
+    def stop(self):
+        """Stop the periodic saves and write a final snapshot, unless the restore never finished"""
+        self._stopping.set()
+        if self.path and self._restored.is_set():
+            self.save()
+
+
+def train_zlib_dictionary(samples, size=RESUME_ARCHIVE_DICT_BYTES['zlib']):
+    """Preset zlib dictionary from the phrases that recur across sample texts
+    
+    Word trigrams are scored by the number of samples containing them times
+    their length. The best fill the dictionary, most valuable last: zlib finds
+    matches near the end of its window at the shortest distances.
+    """
+    document_frequency = Counter()
+    for sample in samples:
+        words = sample.split()
+        document_frequency.update({' '.join(words[i:i + 3]) for i in range(len(words) - 2)})
+    best = heapq.nlargest(size // 8, ((count * len(phrase), phrase) for phrase, count in document_frequency.items()
+                                      if count > 1))
+    chosen, total = [], 0
+    for _, phrase in best:
+        encoded = phrase.encode('utf-8') + b'\n'
+        if total + len(encoded) > size:
+            break
+        chosen.append(encoded)
+        total += len(encoded)
+    return b''.join(reversed(chosen))
+
+
+class ResumeTextArchive:
+    """Resume texts compressed in small blocks with a dictionary trained on the corpus
+    
+    Records are packed into blocks of about block_bytes of UTF-8 text. Each
+    block is compressed on its own and appended to one data file. A SQLite
+    index maps a text hash to (block, start, length), and a block to its file
+    offset, codec and dictionary. Reading a record therefore costs one pread
+    and the decompression of one small block; recently read blocks are kept
+    decompressed.
+    
+    The codec is zstd when the zstandard package is installed, zlib otherwise.
+    Once train_after records have arrived, a dictionary is trained on a
+    sample of the stored records plus the new ones (zstd's trainer, or the
+    corpus's recurring phrases as a zlib preset dictionary), and later blocks
+    are compressed against it. If training fails, it is retried only once the
+    archive has doubled in size. Blocks name their own codec and dictionary,
+    so earlier blocks stay readable.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS dictionaries (
+            id INTEGER PRIMARY KEY,
+            codec TEXT NOT NULL,
+            data BLOB NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS blocks (
+            id INTEGER PRIMARY KEY,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            raw_length INTEGER NOT NULL,
+            codec TEXT NOT NULL,
+            dictionary_id INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS records (
+            text_hash TEXT PRIMARY KEY,
+            block_id INTEGER NOT NULL,
+            start INTEGER NOT NULL,
+            length INTEGER NOT NULL
+        ) WITHOUT ROWID;
+    """
+    
+    def __init__(self, path=RESUME_ARCHIVE_PATH, block_bytes=RESUME_ARCHIVE_BLOCK_BYTES,
+                 codec=RESUME_ARCHIVE_CODEC or None, train_after=RESUME_ARCHIVE_TRAIN_RECORDS):
+        self.path = path
+        self.data_path = path + '.blocks'
+        self.block_bytes = block_bytes
+        if codec not in (None, *RESUME_ARCHIVE_DICT_BYTES):
+            raise ValueError(f"Unknown codec: {codec}")
+        if codec in (None, 'zstd'):
+            try:
+                import zstandard  # noqa: F401
+                codec = 'zstd'
+            except ImportError:
+                if codec == 'zstd':
+                    raise ValueError('The zstd codec needs the zstandard package')
+                codec = 'zlib'
+        self.codec = codec
+        self.train_after = train_after
+        self.block_cache = LRUCache(RESUME_ARCHIVE_BLOCK_CACHE)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._fd_lock = threading.Lock()
+        self._dictionaries = {}
+        self._compressors = {}
+        self._fd = None
+        # Record count at the last failed training attempt
+        self._trained_at = 0
+    
+    @property
+    def connection(self):
+        """One SQLite connection per thread, created on first use"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(self.SCHEMA)
+            self._local.connection = connection
+        return connection
+    
+    def _dictionary(self, dictionary_id):
+        """(codec, prepared dictionary) for an id; id 0 is no dictionary"""
+        if dictionary_id not in self._dictionaries:
+            codec, data = self.connection.execute(
+                'SELECT codec, data FROM dictionaries WHERE id = ?', (dictionary_id,)
+            ).fetchone()
+            if codec == 'zstd':
+                import zstandard
+                data = zstandard.ZstdCompressionDict(data)
+            self._dictionaries[dictionary_id] = data
+        return self._dictionaries[dictionary_id]
+    
+    def _train(self, texts):
+        """Train and record a dictionary for the archive's codec; returns its id, or 0 if training failed"""
+        samples = texts[:RESUME_ARCHIVE_TRAIN_SAMPLES]
+        size = RESUME_ARCHIVE_DICT_BYTES[self.codec]
+        try:
+            if self.codec == 'zstd':
+                import zstandard
+                data = zstandard.train_dictionary(size, [text.encode('utf-8') for text in samples]).as_bytes()
+            else:
+                data = train_zlib_dictionary(samples, size)
+        except Exception:
+            return 0
+        if not data:
+            return 0
+        with self.connection:
+            cursor = self.connection.execute('INSERT INTO dictionaries (codec, data) VALUES (?, ?)', (self.codec, data))
+        return cursor.lastrowid
+    
+    def _compress(self, raw, dictionary_id):
+        # Called under the write lock, so one zstd compressor per dictionary is enough
+        if self.codec == 'zstd':
+            if dictionary_id not in self._compressors:
+                import zstandard
+                dictionary = self._dictionary(dictionary_id) if dictionary_id else None
+                self._compressors[dictionary_id] = zstandard.ZstdCompressor(level=9, dict_data=dictionary)
+            return self._compressors[dictionary_id].compress(raw)
+        if dictionary_id:
+            compressor = zlib.compressobj(9, zdict=self._dictionary(dictionary_id))
+        else:
+            compressor = zlib.compressobj(9)
+        return compressor.compress(raw) + compressor.flush()
+    
+    def _decompress(self, data, codec, dictionary_id):
+        if codec == 'zstd':
+            # Loading a dictionary into a decompressor is the expensive part: keep one per thread
+            decompressors = self._local.__dict__.setdefault('decompressors', {})
+            if dictionary_id not in decompressors:
+                import zstandard
+                dictionary = self._dictionary(dictionary_id) if dictionary_id else None
+                decompressors[dictionary_id] = zstandard.ZstdDecompressor(dict_data=dictionary)
+            return decompressors[dictionary_id].decompress(data)
+        if dictionary_id:
+            return zlib.decompressobj(zdict=self._dictionary(dictionary_id)).decompress(data)
+        return zlib.decompress(data)
+    
+    def put_many(self, texts):
+        """Store {text hash: text} records not stored yet; returns the number added"""
+        connection = self.connection
+        with self._write_lock:
+            existing = set()
+            hashes = list(texts)
+            for start in range(0, len(hashes), 500):
+                part = hashes[start:start + 500]
+                existing.update(row[0] for row in connection.execute(
+                    f'SELECT text_hash FROM records WHERE text_hash IN ({",".join("?" * len(part))})', part
+                ))
+            new = [(text_hash, texts[text_hash].encode('utf-8')) for text_hash in hashes if text_hash not in existing]
+            if not new:
+                return 0
+            
+            row = connection.execute(
+                'SELECT id FROM dictionaries WHERE codec = ? ORDER BY id DESC LIMIT 1', (self.codec,)
+            ).fetchone()
+            dictionary_id = row[0] if row else 0
+            if not dictionary_id:
+                stored = connection.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+                total = stored + len(new)
+                if total >= self.train_after and total >= 2 * self._trained_at:
+                    # Incremental ingest brings a few records per call: train on the
+                    # archive so far, not just this batch
+                    samples = [texts[text_hash] for text_hash, _ in new][:RESUME_ARCHIVE_TRAIN_SAMPLES]
+                    if stored and len(samples) < RESUME_ARCHIVE_TRAIN_SAMPLES:
+                        sampled = [row[0] for row in connection.execute(
+                            'SELECT text_hash FROM records ORDER BY RANDOM() LIMIT ?',
+                            (RESUME_ARCHIVE_TRAIN_SAMPLES - len(samples),)
+                        )]
+                        samples.extend(self.get_many(sampled).values())
+                    dictionary_id = self._train(samples)
+                    if not dictionary_id:
+                        self._trained_at = total
+            
+            # Pack records into blocks, compress each and append them to the data file
+            blocks, current, size = [], [], 0
+            for record in new:
+                current.append(record)
+                size += len(record[1])
+                if size >= self.block_bytes:
+                    blocks.append(current)
+                    current, size = [], 0
+            if current:
+                blocks.append(current)
+            
+            block_rows, record_rows = [], []
+            with open(self.data_path, 'ab') as fh:
+                offset = fh.tell()
+                for records in blocks:
+                    raw = b''.join(data for _, data in records)
+                    compressed = self._compress(raw, dictionary_id)
+                    fh.write(compressed)
+                    block_rows.append((offset, len(compressed), len(raw), records))
+                    offset += len(compressed)
+                fh.flush()
+                os.fsync(fh.fileno())
+            
+            # The index is written after the data, so a crash leaves only unreferenced bytes
+            with connection:
+                for offset, length, raw_length, records in block_rows:
+                    block_id = connection.execute(
+                        'INSERT INTO blocks (offset, length, raw_length, codec, dictionary_id) VALUES (?, ?, ?, ?, ?)',
+                        (offset, length, raw_length, self.codec, dictionary_id)
+                    ).lastrowid
+                    start = 0
+                    for text_hash, data in records:
+                        record_rows.append((text_hash, block_id, start, len(data)))
+                        start += len(data)
+                connection.executemany(
+                    'INSERT OR IGNORE INTO records (text_hash, block_id, start, length) VALUES (?, ?, ?, ?)',
+                    record_rows
+                )
+            return len(new)
+    
+    def _block(self, block_id, offset, length, codec, dictionary_id):
+        raw = self.block_cache.get(block_id)
+        if raw is None:
+            if self._fd is None:
+                # Not the write lock: put_many reads stored records to train a dictionary
+                with self._fd_lock:
+                    if self._fd is None:
+                        self._fd = os.open(self.data_path, os.O_RDONLY)
+            raw = self._decompress(os.pread(self._fd, length, offset), codec, dictionary_id)
+            self.block_cache.put(block_id, raw)
+        return raw
+    
+    def get_many(self, text_hashes):
+        """{text hash: text} for the stored ones among text_hashes; each block is read once"""
+        hashes = list(text_hashes)
+        rows = []
+        for start in range(0, len(hashes), 500):
+            part = hashes[start:start + 500]
+            rows.extend(self.connection.execute(
+                'SELECT r.text_hash, r.start, r.length, b.id, b.offset, b.length, b.codec, b.dictionary_id '
+                f'FROM records r JOIN blocks b ON b.id = r.block_id WHERE r.text_hash IN ({",".join("?" * len(part))}) '
+                'ORDER BY b.id', part
+            ))
+        texts = {}
+        for text_hash, start, length, *block in rows:
+            texts[text_hash] = self._block(*block)[start:start + length].decode('utf-8')
+        return texts
+    
+    def get(self, text_hash):
+        return self.get_many([text_hash]).get(text_hash)
+    
+    def stats(self):
+        records, text_bytes = self.connection.execute('SELECT COUNT(*), COALESCE(SUM(length), 0) FROM records').fetchone()
+        blocks, stored_bytes = self.connection.execute('SELECT COUNT(*), COALESCE(SUM(length), 0) FROM blocks').fetchone()
+        return {'codec': self.codec, 'records': records, 'blocks': blocks, 'text_bytes': text_bytes,
+                'stored_bytes': stored_bytes, 'ratio': round(text_bytes / stored_bytes, 2) if stored_bytes else None}
+    
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class CandidateStore:
+    """Persistent candidates in SQLite with skill-filtered similarity search
+    
+    Each candidate row holds the hash of its extracted text, skills, contact
+    info, section offsets and its hashed term-count vector (feature ids and
+    counts as packed arrays). A (skill, candidate_id) table answers "has all of
+    these skills" filters from its primary key index; the matching vectors are
+    then scored against the job description in one sparse product. IDF
+    statistics are rebuilt from the stored vectors on first search and kept up
+    to date by later inserts.
+    
+    The database's user_version records the TOKENIZER_VERSION its vectors and
+    skills were built with. A store from another version is reported as stale
+    on first use and rebuilt by reindex() from the resume text archive.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS candidates (
+            id INTEGER PRIMARY KEY,
+            text_hash TEXT NOT NULL UNIQUE,
+            filename TEXT NOT NULL,
+            skills TEXT NOT NULL,
+            contact_info TEXT NOT NULL,
+            sections TEXT NOT NULL,
+            vector_indices BLOB NOT NULL,
+            vector_counts BLOB NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS candidate_skills (
+            skill TEXT NOT NULL,
+            candidate_id INTEGER NOT NULL,
+            PRIMARY KEY (skill, candidate_id)
+        ) WITHOUT ROWID;
+    """
+    
+    def __init__(self, scanner, path=CANDIDATE_DB_PATH):
+        self.scanner = scanner
+        self.path = path
+        self._local = threading.local()
+        self._idf_table = None
+        self._idf_lock = threading.Lock()
+        # Callable (candidate ids, filenames, hashed count matrix) run after each insert
+        self.on_insert = None
+        # ResumeTextArchive keeping the full text of inserted candidates, or None
+        self.text_archive = None
+        # Tokenizer version of the stored vectors when it is not the current one
+        self.stale_version = None
+    
+    @property
+    def connection(self):
+        """One SQLite connection per thread, created on first use"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(self.SCHEMA)
+            self._local.connection = connection
+            self._check_version(connection)
+        return connection
+    
+    def _check_version(self, connection):
+        version = connection.execute('PRAGMA user_version').fetchone()[0]
+        if version == TOKENIZER_VERSION:
+            return
+        if connection.execute('SELECT 1 FROM candidates LIMIT 1').fetchone() is None:
+            connection.execute(f'PRAGMA user_version = {TOKENIZER_VERSION}')
+        elif self.stale_version is None:
+            self.stale_version = version
+            print(f"⚠️  Candidate store {self.path} was built with tokenizer version {version} "
+                  f"(current {TOKENIZER_VERSION}); run 'python main.py --reindex-store' to rebuild it")
+    
+    def reindex(self, chunk=500):
+        """Rebuild stored vectors and skills with the current tokenizer; returns (rebuilt, texts missing)
+        
+        Texts come from the resume text archive. Candidates whose text is not
+        archived keep their old vectors, and the store stays stale.
+        """
+        import numpy as np
+        if self.text_archive is None:
+            raise RuntimeError('Reindexing needs the resume text archive (RESUME_ARCHIVE_PATH)')
+        connection = self.connection
+        rows = connection.execute('SELECT id, text_hash FROM candidates ORDER BY id').fetchall()
+        rebuilt = missing = 0
+        for offset in range(0, len(rows), chunk):
+            part = rows[offset:offset + chunk]
+            texts = self.text_archive.get_many([text_hash for _, text_hash in part])
+            found = [(candidate_id, texts[text_hash]) for candidate_id, text_hash in part if text_hash in texts]
+            missing += len(part) - len(found)
+            if not found:
+                continue
+            counts = self.scanner.hashed_counts([text for _, text in found])
+            updates, skill_rows = [], []
+            for i, (candidate_id, text) in enumerate(found):
+                skills = self.scanner.extract_skills(text)
+                start, end = counts.indptr[i], counts.indptr[i + 1]
+                updates.append((json.dumps(skills), counts.indices[start:end].astype(np.int32).tobytes(),
+                                counts.data[start:end].astype(np.float32).tobytes(), candidate_id))
+                skill_rows.extend((skill.lower(), candidate_id) for names in skills.values() for skill in names)
+            with connection:
+                connection.executemany(
+                    'UPDATE candidates SET skills = ?, vector_indices = ?, vector_counts = ? WHERE id = ?', updates
+                )
+                connection.executemany('DELETE FROM candidate_skills WHERE candidate_id = ?',
+                                       [(candidate_id,) for candidate_id, _ in found])
+                connection.executemany('INSERT OR IGNORE INTO candidate_skills (skill, candidate_id) VALUES (?, ?)',
+                                       skill_rows)
+            rebuilt += len(found)
+        if not missing:
+            connection.execute(f'PRAGMA user_version = {TOKENIZER_VERSION}')
+            self.stale_version = None
+        with self._idf_lock:
+            self._idf_table = None
+        return rebuilt, missing
+    
+    def _select_in(self, sql, values, chunk=500):
+        """Run a SELECT whose {} is an IN list, in chunks that stay under SQLite's variable limit"""
+        rows = []
+        for start in range(0, len(values), chunk):
+            part = list(values[start:start + chunk])
+            rows.extend(self.connection.execute(sql.format(','.join('?' * len(part))), part))
+        return rows
+    
+    def add_many(self, candidates):
+        """Insert candidates in one transaction; returns (added, already stored)"""
+        import numpy as np
+        
+        rows, seen = [], set()
+        for candidate in candidates:
+            text = candidate['resume_text']
+            text_hash = content_hash(text)
+            if text_hash in seen:
+                continue
+            seen.add(text_hash)
+            rows.append((text_hash, candidate))
+        if not rows:
+            return 0, 0
+        
+        connection = self.connection
+        existing = {row[0] for row in self._select_in(
+            'SELECT text_hash FROM candidates WHERE text_hash IN ({})',
+            [text_hash for text_hash, _ in rows]
+        )}
+        rows = [(text_hash, candidate) for text_hash, candidate in rows if text_hash not in existing]
+        if not rows:
+            return 0, len(existing)
+        
+        counts = self.scanner.hashed_counts([candidate['resume_text'] for _, candidate in rows])
+        records, skill_rows = [], []
+        now = time.time()
+        for i, (text_hash, candidate) in enumerate(rows):
+            text = candidate['resume_text']
+            skills = candidate.get('skills') or self.scanner.extract_skills(text)
+            contact_info = candidate.get('contact_info') or self.scanner.extract_contact_info(text)
+            sections = candidate.get('sections') or self.scanner.segment_sections(text)
+            start, end = counts.indptr[i], counts.indptr[i + 1]
+            records.append((
+                text_hash, candidate.get('filename', ''), json.dumps(skills), json.dumps(contact_info),
+                json.dumps(sections), counts.indices[start:end].astype(np.int32).tobytes(),
+                counts.data[start:end].astype(np.float32).tobytes(), now
+            ))
+            skill_rows.append((text_hash, {skill.lower() for found in skills.values() for skill in found}))
+        
+        with connection:
+            # Another request (thread or worker process) may have stored some of
+            # these since they were looked up: those rows are skipped, not an error
+            inserted = []
+            for i, record in enumerate(records):
+                cursor = connection.execute(
+                    'INSERT OR IGNORE INTO candidates (text_hash, filename, skills, contact_info, sections, '
+                    'vector_indices, vector_counts, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    record
+                )
+                if cursor.rowcount:
+                    inserted.append(i)
+            ids = dict(self._select_in(
+                'SELECT text_hash, id FROM candidates WHERE text_hash IN ({})',
+                [text_hash for text_hash, _ in rows]
+            ))
+            connection.executemany(
+                'INSERT OR IGNORE INTO candidate_skills (skill, candidate_id) VALUES (?, ?)',
+                [(skill, ids[skill_rows[i][0]]) for i in inserted for skill in skill_rows[i][1]]
+            )
+        already_stored = len(existing) + len(rows) - len(inserted)
+        if len(inserted) < len(rows):
+            rows = [rows[i] for i in inserted]
+            counts = counts[inserted]
+        if not rows:
+            return 0, already_stored
+        
+        with self._idf_lock:
+            if self._idf_table is not None:
+                self._idf_table.partial_fit(counts)
+        if self.text_archive is not None:
+            self.text_archive.put_many({text_hash: candidate['resume_text'] for text_hash, candidate in rows})
+        if self.on_insert is not None:
+            self.on_insert([ids[text_hash] for text_hash, _ in rows],
+                           [candidate.get('filename', '') for _, candidate in rows], counts)
+        return len(rows), already_stored
+    
+    def _vectors(self, rows):
+        """Stack (id, vector_indices, vector_counts) rows into ids and a CSR count matrix"""
+        import numpy as np
+        from scipy import sparse
+        ids, indices, data, indptr = [], [], [], [0]
+        for candidate_id, vector_indices, vector_counts in rows:
+            ids.append(candidate_id)
+            indices.append(np.frombuffer(vector_indices, dtype=np.int32))
+            data.append(np.frombuffer(vector_counts, dtype=np.float32))
+            indptr.append(indptr[-1] + len(indices[-1]))
+        n_features = self.scanner.hashing_params['n_features']
+        matrix = sparse.csr_matrix(
+            (np.concatenate(data) if data else np.zeros(0, dtype=np.float32),
+             np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32),
+             np.asarray(indptr, dtype=np.int64)),
+            shape=(len(ids), n_features)
+        )
+        return ids, matrix
+    
+    def idf_table(self):
+        """IDF statistics over every stored candidate, rebuilt from the database on first use"""
+        with self._idf_lock:
+            if self._idf_table is None:
+                table = HashedIdfTable(self.scanner.hashing_params['n_features'])
+                cursor = self.connection.execute('SELECT id, vector_indices, vector_counts FROM candidates')
+                while True:
+                    rows = cursor.fetchmany(STORE_VECTOR_CHUNK)
+                    if not rows:
+                        break
+                    table.partial_fit(self._vectors(rows)[1])
+                self._idf_table = table
+            return self._idf_table
+    
+    def search(self, job_description, skills=(), top=STORE_SEARCH_TOP):
+        """Candidates having all the given skills, ranked by similarity to the job description
+        
+        Returns (ranked candidates in rank_candidates' format, number of candidates matching the filter).
+        """
+        import numpy as np
+        
+        skills = sorted({skill.strip().lower() for skill in skills if skill.strip()})
+        if skills:
+            query = (
+                'SELECT id, vector_indices, vector_counts FROM candidates WHERE id IN ('
+                f'SELECT candidate_id FROM candidate_skills WHERE skill IN ({",".join("?" * len(skills))}) '
+                'GROUP BY candidate_id HAVING COUNT(*) = ?)'
+            )
+            params = skills + [len(skills)]
+        else:
+            query, params = 'SELECT id, vector_indices, vector_counts FROM candidates', []
+        
+        ids, counts = self._vectors(self.connection.execute(query, params).fetchall())
+        if not ids:
+            return [], 0
+        
+        table = self.idf_table()
+        idf = table.idf()
+        resumes = table.transform(counts, idf)
+        jd = table.transform(self.scanner.hashed_counts([job_description]), idf)
+        scores = resumes.dot(jd.T).toarray().ravel()
+        top = min(top, len(ids))
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        
+        return self.describe([(ids[i], float(scores[i])) for i in best]), len(ids)
+    
+    def describe(self, scored):
+        """Turn ranked (candidate id, score) pairs into candidates in rank_candidates' format"""
+        details = {
+            row[0]: row[1:] for row in self._select_in(
+                'SELECT id, filename, skills, contact_info, text_hash FROM candidates WHERE id IN ({})',
+                [candidate_id for candidate_id, _ in scored]
+            )
+        }
+        ranked = []
+        for rank, (candidate_id, score) in enumerate(scored, 1):
+            if candidate_id not in details:
+                continue
+            filename, skills_json, contact_json, text_hash = details[candidate_id]
+            ranked.append({
+                'candidate_id': candidate_id,
+                'filename': filename,
+                'resume_hash': text_hash,
+                'rank': rank,
+                'similarity_score': round(score, SCORE_DECIMALS),
+                'percentage_match': round(score * 100, 2),
+                'skills': json.loads(skills_json),
+                'contact_info': json.loads(contact_json)
+            })
+        return ranked
+    
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM candidates').fetchone()[0]
+
+
+class Percolator:
+    """Open requisitions as standing queries, scored against every resume added to the store
+    
+    Each requisition's job description is kept as a hashed term-count row. The
+    rows are IDF-weighted and stacked into one JD matrix, so a batch of new
+    resumes is scored against every open requisition with a single sparse
+    product, and each requisition's top-k leaderboard is updated through a
+    min-heap. A new resume therefore costs O(requisitions) instead of
+    rescoring the pool for each of them.
+    
+    The IDF used for the matrix is a snapshot of the store's table, refreshed
+    once the pool has grown by PERCOLATOR_IDF_REFRESH, at which point the
+    leaderboard entries are rescored. Between refreshes, and for candidates
+    that dropped off a leaderboard, scores can differ slightly from a fresh
+    search. Requisitions are kept
+    in the candidate database, and their leaderboards are rebuilt from the
+    stored pool when first needed after a restart.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS requisitions (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            job_description TEXT NOT NULL,
+            top_k INTEGER NOT NULL,
+            created_at REAL NOT NULL
+        );
+    """
+    
+    def __init__(self, store):
+        self.store = store
+        self.requisitions = None           # id -> requisition, loaded on first use
+        self._matrix = None                # (requisition ids, IDF-weighted JD matrix transposed, idf)
+        self._matrix_docs = 0
+        self._lock = threading.RLock()
+    
+    def _load(self):
+        if self.requisitions is not None:
+            return
+        connection = self.store.connection
+        connection.executescript(self.SCHEMA)
+        self.requisitions = {}
+        for requisition_id, title, job_description, top_k, created_at in connection.execute(
+                'SELECT id, title, job_description, top_k, created_at FROM requisitions ORDER BY id'):
+            self._add(requisition_id, title, job_description, top_k, created_at)
+        self._backfill(list(self.requisitions))
+    
+    def _add(self, requisition_id, title, job_description, top_k, created_at):
+        scanner = self.store.scanner
+        requisition = {
+            'requisition_id': requisition_id,
+            'title': title,
+            'job_description': job_description,
+            'top_k': top_k,
+            'created_at': created_at,
+            'counts': scanner.hashed_counts([job_description]),
+            'heap': [],
+            'members': set(),
+            'scored': 0
+        }
+        self.requisitions[requisition_id] = requisition
+        self._matrix = None
+        return requisition
+    
+    def register(self, job_description, title='', top_k=PERCOLATOR_TOP_K):
+        """Open a requisition and return its summary"""
+        top_k = min(max(int(top_k), 1), PERCOLATOR_MAX_TOP_K)
+        with self._lock:
+            self._load()
+            connection = self.store.connection
+            created_at = time.time()
+            with connection:
+                requisition_id = connection.execute(
+                    'INSERT INTO requisitions (title, job_description, top_k, created_at) VALUES (?, ?, ?, ?)',
+                    (title, job_description, top_k, created_at)
+                ).lastrowid
+            requisition = self._add(requisition_id, title, job_description, top_k, created_at)
+            self._backfill([requisition_id])
+            return self.summary(requisition)
+    
+    def close(self, requisition_id):
+        """Close a requisition; returns False if it was not open"""
+        with self._lock:
+            self._load()
+            if self.requisitions.pop(requisition_id, None) is None:
+                return False
+            with self.store.connection as connection:
+                connection.execute('DELETE FROM requisitions WHERE id = ?', (requisition_id,))
+            self._matrix = None
+            return True
+    
+    def _backfill(self, requisition_ids):
+        """Seed leaderboards from the stored pool in one pass over the stored vectors"""
+        from scipy import sparse
+        if not requisition_ids:
+            return
+        table = self.store.idf_table()
+        idf = table.idf()
+        jd_matrix = table.transform(
+            sparse.vstack([self.requisitions[i]['counts'] for i in requisition_ids]).tocsr(), idf
+        ).T.tocsr()
+        cursor = self.store.connection.execute('SELECT id, vector_indices, vector_counts FROM candidates')
+        while True:
+            rows = cursor.fetchmany(STORE_VECTOR_CHUNK)
+            if not rows:
+                break
+            candidate_ids, counts = self.store._vectors(rows)
+            self._update(requisition_ids, candidate_ids, table.transform(counts, idf).dot(jd_matrix).toarray())
+    
+    def _update(self, requisition_ids, candidate_ids, scores):
+        """Offer scored candidates (rows) to the leaderboards of the requisitions (columns)"""
+        import numpy as np
+        for column, requisition_id in enumerate(requisition_ids):
+            requisition = self.requisitions[requisition_id]
+            heap, members = requisition['heap'], requisition['members']
+            column_scores = scores[:, column]
+            floor = heap[0][0] if len(heap) >= requisition['top_k'] else -1.0
+            for row in np.flatnonzero(column_scores > floor):
+                entry = (float(column_scores[row]), candidate_ids[row])
+                # Already ranked by the backfill of a requisition opened during this insert
+                if entry[1] in members:
+                    continue
+                if len(heap) < requisition['top_k']:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    members.discard(heapq.heapreplace(heap, entry)[1])
+                else:
+                    continue
+                members.add(entry[1])
+            requisition['scored'] += len(candidate_ids)
+    
+    def _jd_matrix(self):
+        """The stacked, IDF-weighted JD matrix, rebuilt when requisitions or the IDF snapshot are stale"""
+        from scipy import sparse
+        table = self.store.idf_table()
+        if self._matrix is None or table.n_docs > self._matrix_docs * (1 + PERCOLATOR_IDF_REFRESH):
+            ids = list(self.requisitions)
+            idf = table.idf()
+            matrix = table.transform(
+                sparse.vstack([self.requisitions[i]['counts'] for i in ids]).tocsr(), idf
+            ) if ids else None
+            self._matrix = (ids, matrix.T.tocsr() if matrix is not None else None, idf)
+            self._matrix_docs = table.n_docs
+            self._rescore_leaderboards()
+        return self._matrix
+    
+    def _rescore_leaderboards(self):
+        """Rescore every leaderboard entry with the current IDF snapshot so scores stay comparable"""
+        ids, jd_matrix, idf = self._matrix
+        members = sorted({member for i in ids for member in self.requisitions[i]['members']})
+        if not members:
+            return
+        rows = self.store._select_in(
+            'SELECT id, vector_indices, vector_counts FROM candidates WHERE id IN ({})', members
+        )
+        candidate_ids, counts = self.store._vectors(rows)
+        scores = self.store.idf_table().transform(counts, idf).dot(jd_matrix).toarray()
+        position = {candidate_id: row for row, candidate_id in enumerate(candidate_ids)}
+        for column, requisition_id in enumerate(ids):
+            requisition = self.requisitions[requisition_id]
+            requisition['members'] &= set(position)
+            requisition['heap'] = [
+                (float(scores[position[member], column]), member) for member in requisition['members']
+            ]
+            heapq.heapify(requisition['heap'])
+    
+    def percolate(self, candidate_ids, filenames, counts):
+        """Score newly stored resumes against every open requisition and update the leaderboards"""
+        with self._lock:
+            self._load()
+            if not self.requisitions or not candidate_ids:
+                return
+            ids, jd_matrix, idf = self._jd_matrix()
+            resumes = self.store.idf_table().transform(counts, idf)
+            # One sparse product scores the batch against every open requisition
+            self._update(ids, candidate_ids, resumes.dot(jd_matrix).toarray())
+    
+    def summary(self, requisition):
+        return {
+            'requisition_id': requisition['requisition_id'],
+            'title': requisition['title'],
+            'top_k': requisition['top_k'],
+            'created_at': requisition['created_at'],
+            'candidates_scored': requisition['scored']
+        }
+    
+    def open_requisitions(self):
+        with self._lock:
+            self._load()
+            return [self.summary(requisition) for requisition in self.requisitions.values()]
+    
+    def leaderboard(self, requisition_id, top=None):
+        """A requisition's best candidates in rank_candidates' format, or None if it is not open"""
+        with self._lock:
+            self._load()
+            requisition = self.requisitions.get(requisition_id)
+            if requisition is None:
+                return None
+            best = heapq.nlargest(top or requisition['top_k'], requisition['heap'])
+            summary = self.summary(requisition)
+        summary['ranked_candidates'] = self.store.describe([(candidate_id, score) for score, candidate_id in best])
+        return summary
+
+
+class ShardIndex:
+    """One partition of the candidate pool, held in memory by a shard process
+    
+    Resumes are vectorized with the hashing vectorizer when added, and their
+    skills and contact info are extracted here so ingest work is spread over
+    the shards. Scoring uses IDF statistics pushed by the coordinator, never
+    the shard's own, so scores from different shards are comparable.
+    """
+    
+    def __init__(self, scanner):
+        self.scanner = scanner
+        self.hashes = set()
+        self.candidates = []               # filename, skills, contact info and skill set per row
+        self._batches = []                 # hashed count matrices not yet stacked
+        self._counts = None
+        self._weighted = None
+        self.idf_version = None
+        self._idf = None
+        self._lock = threading.Lock()
+    
+    def add(self, candidates):
+        """Store new candidates and return the document frequencies of the ones added"""
+        import numpy as np
+        rows = []
+        with self._lock:
+            for candidate in candidates:
+                text_hash = content_hash(candidate['resume_text'])
+                if text_hash not in self.hashes:
+                    self.hashes.add(text_hash)
+                    rows.append(candidate)
+        if not rows:
+            return {'added': 0, 'df_indices': np.zeros(0, dtype=np.int32),
+                    'df_counts': np.zeros(0, dtype=np.int64), 'n_docs': len(self.candidates)}
+        
+        counts = self.scanner.hashed_counts([candidate['resume_text'] for candidate in rows])
+        entries = []
+        for candidate in rows:
+            skills = self.scanner.extract_skills(candidate['resume_text'])
+            entries.append({
+                'filename': candidate.get('filename', ''),
+                'skills': skills,
+                'contact_info': self.scanner.extract_contact_info(candidate['resume_text']),
+                'skill_set': {skill.lower() for found in skills.values() for skill in found}
+            })
+        df = np.bincount(counts.indices, minlength=counts.shape[1])
+        indices = np.flatnonzero(df).astype(np.int32)
+        with self._lock:
+            self.candidates.extend(entries)
+            self._batches.append(counts)
+            self._weighted = None
+            n_docs = len(self.candidates)
+        return {'added': len(rows), 'df_indices': indices, 'df_counts': df[indices], 'n_docs': n_docs}
+    
+    def stats(self):
+        """Document frequencies of the whole shard, for rebuilding the global IDF"""
+        table = HashedIdfTable(self.scanner.hashing_params['n_features'])
+        with self._lock:
+            if self._batches or self._counts is not None:
+                table.partial_fit(self._stacked())
+        indices, counts, n_docs = table.nonzero()
+        return {'df_indices': indices, 'df_counts': counts, 'n_docs': n_docs}
+    
+    def set_idf(self, version, indices, counts, n_docs):
+        table = HashedIdfTable(self.scanner.hashing_params['n_features'])
+        table.add_document_frequencies(indices, counts, n_docs)
+        with self._lock:
+            self._idf = table.idf()
+            self.idf_version = version
+            self._weighted = None
+    
+    def _stacked(self):
+        from scipy import sparse
+        if self._batches:
+            parts = ([self._counts] if self._counts is not None else []) + self._batches
+            self._counts = sparse.vstack(parts).tocsr()
+            self._batches = []
+        return self._counts
+    
+    def search(self, job_description, skills, top, idf_version):
+        """Local top candidates in rank_candidates' format and the number matching the skill filter"""
+        import numpy as np
+        with self._lock:
+            if idf_version != self.idf_version:
+                return {'stale_idf': True, 'n_docs': len(self.candidates)}
+            if not self.candidates:
+                return {'ranked_candidates': [], 'matching': 0, 'n_docs': 0}
+            table = HashedIdfTable(self.scanner.hashing_params['n_features'])
+            if self._weighted is None:
+                self._weighted = table.transform(self._stacked(), self._idf)
+            jd = table.transform(self.scanner.hashed_counts([job_description]), self._idf)
+            scores = self._weighted.dot(jd.T).toarray().ravel()
+            candidates = self.candidates
+        
+        skills = {skill.strip().lower() for skill in skills if skill.strip()}
+        if skills:
+            eligible = np.fromiter((skills <= c['skill_set'] for c in candidates), dtype=bool, count=len(candidates))
+            scores = np.where(eligible, scores, -1.0)
+            matching = int(eligible.sum())
+        else:
+            matching = len(candidates)
+        top = min(top, matching)
+        if not top:
+            return {'ranked_candidates': [], 'matching': 0, 'n_docs': len(candidates)}
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        ranked = []
+        for row in best:
+            score = round(float(scores[row]), SCORE_DECIMALS)
+            ranked.append({
+                'candidate_id': int(row),
+                'filename': candidates[row]['filename'],
+                'similarity_score': score,
+                'percentage_match': round(score * 100, 2),
+                'skills': candidates[row]['skills'],
+                'contact_info': candidates[row]['contact_info']
+            })
+        return {'ranked_candidates': ranked, 'matching': matching, 'n_docs': len(candidates)}
+    
+    def handle(self, message):
+        op = message.get('op')
+        if op == 'add':
+            return self.add(message['candidates'])
+        if op == 'search':
+            return self.search(message['job_description'], message.get('skills', ()),
+                               message['top'], message['idf_version'])
+        if op == 'stats':
+            return self.stats()
+        if op == 'set_idf':
+            self.set_idf(message['version'], message['df_indices'], message['df_counts'], message['n_docs'])
+            return {'idf_version': message['version']}
+        if op == 'ping':
+            return {'n_docs': len(self.candidates)}
+        raise ValueError(f"Unknown shard operation: {op}")
+
+
+def serve_shard_connection(conn, index):
+    """Answer one coordinator connection from a ShardIndex until the coordinator hangs up"""
+    with conn:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                return
+            try:
+                reply = dict(index.handle(message), ok=True)
+            except Exception as e:
+                reply = {'ok': False, 'error': str(e)}
+            conn.send(reply)
+
+
+def serve_shard(host='127.0.0.1', port=6001, authkey=SHARD_AUTHKEY):
+    """Run a shard process: serve one ShardIndex to coordinators until SIGTERM/SIGINT
+    
+    Messages are pickled dicts over multiprocessing.connection with HMAC
+    authentication; only expose shards to trusted hosts.
+    """
+    import signal
+    from multiprocessing.connection import Listener
+    
+    if not authkey:
+        raise ValueError('Set SHARD_AUTHKEY: shard connections are not accepted without a shared key')
+    index = ShardIndex(scanner)
+    warm_up()
+    
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, stop)
+    
+    listener = Listener((host, port), authkey=authkey)
+    print(f"🧩 Shard listening on {host}:{port} (pid {os.getpid()})")
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError):
+                continue
+            threading.Thread(target=serve_shard_connection, args=(conn, index), daemon=True).start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+
+
+class ShardCoordinator:
+    """Scatter-gather over ShardIndex processes with global IDF and partial results
+    
+    New candidates are routed to a shard by text hash. Each shard reports the
+    document frequencies of what it added, and the coordinator folds them into
+    one global IDF table. Before a search, that table is pushed to any shard
+    whose version is behind, so every shard scores with the same statistics.
+    Searches fan out in parallel. A shard that is down, or does not answer
+    within the timeout, is left out and the merged result is marked partial.
+    If a shard's document count no longer matches what the coordinator has
+    seen (it restarted, say), the global statistics are rebuilt from every
+    shard.
+    """
+    
+    def __init__(self, addresses, authkey=SHARD_AUTHKEY, search_timeout=SHARD_SEARCH_TIMEOUT,
+                 ingest_timeout=SHARD_INGEST_TIMEOUT):
+        if not authkey:
+            raise ValueError('Set SHARD_AUTHKEY: shard connections are not made without a shared key')
+        self.addresses = [self._parse_address(address) for address in addresses]
+        self.authkey = authkey
+        self.search_timeout = search_timeout
+        self.ingest_timeout = ingest_timeout
+        self.table = None
+        self.idf_version = 0
+        self.shard_docs = {}
+        self._shard_idf = {}
+        self._connections = {}
+        self._shard_locks = [threading.Lock() for _ in self.addresses]
+        self._lock = threading.Lock()
+        self._pool = None
+    
+    @staticmethod
+    def _parse_address(address):
+        if isinstance(address, tuple):
+            return address
+        host, _, port = address.strip().rpartition(':')
+        return host or '127.0.0.1', int(port)
+    
+    def _call(self, shard, message, timeout):
+        """Send one message to a shard and wait for its reply; raises on timeout or a dead shard"""
+        from multiprocessing.connection import Client
+        lock = self._shard_locks[shard]
+        # A call still stuck on a hung shard holds its lock; don't queue behind it
+        if not lock.acquire(timeout=timeout):
+            raise TimeoutError('shard is busy with a request that has not returned')
+        try:
+            conn = self._connections.pop(shard, None)
+            try:
+                if conn is None:
+                    conn = Client(self.addresses[shard], authkey=self.authkey)
+                conn.send(message)
+                if not conn.poll(timeout):
+                    # The late reply would be read by the next request: drop the connection
+                    raise TimeoutError(f'no reply within {timeout} s')
+                reply = conn.recv()
+            except BaseException:
+                if conn is not None:
+                    conn.close()
+                raise
+            self._connections[shard] = conn
+        finally:
+            lock.release()
+        if not reply.pop('ok'):
+            raise RuntimeError(reply['error'])
+        return reply
+    
+    def _scatter(self, messages, timeout):
+        """Call several shards in parallel; returns ({shard: reply}, {shard: error})
+        
+        Waits at most about timeout overall: a call stuck before its own timeout
+        applies (connecting to a hung shard) is abandoned, not waited for.
+        """
+        from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=2 * len(self.addresses))
+        deadline = time.monotonic() + timeout + 0.5
+        futures = {shard: self._pool.submit(self._call, shard, message, timeout) for shard, message in messages.items()}
+        replies, failures = {}, {}
+        for shard, future in futures.items():
+            try:
+                replies[shard] = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except FutureTimeout:
+                failures[shard] = f'TimeoutError: no reply within {timeout} s'
+            except Exception as e:
+                failures[shard] = f'{type(e).__name__}: {e}'
+        return replies, failures
+    
+    def wait_until_ready(self, timeout=60.0):
+        """Wait until every shard answers a ping; returns the shards still failing"""
+        deadline = time.monotonic() + timeout
+        while True:
+            replies, failures = self._scatter({shard: {'op': 'ping'} for shard in range(len(self.addresses))}, 1.0)
+            if not failures or time.monotonic() > deadline:
+                return failures
+            time.sleep(0.2)
+    
+    def _rebuild_statistics(self):
+        """Rebuild the global IDF table from every shard's document frequencies"""
+        replies, failures = self._scatter({shard: {'op': 'stats'} for shard in range(len(self.addresses))},
+                                          self.ingest_timeout)
+        table = HashedIdfTable(scanner.hashing_params['n_features'])
+        for shard, reply in replies.items():
+            table.add_document_frequencies(reply['df_indices'], reply['df_counts'], reply['n_docs'])
+        with self._lock:
+            self.table = table
+            self.shard_docs = {shard: reply['n_docs'] for shard, reply in replies.items()}
+            self.idf_version += 1
+        return failures
+    
+    def _ensure_statistics(self):
+        if self.table is None:
+            self._rebuild_statistics()
+    
+    def add_many(self, candidates):
+        """Route candidates to shards; returns (added, already stored, {shard: error})"""
+        self._ensure_statistics()
+        messages = {}
+        for candidate in candidates:
+            shard = int(content_hash(candidate['resume_text']), 16) % len(self.addresses)
+            messages.setdefault(shard, {'op': 'add', 'candidates': []})['candidates'].append({
+                'filename': candidate.get('filename', ''), 'resume_text': candidate['resume_text']
+            })
+        replies, failures = self._scatter(messages, self.ingest_timeout)
+        added = 0
+        with self._lock:
+            for shard, reply in replies.items():
+                added += reply['added']
+                if reply['added']:
+                    self.table.add_document_frequencies(reply['df_indices'], reply['df_counts'], reply['added'])
+                    self.idf_version += 1
+                self.shard_docs[shard] = reply['n_docs']
+        submitted = sum(len(messages[shard]['candidates']) for shard in replies)
+        return added, submitted - added, failures
+    
+    def _push_idf(self, shards):
+        with self._lock:
+            indices, counts, n_docs = self.table.nonzero()
+            version = self.idf_version
+        message = {'op': 'set_idf', 'version': version, 'df_indices': indices, 'df_counts': counts, 'n_docs': n_docs}
+        replies, failures = self._scatter({shard: message for shard in shards}, self.search_timeout)
+        for shard in replies:
+            self._shard_idf[shard] = version
+        return failures
+    
+    def search(self, job_description, skills=(), top=STORE_SEARCH_TOP):
+        """Merged top candidates across shards
+        
+        Returns (ranked candidates in rank_candidates' format, number matching
+        the skill filter, shard status). Candidate ids are "shard:row".
+        """
+        self._ensure_statistics()
+        shards = range(len(self.addresses))
+        for attempt in range(2):
+            failures = self._push_idf([s for s in shards if self._shard_idf.get(s) != self.idf_version])
+            message = {'op': 'search', 'job_description': job_description, 'skills': list(skills),
+                       'top': top, 'idf_version': self.idf_version}
+            replies, search_failures = self._scatter(
+                {shard: message for shard in shards if shard not in failures}, self.search_timeout
+            )
+            failures.update(search_failures)
+            stale = [shard for shard, reply in replies.items() if reply.get('stale_idf')]
+            for shard in stale:
+                # The shard restarted since its last IDF push
+                self._shard_idf.pop(shard, None)
+                failures[shard] = 'stale IDF statistics'
+                del replies[shard]
+            drifted = [shard for shard, reply in replies.items() if reply['n_docs'] != self.shard_docs.get(shard)]
+            if attempt or not (stale or drifted):
+                break
+            # Document counts changed behind our back: rebuild global statistics and ask again
+            self._rebuild_statistics()
+        
+        merged = heapq.nlargest(
+            top,
+            ((candidate['similarity_score'], shard, candidate) for shard, reply in replies.items()
+             for candidate in reply['ranked_candidates']),
+            key=lambda item: item[0]
+        )
+        ranked = []
+        for rank, (_, shard, candidate) in enumerate(merged, 1):
+            candidate = dict(candidate, candidate_id=f"{shard}:{candidate['candidate_id']}", rank=rank)
+            ranked.append(candidate)
+        status = {
+            'total': len(self.addresses),
+            'responded': len(replies),
+            'failed': {str(shard): error for shard, error in failures.items()},
+            'partial': bool(failures)
+        }
+        return ranked, sum(reply['matching'] for reply in replies.values()), status
+
+
+def start_local_shards(count, base_port, host='127.0.0.1'):
+    """Start count shard processes of this script on consecutive ports; returns (addresses, processes, authkey)
+    
+    The shards get a fresh random key through their environment, never on the command line.
+    """
+    import secrets
+    import subprocess
+    import sys
+    # Hex, since environment variables cannot hold arbitrary bytes
+    authkey = secrets.token_bytes(32).hex()
+    environment = dict(os.environ, SHARD_AUTHKEY=authkey)
+    processes, addresses = [], []
+    for i in range(count):
+        port = base_port + i
+        processes.append(subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--shard', '--host', host, '--port', str(port)],
+            stdin=subprocess.DEVNULL, env=environment
+        ))
+        addresses.append(f'{host}:{port}')
+    return addresses, processes, authkey.encode('utf-8')
+
+
+def page_of_results(result, offset=0, top=SCAN_PAGE_SIZE, fields=None):
+    """Slice a stored scan result into one page, keeping only the requested candidate fields"""
+    offset = max(int(offset), 0)
+    top = min(max(int(top), 0), SCAN_MAX_PAGE_SIZE)
+    page = result['ranked_candidates'][offset:offset + top]
+    if fields:
+        page = [{field: candidate[field] for field in fields if field in candidate} for candidate in page]
+    return {
+        'scan_id': result['scan_id'],
+        'ranked_candidates': page,
+        'total_candidates': len(result['ranked_candidates']),
+        'offset': offset,
+        'top': top,
+        'average_match': result['average_match'],
+        'duplicates_collapsed': result['duplicates_collapsed'],
+        'failed_files': result.get('failed_files', []),
+        'ranking_stats': result['ranking_stats']
+    }
+
+
+def parse_fields(value):
+    """Parse a comma separated 'fields' parameter into a list (None means all fields)"""
+    fields = [field.strip() for field in (value or '').split(',') if field.strip()]
+    return fields or None
+
+
+def admission_controlled(default_priority='high'):
+    """Run a view under the scheduler's admission control
+    
+    Tenant and priority come from the X-Tenant / X-Priority headers or the
+    'tenant' / 'priority' form or JSON fields. Refused requests get 429 (tenant
+    limit) or 503 with a Retry-After header.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            data = (request.get_json(silent=True) if request.is_json else request.form) or {}
+            tenant = request.headers.get('X-Tenant') or data.get('tenant') or 'default'
+            priority = (request.headers.get('X-Priority') or data.get('priority') or default_priority).lower()
+            try:
+                with scheduler.admit(tenant, priority) as g.admission:
+                    return view(*args, **kwargs)
+            except Overloaded as e:
+                response = jsonify({'error': str(e), 'retry_after': e.retry_after})
+                response.status_code = e.status
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        return wrapper
+    return decorator
+
+
+def is_archive(filename):
+    return filename.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def iter_archive_members(filename, fileobj, max_members=ARCHIVE_MAX_MEMBERS, max_bytes=ARCHIVE_MAX_BYTES):
+    """Yield (member filename, content, error) for each file in a zip or tar archive
+    
+    Members are read one at a time from the (spooled) upload, never extracted to
+    disk. Sizes are checked before a member is decompressed: members over the
+    per-file limit or with an implausible zip compression ratio are reported,
+    not read. Once the member count or the total uncompressed size passes its
+    limit, one error is yielded for the archive itself and the rest is skipped.
+    Member filenames are "archive/member"; only PDF and DOCX members are read.
+    """
+    import tarfile
+    import zipfile
+    
+    def member(name, size, read, ratio=1.0):
+        display = f'{filename}/{name}'
+        if not name.lower().endswith(RESUME_EXTENSIONS):
+            return display, None, 'unsupported file type'
+        if size > EXTRACT_MAX_BYTES:
+            return display, None, 'file exceeds the size limit'
+        if ratio > ARCHIVE_MAX_RATIO:
+            return display, None, 'suspicious compression ratio'
+        try:
+            content = read()
+        except Exception as e:
+            return display, None, f'unreadable archive member: {e}'
+        if len(content) > EXTRACT_MAX_BYTES:
+            return display, None, 'file exceeds the size limit'
+        return display, content, None
+    
+    def skipped(name):
+        base = os.path.basename(name.rstrip('/'))
+        return name.startswith('__MACOSX/') or base.startswith('.')
+    
+    total = 0
+    try:
+        if filename.lower().endswith('.zip'):
+            with zipfile.ZipFile(fileobj) as archive:
+                infos = archive.infolist()
+                if len(infos) > max_members:
+                    yield filename, None, f'archive has more than {max_members} members'
+                    return
+                for info in infos:
+                    if info.is_dir() or skipped(info.filename):
+                        continue
+                    total += info.file_size
+                    if total > max_bytes:
+                        yield filename, None, f'archive exceeds {max_bytes // (1024 * 1024)} MB uncompressed'
+                        return
+                    yield member(info.filename, info.file_size,
+                                 lambda: archive.open(info).read(EXTRACT_MAX_BYTES + 1),
+                                 info.file_size / max(info.compress_size, 1))
+        else:
+            # Stream mode reads a (compressed) tar front to back without seeking
+            with tarfile.open(fileobj=fileobj, mode='r|*') as archive:
+                for count, info in enumerate(archive, 1):
+                    if count > max_members:
+                        yield filename, None, f'archive has more than {max_members} members'
+                        return
+                    # Skipping a member still decompresses it, so every member counts
+                    total += info.size
+                    if total > max_bytes:
+                        yield filename, None, f'archive exceeds {max_bytes // (1024 * 1024)} MB uncompressed'
+                        return
+                    if not info.isfile() or skipped(info.name):
+                        continue
+                    yield member(info.name, info.size, lambda: archive.extractfile(info).read(EXTRACT_MAX_BYTES + 1))
+    except (zipfile.BadZipFile, tarfile.TarError, EOFError, OSError, zlib.error) as e:
+        yield filename, None, f'unreadable archive: {e}'
+
+
+def iter_uploaded_files(files):
+    """Yield (filename, content, error) for multipart uploads, expanding archives member by member"""
+    for file in files:
+        if not file.filename:
+            continue
+        if is_archive(file.filename):
+            yield from iter_archive_members(file.filename, file.stream)
+        else:
+            yield file.filename, file.read(), None
+
+
+def extract_files(sources, priority='high'):
+    """Extract (filename, content, error) sources in parallel on the extraction pool
+    
+    Returns (candidates, failed files); a file that cannot be extracted, or
+    that the extract stage refused under overload, is reported in the second
+    list and does not hold up or discard the others. Sources are
+    consumed only a few files ahead of the pool, so an archive is never held
+    in memory as a whole.
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+    pool = get_extraction_pool()
+    in_flight = []
+    results = []
+    for filename, content, error in sources:
+        if error is not None:
+            results.append((filename, None, error))
+            continue
+        future = pool.submit(scheduler.run, 'extract', priority, scanner.extract_resume, filename, content)
+        results.append((filename, future, None))
+        in_flight.append(future)
+        if len(in_flight) >= 2 * EXTRACTION_WORKERS:
+            _, not_done = wait(in_flight, return_when=FIRST_COMPLETED)
+            in_flight = list(not_done)
+    
+    candidates = []
+    failed = []
+    for filename, future, error in results:
+        if error is not None:
+            failed.append({'filename': filename, 'error': error})
+            continue
+        try:
+            extracted = future.result()
+        except ExtractionFailed as e:
+            failed.append({'filename': filename, 'error': str(e)})
+            continue
+        except Overloaded as e:
+            failed.append({'filename': filename, 'error': f'server busy, retry later ({e.reason})'})
+            continue
+        if extracted:
+            candidates.append({
+                'filename': filename,
+                'resume_text': extracted['text'],
+                'sections': extracted['sections']
+            })
+        else:
+            failed.append({'filename': filename, 'error': 'unsupported or unreadable file'})
+    return candidates, failed
+
+
+def extract_uploaded_files(files, priority='high'):
+    """Extract multipart resume files, and the PDF/DOCX members of zip and tar archives"""
+    return extract_files(iter_uploaded_files(files), priority)
+
+
+@functools.lru_cache(maxsize=None)
+def optional_module(name):
+    """Import an optional dependency once; None when it is not installed"""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def _encode_default(value):
+    """Fallback for values the encoders do not handle natively (NumPy scalars and arrays)"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f'Object of type {type(value).__name__} is not serializable')
+
+
+def encode_json(payload):
+    """Compact JSON bytes: orjson when installed, the stdlib encoder otherwise"""
+    orjson = optional_module('orjson')
+    if orjson is not None:
+        return orjson.dumps(payload, default=_encode_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=_encode_default, separators=(',', ':')).encode('utf-8')
+
+
+def iter_encoded(payload, encoding='json', chunk=RESPONSE_STREAM_CHUNK):
+    """Encode a dict as a sequence of byte strings, long lists chunk items at a time
+    
+    The pieces concatenate to the same document as encoding the payload at once,
+    but no piece is larger than one chunk of list items.
+    """
+    if encoding == 'msgpack':
+        packer = optional_module('msgpack').Packer(default=_encode_default)
+        yield packer.pack_map_header(len(payload))
+        for key, value in payload.items():
+            yield packer.pack(key)
+            if isinstance(value, list) and len(value) > chunk:
+                yield packer.pack_array_header(len(value))
+                for start in range(0, len(value), chunk):
+                    yield b''.join(packer.pack(item) for item in value[start:start + chunk])
+            else:
+                yield packer.pack(value)
+        return
+    
+    separator = b'{'
+    for key, value in payload.items():
+        yield separator + encode_json(key) + b':'
+        separator = b','
+        if isinstance(value, list) and len(value) > chunk:
+            for start in range(0, len(value), chunk):
+                # Each chunk is encoded as a list and loses its brackets
+                items = encode_json(value[start:start + chunk])
+                yield (b'[' if start == 0 else b',') + items[1:-1]
+            yield b']'
+        else:
+            yield encode_json(value)
+    yield b'}' if payload else b'{}'
+
+
+def _gzip_stream(pieces, level=5):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for piece in pieces:
+        data = compressor.compress(piece)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def encoded_response(payload):
+    """Response in the encoding the client prefers, gzip-compressed when accepted
+    
+    msgpack when the Accept header prefers it and the package is installed,
+    JSON otherwise. Payloads with a list longer than RESPONSE_STREAM_MIN_ITEMS
+    are streamed instead of encoded in one piece.
+    """
+    encoding, mimetype = 'json', 'application/json'
+    if optional_module('msgpack') is not None:
+        best = request.accept_mimetypes.best_match(('application/json',) + MSGPACK_MIMETYPES)
+        if best in MSGPACK_MIMETYPES:
+            encoding, mimetype = 'msgpack', best
+    compress = 'gzip' in request.headers.get('Accept-Encoding', '')
     
-    def extract_skills(self, text):
-        """Extract skills from resume text"""
-        text = self.preprocess_text(text)
-        found_skills = {}
-        
-        for category, skills in self.skill_keywords.items():
-            found_skills[category] = []
-            for skill in skills:
-                if skill.lower() in text:
-                    found_skills[category].append(skill)
-        
-        return found_skills
+    if any(isinstance(value, list) and len(value) > RESPONSE_STREAM_MIN_ITEMS for value in payload.values()):
+        body = iter_encoded(payload, encoding)
+        response = Response(_gzip_stream(body) if compress else body, mimetype=mimetype)
+    else:
+        if encoding == 'msgpack':
+            data = optional_module('msgpack').packb(payload, default=_encode_default)
+        else:
+            data = encode_json(payload)
+        compress = compress and len(data) >= GZIP_MIN_BYTES
+        response = Response(gzip.compress(data, compresslevel=5) if compress else data, mimetype=mimetype)
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Vary'] = 'Accept, Accept-Encoding'
+    return response
+
+
+class ResumeRequest(Request):
+    """Request whose multipart files only stay in memory when the whole request is small
     
-    def extract_contact_info(self, text):
-        """Extract contact information from resume"""
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        phone_pattern = r'(\+\d{1,3}[-.\s]?)?\(?(\d{3})\)?[-.\s]?(\d{3})[-.\s]?(\d{4})'
-        
-        emails = re.findall(email_pattern, text)
-        phones = re.findall(phone_pattern, text)
-        
-        return {
-            'emails': emails,
-            'phones': [''.join(phone) for phone in phones]
-        }
+    Werkzeug keeps each file in memory up to 500 KB, so a batch of typical
+    resumes would be held in memory in full until the request ends.
+    """
     
-    def calculate_similarity(self, resume_text, job_description):
-        """Calculate similarity between resume and job description using TF-IDF and cosine similarity"""
-        documents = [self.preprocess_text(resume_text), self.preprocess_text(job_description)]
-        
-        try:
-            tfidf_matrix = self.vectorizer.fit_transform(documents)
-            similarity_score = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-            return similarity_score
-        except Exception as e:
-            return 0.0
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if total_content_length is not None and total_content_length <= UPLOAD_SPOOL_MAX_BYTES:
+            return io.BytesIO()
+        return tempfile.TemporaryFile('rb+')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson when it is installed"""
     
-    def rank_candidates(self, candidates, job_description):
-        """Rank candidates based on their similarity to job description"""
-        ranked_candidates = []
-        
-        for candidate in candidates:
-            similarity_score = self.calculate_similarity(candidate['resume_text'], job_description)
-            candidate['similarity_score'] = similarity_score
-            candidate['percentage_match'] = round(similarity_score * 100, 2)
-            ranked_candidates.append(candidate)
-        
-        # Sort by similarity score in descending order
-        ranked_candidates.sort(key=lambda x: x['similarity_score'], reverse=True)
-        
-        return ranked_candidates
+    def dumps(self, obj, **kwargs):
+        orjson = optional_module('orjson')
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if kwargs.get('indent') else 0)
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+
+app.json = FastJSONProvider(app)
+app.request_class = ResumeRequest
 
 # Initialize the scanner
 scanner = ResumeScanner()
+duplicate_index = NearDuplicateIndex(scanner.preprocess_text)
+scan_results = SharedLRUCache(SCAN_RESULT_CACHE_SIZE, 'scan_results')
+scheduler = Scheduler()
+extraction_sandbox = ExtractionSandbox()
+if EXTRACTION_SANDBOX:
+    scanner.text_extractor = extraction_sandbox.extract
+uploads = UploadManager()
+candidate_store = CandidateStore(scanner)
+if RESUME_ARCHIVE_PATH:
+    candidate_store.text_archive = ResumeTextArchive()
+percolator = Percolator(candidate_store)
+candidate_store.on_insert = percolator.percolate
+# With SHARD_ADDRESSES set, the candidate pool lives in shard processes instead of SQLite
+shard_coordinator = ShardCoordinator(SHARD_ADDRESSES.split(',')) if SHARD_ADDRESSES else None
+# Resume text by content hash, so scan results can be explained after resume_text is dropped
+resume_texts = SharedLRUCache(RESUME_TEXT_CACHE_SIZE, 'resume_texts')
+if SCAN_RESULT_PATH:
+    scan_results.share(SCAN_RESULT_PATH)
+    resume_texts.share(SCAN_RESULT_PATH)
+# Caches worth keeping across restarts (started by the server entry points, not on import)
+cache_snapshot = CacheSnapshot(scanner, {
+    'extraction': scanner.extraction_cache,
+    'job_descriptions': scanner.job_description_cache,
+    'explanations': scanner.explanation_cache,
+    'scan_results': scan_results,
+    'resume_texts': resume_texts
+})
 
 # HTML template for the web interface
 HTML_TEMPLATE = """
@@ -468,6 +4657,34 @@ HTML_TEMPLATE = """
             border-color: #4f46e5;
         }
         
+        .candidate-viewport {
+            position: relative;
+            max-height: 70vh;
+            overflow-y: auto;
+            padding-right: 6px;
+        }
+        
+        .candidate-viewport .candidate-card {
+            position: absolute;
+            left: 0;
+            right: 6px;
+            overflow-y: auto;
+            margin-bottom: 0;
+            animation: none;
+            opacity: 1;
+            transform: none;
+        }
+        
+        .candidate-card.placeholder {
+            background: #f3f4f6;
+            box-shadow: none;
+        }
+        
+        .candidate-card.placeholder.load-error {
+            color: #b91c1c;
+            font-style: italic;
+        }
+        
         .candidate-header {
             display: flex;
             justify-content: space-between;
@@ -718,20 +4935,30 @@ HTML_TEMPLATE = """
                                 Click to upload or drag and drop
                             </div>
                             <div class="file-upload-subtext">
-                                Supports PDF and DOCX files (Max 10MB each)
+                                Supports PDF and DOCX files (Max 10MB each), or zip/tar archives of them
                             </div>
                             <input 
                                 type="file" 
                                 id="resumeFiles" 
                                 class="file-input" 
                                 multiple 
-                                accept=".pdf,.docx"
+                                accept=".pdf,.docx,.zip,.tar,.tgz,.gz,.bz2,.xz"
                                 onchange="handleFileSelection(this)"
                             >
                         </div>
                         <div id="selectedFiles" class="selected-files" style="display: none;"></div>
                     </div>
                     
+                    <div class="form-group">
+                        <label class="form-label" for="scoringEngine">
+                            <i class="fas fa-sliders-h"></i> Scoring Engine
+                        </label>
+                        <select id="scoringEngine" class="form-textarea" style="min-height: 0; padding: 12px 16px;">
+                            <option value="cosine">TF-IDF cosine similarity</option>
+                            <option value="bm25">BM25F (section weighted)</option>
+                        </select>
+                    </div>
+                    
                     <button class="scan-button" onclick="scanResumes()" id="scanBtn">
                         <i class="fas fa-search"></i>
                         Analyze & Rank Candidates
@@ -755,7 +4982,7 @@ HTML_TEMPLATE = """
                 
                 <div id="loadingState" class="loading-spinner" style="display: none;">
                     <div class="spinner"></div>
-                    <div style="font-size: 1.1em; font-weight: 600;">Processing Resumes...</div>
+                    <div id="loadingText" style="font-size: 1.1em; font-weight: 600;">Processing Resumes...</div>
                     <div style="margin-top: 10px; opacity: 0.7;">This may take a few moments</div>
                 </div>
                 
@@ -776,7 +5003,9 @@ HTML_TEMPLATE = """
                             </div>
                         </div>
                     </div>
-                    <div id="candidateList"></div>
+                    <div id="candidateList" class="candidate-viewport">
+                        <div id="candidateSpacer"></div>
+                    </div>
                 </div>
             </div>
         </div>
@@ -784,6 +5013,14 @@ HTML_TEMPLATE = """
     
     <script>
         let selectedFilesData = [];
+        let currentScan = null;
+        const PAGE_SIZE = 50;
+        
+        // Virtualized result list: every card occupies a fixed slot and only
+        // the slots near the viewport exist in the DOM
+        const ROW_HEIGHT = 380;
+        const CARD_GAP = 20;
+        const OVERSCAN = 3;
         
         // Drag and drop functionality
         const fileUploadArea = document.querySelector('.file-upload-area');
@@ -811,6 +5048,44 @@ HTML_TEMPLATE = """
         function handleFiles(files) {
             selectedFilesData = Array.from(files);
             displaySelectedFiles();
+            startUpload();
+        }
+        
+        // Uploads start as soon as files are selected, so the server is extracting
+        // them while the job description is still being written
+        let pendingUpload = null;
+        let uploadProgress = null;
+        
+        function startUpload() {
+            pendingUpload = null;
+            if (selectedFilesData.length === 0) return;
+            const upload = {files: selectedFilesData};
+            upload.batchId = uploadBatch(selectedFilesData, (done, total) => {
+                if (pendingUpload === upload) uploadProgress = {done, total};
+            });
+            upload.batchId.catch(() => {});   // reported when the scan awaits it
+            uploadProgress = null;
+            pendingUpload = upload;
+        }
+        
+        // The job description is analyzed on the server once it stops changing
+        const PREPARE_DELAY_MS = 600;
+        let prepareTimer = null;
+        let preparedJobDescription = '';
+        
+        function scheduleJobDescriptionPrepare(text) {
+            clearTimeout(prepareTimer);
+            prepareTimer = setTimeout(() => prepareJobDescription(text), PREPARE_DELAY_MS);
+        }
+        
+        function prepareJobDescription(text) {
+            if (!text.trim() || text === preparedJobDescription) return;
+            preparedJobDescription = text;
+            fetch('/api/jd/prepare', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({job_description: text})
+            }).catch(() => { preparedJobDescription = ''; });
         }
         
         function displaySelectedFiles() {
@@ -861,12 +5136,26 @@ HTML_TEMPLATE = """
             
             const formData = new FormData();
             formData.append('job_description', jobDescription);
+            formData.append('engine', document.getElementById('scoringEngine').value);
+            formData.append('top', PAGE_SIZE);
             
-            selectedFilesData.forEach(file => {
-                formData.append('resumes', file);
-            });
-            
+            const loadingText = document.getElementById('loadingText');
+            // Usually already running since the files were selected; a batch is consumed by one scan
+            if (!pendingUpload || pendingUpload.files !== selectedFilesData) startUpload();
+            const upload = pendingUpload;
+            pendingUpload = null;
+            const progressTimer = setInterval(() => {
+                if (uploadProgress) {
+                    loadingText.textContent = `Uploading resumes... ${uploadProgress.done}/${uploadProgress.total}`;
+                }
+            }, 200);
             try {
+                // Files go up in chunks; the server extracts each one as soon as it is complete
+                const batchId = await upload.batchId;
+                clearInterval(progressTimer);
+                formData.append('batch_id', batchId);
+                loadingText.textContent = 'Processing Resumes...';
+                
                 const response = await fetch('/scan', {
                     method: 'POST',
                     body: formData
@@ -877,12 +5166,71 @@ HTML_TEMPLATE = """
             } catch (error) {
                 showNotification('Error processing resumes: ' + error.message, 'error');
             } finally {
+                clearInterval(progressTimer);
                 document.getElementById('loadingState').style.display = 'none';
                 scanBtn.disabled = false;
                 scanBtn.innerHTML = '<i class="fas fa-search"></i> Analyze & Rank Candidates';
+                loadingText.textContent = 'Processing Resumes...';
+            }
+        }
+        
+        // Chunked, resumable uploads
+        const CHUNK_SIZE = 2 * 1024 * 1024;
+        const UPLOAD_CONCURRENCY = 4;
+        const UPLOAD_RETRIES = 3;
+        
+        async function uploadBatch(files, onProgress) {
+            const response = await fetch('/upload', {method: 'POST'});
+            const batch = await response.json();
+            if (batch.error) throw new Error(batch.error);
+            
+            const pending = files.filter(file => file.size > 0);
+            let next = 0;
+            let done = 0;
+            async function uploadNext() {
+                while (next < pending.length) {
+                    const index = next++;
+                    await uploadFile(batch.batch_id, `f${index}`, pending[index]);
+                    onProgress(++done, pending.length);
+                }
+            }
+            const workers = Array.from({length: Math.min(UPLOAD_CONCURRENCY, pending.length)}, uploadNext);
+            await Promise.all(workers);
+            return batch.batch_id;
+        }
+        
+        async function uploadFile(batchId, fileId, file) {
+            let offset = 0;
+            let failures = 0;
+            while (offset < file.size) {
+                const url = `/upload/${batchId}/${fileId}?offset=${offset}&size=${file.size}` +
+                    `&filename=${encodeURIComponent(file.name)}`;
+                let response;
+                try {
+                    response = await fetch(url, {method: 'PUT', body: file.slice(offset, offset + CHUNK_SIZE)});
+                } catch (error) {
+                    // Network hiccup: ask the server how much arrived and resume from there
+                    if (++failures > UPLOAD_RETRIES) throw error;
+                    await new Promise(resolve => setTimeout(resolve, 500 * failures));
+                    offset = await receivedBytes(batchId, fileId);
+                    continue;
+                }
+                const result = await response.json();
+                if (response.ok || response.status === 409) {
+                    offset = result.received;
+                    failures = 0;
+                } else {
+                    throw new Error(`${file.name}: ${result.error}`);
+                }
             }
         }
         
+        async function receivedBytes(batchId, fileId) {
+            const response = await fetch(`/upload/${batchId}`);
+            const status = await response.json();
+            return (status.files && status.files[fileId]) ? status.files[fileId].received : 0;
+        }
+        
         function displayResults(data) {
             if (data.error) {
                 showNotification('Error: ' + data.error, 'error');
@@ -892,32 +5240,137 @@ HTML_TEMPLATE = """
             
             document.getElementById('resultsContainer').style.display = 'block';
             
-            // Update statistics
-            const totalCandidates = data.ranked_candidates.length;
-            const avgScore = totalCandidates > 0 ? 
-                Math.round(data.ranked_candidates.reduce((sum, c) => sum + c.percentage_match, 0) / totalCandidates) : 0;
+            if (data.failed_files && data.failed_files.length) {
+                const names = data.failed_files.map(file => `${file.filename} (${file.error})`).join(', ');
+                showNotification(`${data.failed_files.length} file(s) could not be processed: ${names}`, 'error');
+            }
+            
+            // Update statistics (computed server-side over the whole result set)
+            document.getElementById('totalCandidates').textContent = data.total_candidates;
+            document.getElementById('avgScore').textContent = Math.round(data.average_match) + '%';
             
-            document.getElementById('totalCandidates').textContent = totalCandidates;
-            document.getElementById('avgScore').textContent = avgScore + '%';
+            // Reset the virtualized list for the new result set
+            const viewport = document.getElementById('candidateList');
+            viewport.querySelectorAll('.candidate-card').forEach(card => card.remove());
+            viewport.scrollTop = 0;
+            currentScan = {
+                id: data.scan_id,
+                total: data.total_candidates,
+                candidates: new Map(),
+                pendingPages: new Set(),
+                cards: new Map()
+            };
+            storeCandidates(data.offset, data.ranked_candidates);
+            document.getElementById('candidateSpacer').style.height = `${data.total_candidates * ROW_HEIGHT}px`;
+            renderVisibleCandidates();
+        }
+        
+        function storeCandidates(offset, candidates) {
+            candidates.forEach((candidate, i) => currentScan.candidates.set(offset + i, candidate));
+        }
+        
+        async function fetchPage(offset) {
+            const scan = currentScan;
+            if (scan.pendingPages.has(offset)) return;
+            scan.pendingPages.add(offset);
+            try {
+                const response = await fetch(`/scan/${scan.id}?offset=${offset}&top=${PAGE_SIZE}`);
+                const data = await response.json();
+                if (data.error) {
+                    showNotification('Error: ' + data.error, 'error');
+                    showPageError(scan, offset);
+                    return;
+                }
+                if (scan !== currentScan) return;
+                storeCandidates(data.offset, data.ranked_candidates);
+                // Swap placeholders of the fetched page for real cards
+                for (let i = data.offset; i < data.offset + data.ranked_candidates.length; i++) {
+                    const card = scan.cards.get(i);
+                    if (card && card.classList.contains('placeholder')) {
+                        card.remove();
+                        scan.cards.delete(i);
+                    }
+                }
+                renderVisibleCandidates();
+            } catch (error) {
+                showNotification('Error loading candidates: ' + error.message, 'error');
+                showPageError(scan, offset);
+            } finally {
+                scan.pendingPages.delete(offset);
+            }
+        }
+        
+        function showPageError(scan, offset) {
+            // The rows stay error rows while in view; once they scroll out they are
+            // dropped, and the page is requested again when it scrolls back in
+            for (let i = offset; i < offset + PAGE_SIZE; i++) {
+                const card = scan.cards.get(i);
+                if (card && card.classList.contains('placeholder')) {
+                    card.classList.add('load-error');
+                    card.textContent = 'Could not load this candidate. Scroll away and back to retry.';
+                }
+            }
+        }
+        
+        function renderVisibleCandidates() {
+            if (!currentScan) return;
+            const viewport = document.getElementById('candidateList');
+            const first = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+            const last = Math.min(
+                currentScan.total - 1,
+                Math.ceil((viewport.scrollTop + viewport.clientHeight) / ROW_HEIGHT) + OVERSCAN
+            );
             
-            // Display candidates
-            const candidateList = document.getElementById('candidateList');
-            candidateList.innerHTML = '';
+            // Drop cards that scrolled out of the window
+            currentScan.cards.forEach((card, index) => {
+                if (index < first || index > last) {
+                    card.remove();
+                    currentScan.cards.delete(index);
+                }
+            });
             
-            data.ranked_candidates.forEach((candidate, index) => {
-                const candidateCard = createCandidateCard(candidate, index + 1);
-                candidateList.appendChild(candidateCard);
-                
-                // Animate entry with delay
-                setTimeout(() => {
-                    candidateCard.style.animationDelay = `${index * 0.1}s`;
-                }, 100);
+            const fragment = document.createDocumentFragment();
+            for (let index = first; index <= last; index++) {
+                if (currentScan.cards.has(index)) continue;
+                const candidate = currentScan.candidates.get(index);
+                let card;
+                if (candidate) {
+                    card = createCandidateCard(candidate, candidate.rank);
+                } else {
+                    card = document.createElement('div');
+                    card.className = 'candidate-card placeholder';
+                    fetchPage(Math.floor(index / PAGE_SIZE) * PAGE_SIZE);
+                }
+                card.style.top = `${index * ROW_HEIGHT}px`;
+                card.style.height = `${ROW_HEIGHT - CARD_GAP}px`;
+                currentScan.cards.set(index, card);
+                fragment.appendChild(card);
+            }
+            viewport.appendChild(fragment);
+        }
+        
+        let renderScheduled = false;
+        document.getElementById('candidateList').addEventListener('scroll', () => {
+            if (renderScheduled) return;
+            renderScheduled = true;
+            requestAnimationFrame(() => {
+                renderScheduled = false;
+                renderVisibleCandidates();
             });
+        });
+        
+        // Filenames come from uploaders (and from the members of their archives)
+        function escapeHtml(value) {
+            const entities = {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'};
+            return String(value).replace(/[&<>"']/g, character => entities[character]);
         }
         
         function createCandidateCard(candidate, rank) {
             const card = document.createElement('div');
             card.className = 'candidate-card';
+            if (rank <= 3) {
+                card.classList.add(`top-rank-${rank}`);
+            }
             
             // Determine rank styling
             let rankClass = 'candidate-rank';
@@ -956,7 +5409,12 @@ HTML_TEMPLATE = """
             
             // Build contact info HTML
             let contactHtml = '';
-            if (candidate.contact_info.emails.length > 0 || candidate.contact_info.phones.length > 0) {
+            const links = [].concat(
+                candidate.contact_info.linkedin || [],
+                candidate.contact_info.github || [],
+                candidate.contact_info.urls || []
+            );
+            if (candidate.contact_info.emails.length > 0 || candidate.contact_info.phones.length > 0 || links.length > 0) {
                 contactHtml = '<div class="contact-info">';
                 if (candidate.contact_info.emails.length > 0) {
                     contactHtml += `
@@ -974,16 +5432,37 @@ HTML_TEMPLATE = """
                         </div>
                     `;
                 }
+                if (links.length > 0) {
+                    contactHtml += `
+                        <div class="contact-item">
+                            <i class="fas fa-link"></i>
+                            <span>${links.map(url => `<a href="${url}" target="_blank" rel="noopener">${url.replace('https://', '')}</a>`).join(', ')}</span>
+                        </div>
+                    `;
+                }
                 contactHtml += '</div>';
             }
             
+            // Near-duplicate submissions collapsed onto this candidate
+            let duplicatesHtml = '';
+            if (candidate.duplicates && candidate.duplicates.length > 0) {
+                duplicatesHtml = `
+                    <div class="contact-info">
+                        <div class="contact-item" title="${escapeHtml(candidate.duplicates.join(', '))}">
+                            <i class="fas fa-clone"></i>
+                            <span>${candidate.duplicates.length} duplicate submission(s) collapsed</span>
+                        </div>
+                    </div>
+                `;
+            }
+            
             card.innerHTML = `
                 <div class="candidate-header">
                     <div class="${rankClass}">
                         <i class="${rankIcon}"></i> #${rank}
                     </div>
                     <div class="candidate-name">
-                        <i class="fas fa-user"></i> ${candidate.filename.replace(/\.(pdf|docx)$/i, '')}
+                        <i class="fas fa-user"></i> ${escapeHtml(candidate.filename.replace(/\.(pdf|docx)$/i, ''))}
                     </div>
                     <div class="match-score">
                         <div class="score-number">${candidate.percentage_match}%</div>
@@ -1014,6 +5493,7 @@ HTML_TEMPLATE = """
                 `}
                 
                 ${contactHtml}
+                ${duplicatesHtml}
             `;
             
             return card;
@@ -1109,15 +5589,15 @@ HTML_TEMPLATE = """
                 background: linear-gradient(135deg, #d97706 0%, #b45309 100%) !important;
             }
             
-            .candidate-card:nth-child(1) {
+            .candidate-card.top-rank-1 {
                 border-left: 4px solid #fbbf24;
             }
             
-            .candidate-card:nth-child(2) {
+            .candidate-card.top-rank-2 {
                 border-left: 4px solid #9ca3af;
             }
             
-            .candidate-card:nth-child(3) {
+            .candidate-card.top-rank-3 {
                 border-left: 4px solid #d97706;
             }
         `;
@@ -1136,12 +5616,14 @@ HTML_TEMPLATE = """
             const jobDescTextarea = document.getElementById('jobDescription');
             jobDescTextarea.addEventListener('input', function() {
                 localStorage.setItem('jobDescription', this.value);
+                scheduleJobDescriptionPrepare(this.value);
             });
             
             // Load saved job description
             const savedJobDesc = localStorage.getItem('jobDescription');
             if (savedJobDesc) {
                 jobDescTextarea.value = savedJobDesc;
+                scheduleJobDescriptionPrepare(savedJobDesc);
             }
         });
     </script>
@@ -1150,11 +5632,37 @@ HTML_TEMPLATE = """
 """
                 
 
+# The page has no template variables, so it is encoded once and served as a
+# static asset with an ETag instead of being rendered on every request.
+INDEX_HTML = HTML_TEMPLATE.encode('utf-8')
+INDEX_ETAG = content_hash(INDEX_HTML)
+
+
+def warm_up():
+    """Import heavy dependencies and build lazily created models ahead of traffic
+    
+    Safe to call from a pre-fork hook or a background thread; everything it
+    touches is otherwise created on first use.
+    """
+    import numpy
+    import PyPDF2
+    import docx
+    from sklearn.metrics.pairwise import cosine_similarity
+    scanner.vectorizer
+    scanner.tokenizer.vocabulary
+    scanner.tokenizer.column('warm up')
+    duplicate_index._permutations()
+
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    response = Response(INDEX_HTML, mimetype='text/html')
+    response.set_etag(INDEX_ETAG)
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @app.route('/scan', methods=['POST'])
+@admission_controlled()
 def scan_resumes():
     try:
         job_description = request.form.get('job_description', '')
@@ -1162,58 +5670,319 @@ def scan_resumes():
             return jsonify({'error': 'Job description is required'})
         
         files = request.files.getlist('resumes')
-        if not files:
+        batch_id = request.form.get('batch_id')
+        if not files and not batch_id:
             return jsonify({'error': 'No resume files uploaded'})
         
+        # Files sent through chunked uploads were extracted while the upload was running
         candidates = []
+        failed_files = []
+        if batch_id:
+            try:
+                candidates, failed_files = uploads.collect(batch_id)
+            except KeyError:
+                return jsonify({'error': 'Unknown or expired upload batch'})
         
-        for file in files:
-            if file.filename == '':
-                continue
-                
-            file_content = file.read()
-            filename = file.filename
-            
-            # Extract text based on file type
-            if filename.lower().endswith('.pdf'):
-                resume_text = scanner.extract_text_from_pdf(file_content)
-            elif filename.lower().endswith('.docx'):
-                resume_text = scanner.extract_text_from_docx(file_content)
-            else:
-                continue  # Skip unsupported file types
-            
-            if resume_text and not resume_text.startswith('Error'):
-                # Extract skills and contact info
-                skills = scanner.extract_skills(resume_text)
-                contact_info = scanner.extract_contact_info(resume_text)
-                
-                candidate = {
-                    'filename': filename,
-                    'resume_text': resume_text,
-                    'skills': skills,
-                    'contact_info': contact_info
-                }
-                candidates.append(candidate)
+        # Extract text and sections of uploaded files
+        extracted, failed = extract_uploaded_files(files, g.admission.priority)
+        candidates.extend(extracted)
+        failed_files.extend(failed)
         
         if not candidates:
-            return jsonify({'error': 'No valid resumes could be processed'})
+            return jsonify({'error': 'No valid resumes could be processed', 'failed_files': failed_files})
+        
+        # Optionally keep every extracted resume in the persistent candidate store
+        if request.form.get('store', '').lower() in ('1', 'true', 'yes', 'on'):
+            candidate_store.add_many(candidates)
+        
+        # Near-duplicate submissions are collapsed so they are only scored once
+        received = len(candidates)
+        if request.form.get('dedupe', '1').lower() not in ('0', 'false', 'no', 'off'):
+            candidates = collapse_duplicates(candidates, duplicate_index)
         
-        # Rank candidates
-        ranked_candidates = scanner.rank_candidates(candidates, job_description)
+        # Rank candidates, optionally through the cheap prefilter first
+        cascade = request.form.get('cascade', '').lower() in ('1', 'true', 'yes', 'on')
+        top_n = int(request.form.get('cascade_top_n', CASCADE_TOP_N))
+        min_prefilter_score = float(request.form.get('cascade_min_score', CASCADE_MIN_PREFILTER_SCORE))
+        ranking_stats = {}
+        with scheduler.stage('score', g.admission.priority):
+            ranked_candidates = scanner.rank_candidates(
+                candidates, job_description, cascade=cascade, top_n=top_n,
+                min_prefilter_score=min_prefilter_score, stats=ranking_stats,
+                engine=request.form.get('engine') or None
+            )
         
-        # Remove resume_text from response to reduce size
-        for candidate in ranked_candidates:
+        # Skills and contact info are only extracted for candidates that survived ranking
+        scanned_texts = {}
+        for rank, candidate in enumerate(ranked_candidates, 1):
+            candidate['rank'] = rank
+            candidate['similarity_score'] = round(candidate['similarity_score'], SCORE_DECIMALS)
+            candidate['skills'] = scanner.extract_skills(candidate['resume_text'])
+            candidate['contact_info'] = scanner.extract_contact_info(candidate['resume_text'])
+            candidate['resume_hash'] = content_hash(candidate['resume_text'])
+            scanned_texts[candidate['resume_hash']] = candidate['resume_text']
+            # Remove resume_text and section offsets from stored results to reduce size
             del candidate['resume_text']
+            del candidate['sections']
         
-        return jsonify({
+        # Keep the full result set server-side and return the first page
+        result = {
+            'scan_id': uuid.uuid4().hex,
             'ranked_candidates': ranked_candidates,
-            'total_candidates': len(ranked_candidates)
+            'average_match': round(
+                sum(c['percentage_match'] for c in ranked_candidates) / len(ranked_candidates), 2
+            ) if ranked_candidates else 0.0,
+            'duplicates_collapsed': received - len(candidates),
+            'failed_files': failed_files,
+            'ranking_stats': ranking_stats
+        }
+        resume_texts.put_many(scanned_texts)
+        scan_results.put(result['scan_id'], result)
+        
+        return encoded_response(page_of_results(
+            result,
+            offset=request.values.get('offset', 0),
+            top=request.values.get('top', SCAN_PAGE_SIZE),
+            fields=parse_fields(request.values.get('fields'))
+        ))
+        
+    except Overloaded:
+        raise
+    except Exception as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/scan/<scan_id>', methods=['GET'])
+def scan_page(scan_id):
+    """Fetch another page of a stored scan result"""
+    try:
+        result = scan_results.get(scan_id)
+        if result is None:
+            return jsonify({'error': 'Unknown or expired scan_id'}), 404
+        
+        return encoded_response(page_of_results(
+            result,
+            offset=request.args.get('offset', 0),
+            top=request.args.get('top', SCAN_PAGE_SIZE),
+            fields=parse_fields(request.args.get('fields'))
+        ))
+        
+    except Exception as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/upload', methods=['POST'])
+def create_upload_batch():
+    """Start a chunked upload batch"""
+    try:
+        return jsonify({'batch_id': uploads.create_batch()})
+    except Exception as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/upload/<batch_id>', methods=['GET'])
+def upload_batch_status(batch_id):
+    """Bytes received per file, used by clients to resume interrupted uploads"""
+    batch = uploads.get(batch_id)
+    if batch is None:
+        return jsonify({'error': 'Unknown or expired upload batch'}), 404
+    return jsonify({'batch_id': batch_id, 'files': batch.status()})
+
+@app.route('/upload/<batch_id>/<file_id>', methods=['PUT'])
+def upload_chunk(batch_id, file_id):
+    """Append one chunk (raw request body) at ?offset= to a file of ?size= bytes"""
+    try:
+        batch = uploads.get(batch_id)
+        if batch is None:
+            return jsonify({'error': 'Unknown or expired upload batch'}), 404
+        if (request.content_length or 0) > UPLOAD_CHUNK_MAX_BYTES:
+            return jsonify({'error': 'Chunk too large'}), 413
+        
+        accepted, received = uploads.write_chunk(
+            batch, file_id,
+            filename=request.args.get('filename', file_id),
+            offset=int(request.args.get('offset', 0)),
+            size=int(request.args['size']),
+            data=request.get_data()
+        )
+        if not accepted:
+            # Out-of-order or repeated chunk: tell the client where to resume
+            return jsonify({'error': 'Offset mismatch', 'received': received}), 409
+        return jsonify({'received': received})
+        
+    except (KeyError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/api/jd/prepare', methods=['POST'])
+@admission_controlled(default_priority='low')
+def api_prepare_job_description():
+    """Analyze a job description ahead of the scan that will use it
+    
+    The UI calls this once the text stops changing; the following /scan with the
+    same text finds it in the scanner's job description cache.
+    """
+    try:
+        data = request.get_json(silent=True) or request.form
+        job_description = data.get('job_description', '')
+        if not job_description:
+            return jsonify({'error': 'job_description is required'})
+        
+        cached = content_hash(job_description) in scanner.job_description_cache
+        with scheduler.stage('score', g.admission.priority):
+            prepared = scanner.prepare_job_description(job_description)
+        return jsonify({
+            'jd_hash': prepared['hash'],
+            'cached': cached,
+            'skills': prepared['skills'],
+            'key_terms': sorted(prepared['key_terms'])
         })
         
+    except Overloaded:
+        raise
+    except Exception as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/api/candidates', methods=['POST'])
+@admission_controlled(default_priority='low')
+def api_add_candidates():
+    """Add resumes to the persistent candidate store
+    
+    Accepts uploaded 'resumes' files (multipart) or JSON
+    {"resumes": [{"filename": ..., "resume_text": ...}, ...]}.
+    """
+    try:
+        candidates = []
+        failed_files = []
+        if request.is_json:
+            for resume in request.json.get('resumes', []):
+                if resume.get('resume_text'):
+                    candidates.append({'filename': resume.get('filename', ''), 'resume_text': resume['resume_text']})
+        else:
+            candidates, failed_files = extract_uploaded_files(request.files.getlist('resumes'), g.admission.priority)
+        if not candidates:
+            return jsonify({'error': 'No valid resumes could be processed', 'failed_files': failed_files})
+        
+        if shard_coordinator is not None:
+            added, existing, failed_shards = shard_coordinator.add_many(candidates)
+            return jsonify({'added': added, 'already_stored': existing, 'failed_files': failed_files,
+                            'failed_shards': {str(shard): error for shard, error in failed_shards.items()}})
+        
+        with scheduler.stage('score', g.admission.priority):
+            added, existing = candidate_store.add_many(candidates)
+        return jsonify({'added': added, 'already_stored': existing, 'total_stored': len(candidate_store),
+                        'failed_files': failed_files})
+        
+    except Overloaded:
+        raise
+    except Exception as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/api/candidates/search', methods=['POST'])
+def api_search_candidates():
+    """Rank stored candidates that have all required skills against a job description"""
+    try:
+        data = request.json
+        job_description = data.get('job_description', '')
+        if not job_description:
+            return jsonify({'error': 'job_description is required'})
+        
+        top = int(data.get('top', STORE_SEARCH_TOP))
+        if shard_coordinator is not None:
+            ranked_candidates, matching, shards = shard_coordinator.search(
+                job_description, skills=data.get('skills', []), top=top
+            )
+            return encoded_response({'ranked_candidates': ranked_candidates, 'total_matching': matching,
+                                     'shards': shards})
+        
+        ranked_candidates, matching = candidate_store.search(
+            job_description, skills=data.get('skills', []), top=top
+        )
+        return encoded_response({'ranked_candidates': ranked_candidates, 'total_matching': matching})
+        
+    except Exception as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/api/requisitions', methods=['GET', 'POST'])
+def api_requisitions():
+    """List open requisitions, or open one from {"job_description", "title", "top_k"}
+    
+    Every resume added to the candidate store afterwards is scored against all
+    open requisitions as it arrives.
+    """
+    try:
+        if request.method == 'GET':
+            return jsonify({'requisitions': percolator.open_requisitions()})
+        
+        data = request.json
+        job_description = data.get('job_description', '')
+        if not job_description:
+            return jsonify({'error': 'job_description is required'})
+        return jsonify(percolator.register(
+            job_description, title=data.get('title', ''), top_k=data.get('top_k', PERCOLATOR_TOP_K)
+        ))
+        
+    except Exception as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/api/requisitions/<int:requisition_id>', methods=['GET', 'DELETE'])
+def api_requisition(requisition_id):
+    """Leaderboard of an open requisition (?top=N), or close it with DELETE"""
+    try:
+        if request.method == 'DELETE':
+            if not percolator.close(requisition_id):
+                return jsonify({'error': 'Unknown requisition'}), 404
+            return jsonify({'closed': requisition_id})
+        
+        top = request.args.get('top')
+        leaderboard = percolator.leaderboard(requisition_id, top=int(top) if top else None)
+        if leaderboard is None:
+            return jsonify({'error': 'Unknown requisition'}), 404
+        return jsonify(leaderboard)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/api/explain', methods=['POST'])
+def api_explain():
+    """Explain a candidate's cosine score against a job description
+    
+    The resume is given as 'resume_text', as a candidate of an earlier scan via
+    'scan_id' plus 'rank', or as the 'resume_hash' of a stored candidate.
+    """
+    try:
+        data = request.json
+        job_description = data.get('job_description', '')
+        if not job_description:
+            return jsonify({'error': 'job_description is required'})
+        
+        resume_text = data.get('resume_text', '')
+        resume_hash = data.get('resume_hash')
+        if not resume_text and data.get('scan_id'):
+            result = scan_results.get(data['scan_id'])
+            if result is None:
+                return jsonify({'error': 'Unknown or expired scan_id'}), 404
+            rank = int(data.get('rank', 1))
+            if not 1 <= rank <= len(result['ranked_candidates']):
+                return jsonify({'error': 'rank out of range'}), 400
+            resume_hash = result['ranked_candidates'][rank - 1]['resume_hash']
+        if not resume_text and resume_hash:
+            # Recent scans are cached in memory; stored candidates are in the text archive
+            resume_text = resume_texts.get(resume_hash)
+            if resume_text is None and candidate_store.text_archive is not None:
+                resume_text = candidate_store.text_archive.get(resume_hash)
+            if resume_text is None:
+                return jsonify({'error': 'Resume text is no longer cached; submit resume_text instead'}), 410
+        if not resume_text:
+            return jsonify({'error': 'One of resume_text, scan_id and rank, or resume_hash is required'})
+        
+        return jsonify(scanner.explain(
+            resume_text, job_description, top_terms=int(data.get('top_terms', EXPLAIN_TOP_TERMS))
+        ))
+        
     except Exception as e:
         return jsonify({'error': str(e)})
 
 @app.route('/api/analyze', methods=['POST'])
+@admission_controlled()
 def api_analyze():
     """API endpoint for programmatic access"""
     try:
@@ -1225,9 +5994,10 @@ def api_analyze():
             return jsonify({'error': 'Both job_description and resume_text are required'})
         
         # Analyze single resume
-        skills = scanner.extract_skills(resume_text)
-        contact_info = scanner.extract_contact_info(resume_text)
-        similarity_score = scanner.calculate_similarity(resume_text, job_description)
+        with scheduler.stage('score', g.admission.priority):
+            skills = scanner.extract_skills(resume_text)
+            contact_info = scanner.extract_contact_info(resume_text)
+            similarity_score = scanner.similarity(resume_text, job_description, data.get('engine'))
         
         return jsonify({
             'similarity_score': similarity_score,
@@ -1236,10 +6006,182 @@ def api_analyze():
             'contact_info': contact_info
         })
         
+    except Overloaded:
+        raise
     except Exception as e:
         return jsonify({'error': str(e)})
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Scheduler state of this process: admission counters, stage limits and latencies"""
+    return jsonify(dict(scheduler.metrics(), extraction_sandbox=dict(extraction_sandbox.counters),
+                        cache_snapshot=cache_snapshot.status, pid=os.getpid()))
+
+def unique_rss_kb(pid):
+    """Unique set size of a process in kB (pages not shared with any other process)"""
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as fh:
+            return sum(
+                int(line.split()[1]) for line in fh
+                if line.startswith(('Private_Clean:', 'Private_Dirty:'))
+            )
+    except OSError:
+        return None
+
+
+def _prefork_worker(sock, host, port, max_requests, preload, slot=0):
+    """Serve requests on the inherited listening socket until told to stop or recycled"""
+    import signal
+    from werkzeug.serving import make_server
+    
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.set())
+    signal.signal(signal.SIGHUP, signal.SIG_DFL)
+    
+    if not preload:
+        warm_up()
+    # Each worker slot keeps its own snapshot, picked up by its replacement
+    if cache_snapshot.path:
+        cache_snapshot.path = f'{cache_snapshot.path}.{slot}'
+    cache_snapshot.start()
+    
+    handled = [0]
+    def counting_app(environ, start_response):
+        handled[0] += 1
+        return app(environ, start_response)
+    
+    server = make_server(host, port, counting_app, fd=sock.fileno())
+    # Workers race to accept on the shared socket: the losers must not block in accept()
+    server.socket.setblocking(False)
+    def get_request():
+        connection, address = server.socket.accept()
+        connection.setblocking(True)
+        return connection, address
+    server.get_request = get_request
+    server.timeout = 1.0
+    
+    while not stopping.is_set() and not (max_requests and handled[0] >= max_requests):
+        server.handle_request()
+    cache_snapshot.stop()
+
+
+def serve_prefork(host='0.0.0.0', port=5000, workers=4, max_requests=0, preload=True):
+    """Serve the app from several forked worker processes sharing one listening socket
+    
+    With preload the parent loads heavy dependencies and models once before
+    forking, so workers share those pages copy-on-write instead of each holding
+    a private copy. Workers exit after max_requests requests (0 disables this)
+    and are replaced; SIGHUP gracefully recycles all workers, SIGTERM/SIGINT
+    stop the server after in-flight requests finish. Requires a POSIX system.
+    Scan results are shared between workers through SCAN_RESULT_PATH, or a
+    file in a private temporary directory removed when the server stops.
+    """
+    import gc
+    import signal
+    import socket
+    
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(128)
+    
+    shared_directory = None
+    if scan_results.path is None:
+        shared_directory = tempfile.mkdtemp(prefix='resume_scanner_')
+        for cache in (scan_results, resume_texts):
+            cache.share(os.path.join(shared_directory, 'scan_results.db'))
+    
+    if preload:
+        warm_up()
+        # Keep long-lived objects out of future GC passes so collecting in a
+        # worker does not touch (and un-share) the parent's pages
+        gc.collect()
+        gc.freeze()
+    
+    children = {}
+    stopping = False
+    
+    def spawn(slot):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _prefork_worker(sock, host, port, max_requests, preload, slot)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = slot
+    
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            os.kill(pid, signal.SIGTERM)
+    
+    def recycle(signum, frame):
+        for pid in list(children):
+            os.kill(pid, signal.SIGTERM)
+    
+    for slot in range(workers):
+        spawn(slot)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGHUP, recycle)
+    print(f"👷 Pre-fork server on {host}:{port} with {workers} workers (pid {os.getpid()}, preload={preload})")
+    
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        slot = children.pop(pid, None)
+        if not stopping and slot is not None:
+            spawn(slot)
+    sock.close()
+    if shared_directory:
+        shutil.rmtree(shared_directory, ignore_errors=True)
+
+
 if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='AI-Powered Resume Scanner')
+    parser.add_argument('--host', default=None, help='default 0.0.0.0, or 127.0.0.1 for --shard')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=0,
+                        help='number of pre-forked worker processes (0 runs the development server)')
+    parser.add_argument('--max-requests', type=int, default=0,
+                        help='recycle a worker after this many requests (0 disables recycling)')
+    parser.add_argument('--no-preload', dest='preload', action='store_false',
+                        help='load models in each worker instead of once in the parent')
+    parser.add_argument('--shard', action='store_true',
+                        help='run as a candidate pool shard on --host/--port instead of the web app')
+    parser.add_argument('--local-shards', type=int, default=0,
+                        help='start this many shard processes on the following ports and search across them')
+    parser.add_argument('--reindex-store', action='store_true',
+                        help='rebuild the candidate store with the current tokenizer and exit')
+    args = parser.parse_args()
+    
+    if args.reindex_store:
+        rebuilt, missing = candidate_store.reindex()
+        print(f"🔁 Reindexed {rebuilt} candidates; {missing} without archived text kept their old vectors")
+        raise SystemExit(1 if missing else 0)
+    
+    if args.shard:
+        if not SHARD_AUTHKEY:
+            parser.error('--shard needs SHARD_AUTHKEY set to the key its coordinators use')
+        serve_shard(args.host or '127.0.0.1', args.port)
+        raise SystemExit(0)
+    args.host = args.host or '0.0.0.0'
+    if args.local_shards:
+        import atexit
+        shard_addresses, shard_processes, shard_authkey = start_local_shards(args.local_shards, args.port + 1)
+        atexit.register(lambda: [process.terminate() for process in shard_processes])
+        shard_coordinator = ShardCoordinator(shard_addresses, authkey=shard_authkey)
+        shard_coordinator.wait_until_ready()
+    
     print("🚀 Starting AI-Powered Resume Scanner...")
     print("📊 Features:")
     print("   - PDF and DOCX resume parsing")
@@ -1247,7 +6189,19 @@ if __name__ == '__main__':
     print("   - Skill extraction and categorization")
     print("   - Contact information extraction")
     print("   - Candidate ranking and scoring")
-    print("\n🌐 Access the web interface at: http://localhost:5000")
-    print("🔗 API endpoint available at: http://localhost:5000/api/analyze")
+    print(f"\n🌐 Access the web interface at: http://localhost:{args.port}")
+    print(f"🔗 API endpoint available at: http://localhost:{args.port}/api/analyze")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    if args.workers:
+        serve_prefork(args.host, args.port, args.workers, args.max_requests, args.preload)
+    else:
+        # Load heavy dependencies in the background while the server starts accepting requests
+        threading.Thread(target=warm_up, daemon=True).start()
+        # The reloader would run this block again and start a second set of shards
+        use_reloader = not args.local_shards
+        # With the reloader only the serving child process keeps a snapshot
+        if not use_reloader or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            import atexit
+            cache_snapshot.start()
+            atexit.register(cache_snapshot.stop)
+        app.run(debug=True, host=args.host, port=args.port, use_reloader=use_reloader)
\ No newline at end of file
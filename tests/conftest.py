@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The app is a single module at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'slow: runs a benchmark; deselect with -m "not slow"')
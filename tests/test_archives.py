@@ -0,0 +1,77 @@
+import io
+import tarfile
+import zipfile
+
+import main
+
+
+def zip_archive(path, members, compression=zipfile.ZIP_STORED):
+    with zipfile.ZipFile(path, 'w', compression=compression) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return path
+
+
+def tar_archive(path, members):
+    with tarfile.open(path, 'w:gz') as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return path
+
+
+def members_of(path, **limits):
+    with open(path, 'rb') as fh:
+        return list(main.iter_archive_members(path.name, fh, **limits))
+
+
+def resumes(count, size=100):
+    return {f'resume{i}.pdf': bytes([65 + i]) * size for i in range(count)}
+
+
+def test_too_many_members_rejects_the_archive(tmp_path):
+    path = zip_archive(tmp_path / 'batch.zip', resumes(3))
+    # A zip lists its members up front, so nothing is read
+    assert members_of(path, max_members=2) == [(path.name, None, 'archive has more than 2 members')]
+    assert len(members_of(path, max_members=3)) == 3
+
+    path = tar_archive(tmp_path / 'batch.tar.gz', resumes(3))
+    # A tar is streamed: members before the limit were already read
+    found = members_of(path, max_members=2)
+    assert [name for name, _, _ in found[:2]] == [f'{path.name}/resume0.pdf', f'{path.name}/resume1.pdf']
+    assert found[2:] == [(path.name, None, 'archive has more than 2 members')]
+    assert len(members_of(path, max_members=3)) == 3
+
+
+def test_total_uncompressed_size_stops_the_archive(tmp_path):
+    for path in (zip_archive(tmp_path / 'batch.zip', resumes(3, size=600)),
+                 tar_archive(tmp_path / 'batch.tar.gz', resumes(3, size=600))):
+        first, rejected = members_of(path, max_bytes=1000)
+        assert first == (f'{path.name}/resume0.pdf', b'A' * 600, None)
+        assert rejected[:2] == (path.name, None) and rejected[2].startswith('archive exceeds')
+
+
+def test_suspicious_compression_ratio_skips_the_member(tmp_path):
+    path = zip_archive(tmp_path / 'batch.zip', {'bomb.pdf': b'0' * 500000, 'resume.pdf': b'%PDF-1.4 resume'},
+                       compression=zipfile.ZIP_DEFLATED)
+    assert members_of(path) == [
+        (f'{path.name}/bomb.pdf', None, 'suspicious compression ratio'),
+        (f'{path.name}/resume.pdf', b'%PDF-1.4 resume', None),
+    ]
+
+
+def test_unsupported_and_hidden_members(tmp_path):
+    members = {'notes.txt': b'hello', '__MACOSX/resume.pdf': b'x', '.hidden.pdf': b'x', 'resume.docx': b'docx'}
+    for path in (zip_archive(tmp_path / 'batch.zip', members), tar_archive(tmp_path / 'batch.tar.gz', members)):
+        assert members_of(path) == [
+            (f'{path.name}/notes.txt', None, 'unsupported file type'),
+            (f'{path.name}/resume.docx', b'docx', None),
+        ]
+
+
+def test_corrupt_archive_is_reported(tmp_path):
+    path = tmp_path / 'batch.zip'
+    path.write_bytes(b'not a zip file')
+    [(name, content, error)] = members_of(path)
+    assert (name, content) == ('batch.zip', None) and error.startswith('unreadable archive')
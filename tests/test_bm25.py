@@ -0,0 +1,28 @@
+import main
+
+
+def candidate(scanner, filename, text):
+    return {'filename': filename, 'resume_text': text, 'sections': scanner.segment_sections(text)}
+
+
+def test_bm25_ranks_a_skills_section_match_above_the_same_term_in_the_body():
+    scanner = main.ResumeScanner()
+    in_skills = candidate(scanner, 'skills.pdf', 'Skills\nkubernetes terraform\nSummary\ngardening cooking')
+    in_body = candidate(scanner, 'body.pdf', 'Skills\ngardening cooking\nSummary\nkubernetes terraform')
+
+    skills_score, body_score = main.BM25Engine(scanner).score([in_skills, in_body], 'kubernetes and terraform')
+    assert skills_score > body_score > 0
+
+
+def test_bm25_scores_a_store_by_query_term_coverage():
+    scanner = main.ResumeScanner()
+    engine = main.BM25Engine(scanner)
+    store = engine.build_store([
+        {'resume_text': 'kubernetes terraform python developer'},
+        {'resume_text': 'kubernetes java developer'},
+        {'resume_text': 'pastry chef'},
+    ])
+
+    scores = engine.score_store(store, 'kubernetes terraform python')
+    assert 1.0 >= scores[0] > scores[1] > scores[2] == 0.0
+    assert engine.score_store(store, 'the and of') == [0.0, 0.0, 0.0]
@@ -0,0 +1,53 @@
+import main
+
+
+def candidates(*names):
+    return [{'filename': f'{name}.pdf', 'resume_text': f'{name} python django developer with aws'} for name in names]
+
+
+def test_concurrent_insert_of_the_same_resumes_is_skipped(tmp_path, monkeypatch):
+    path = str(tmp_path / 'candidates.db')
+    scanner = main.ResumeScanner()
+    # One store per worker process on the same database
+    first = main.CandidateStore(scanner, path=path)
+    second = main.CandidateStore(scanner, path=path)
+    assert first.add_many(candidates('alice', 'bob')) == (2, 0)
+
+    # The second worker looked up the hashes just before the first one inserted them
+    lookup = second._select_in
+    def stale_lookup(sql, values, chunk=500):
+        return [] if sql.startswith('SELECT text_hash FROM') else lookup(sql, values, chunk)
+    monkeypatch.setattr(second, '_select_in', stale_lookup)
+    inserted = []
+    second.on_insert = lambda ids, filenames, counts: inserted.extend(filenames)
+
+    assert second.add_many(candidates('alice', 'bob', 'carol')) == (1, 2)
+    assert inserted == ['carol.pdf']
+    assert len(second) == 3
+
+
+def test_store_from_another_tokenizer_version_is_reindexed(tmp_path):
+    path = str(tmp_path / 'candidates.db')
+    scanner = main.ResumeScanner()
+    store = main.CandidateStore(scanner, path=path)
+    store.text_archive = main.ResumeTextArchive(path=str(tmp_path / 'resume_texts.db'))
+    resumes = [{'filename': 'a.pdf', 'resume_text': 'senior c++ and node.js developer'},
+               {'filename': 'b.pdf', 'resume_text': 'python developer'}]
+    store.add_many(resumes)
+    # As if the vectors had been built before punctuated skills became single terms
+    with store.connection:
+        store.connection.execute('UPDATE candidates SET vector_indices = ?, vector_counts = ?', (b'', b''))
+        store.connection.execute('PRAGMA user_version = 0')
+
+    reopened = main.CandidateStore(scanner, path=path)
+    reopened.text_archive = store.text_archive
+    len(reopened)
+    assert reopened.stale_version == 0
+
+    assert reopened.reindex() == (2, 0)
+    assert reopened.stale_version is None
+    assert reopened.connection.execute('PRAGMA user_version').fetchone()[0] == main.TOKENIZER_VERSION
+    ids, vectors = reopened._vectors(reopened.connection.execute(
+        'SELECT id, vector_indices, vector_counts FROM candidates ORDER BY id'))
+    expected = scanner.hashed_counts([r['resume_text'] for r in resumes])
+    assert (vectors != expected).nnz == 0
@@ -0,0 +1,48 @@
+import main
+
+
+scanner = main.ResumeScanner()
+
+
+def test_contacts_are_deduplicated_in_order_of_appearance():
+    contacts = scanner.extract_contact_info(
+        'Jane Doe\nJane.Doe@Example.com | (555) 123-4567\n'
+        'Email: jane.doe@example.com, phone 555.123.4567, other@example.com'
+    )
+    assert contacts['emails'] == ['jane.doe@example.com', 'other@example.com']
+    assert contacts['phones'] == ['+15551234567']
+
+
+def test_phones_are_normalized_to_e164():
+    assert main.normalize_phone('(555) 123-4567') == '+15551234567'
+    assert main.normalize_phone('1-555-123-4567') == '+15551234567'
+    assert main.normalize_phone('+44 20 7946 0958') == '+442079460958'
+    assert main.normalize_phone('0044 20 7946 0958') == '+442079460958'
+    assert main.normalize_phone('555-1234') is None
+
+
+def test_bare_eleven_digit_ids_are_not_phones():
+    contacts = scanner.extract_contact_info('Jane Doe\nEmployee ID 12345678901\n+1 555 123 4567')
+    assert contacts['phones'] == ['+15551234567']
+    assert main.normalize_phone('12345678901') is None
+    assert main.normalize_phone('+12345678901') == '+12345678901'
+
+
+def test_text_after_the_header_is_scanned_only_without_header_contacts():
+    filler = 'Built data pipelines and led a team of engineers. ' * 40
+    assert len(filler) > main.CONTACT_HEADER_CHARS
+
+    contacts = scanner.extract_contact_info(f'Jane Doe\n{filler}\nContact: jane@example.com')
+    assert contacts['emails'] == ['jane@example.com']
+
+    contacts = scanner.extract_contact_info(f'Jane Doe\njane@example.com\n{filler}\nReference: ref@example.com')
+    assert contacts['emails'] == ['jane@example.com']
+
+
+def test_profile_links_are_classified():
+    contacts = scanner.extract_contact_info(
+        'Jane Doe\nlinkedin.com/in/janedoe | https://www.GitHub.com/janedoe/ | www.janedoe.dev'
+    )
+    assert contacts['linkedin'] == ['https://linkedin.com/in/janedoe']
+    assert contacts['github'] == ['https://github.com/janedoe']
+    assert contacts['urls'] == ['https://janedoe.dev']
@@ -0,0 +1,19 @@
+import main
+
+
+def test_overloaded_file_is_reported_and_the_rest_extracted(monkeypatch):
+    run = main.scheduler.run
+    def refuse_busy(name, priority, func, filename, content):
+        if filename == 'busy.pdf':
+            raise main.Overloaded('extract queue timeout')
+        return run(name, priority, func, filename, content)
+    monkeypatch.setattr(main.scheduler, 'run', refuse_busy)
+    monkeypatch.setattr(main.scanner, 'text_extractor', lambda filename, content: content.decode())
+
+    sources = [(f'{name}.pdf', f'{name} python developer'.encode(), None)
+               for name in ('alice', 'busy', 'bob')]
+    candidates, failed = main.extract_files(sources)
+
+    assert [c['filename'] for c in candidates] == ['alice.pdf', 'bob.pdf']
+    assert [f['filename'] for f in failed] == ['busy.pdf']
+    assert 'server busy' in failed[0]['error']
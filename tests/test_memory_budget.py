@@ -0,0 +1,15 @@
+import argparse
+
+import pytest
+
+import benchmark
+import main
+
+
+@pytest.mark.slow
+def test_scan_pipeline_stays_within_its_memory_budget(monkeypatch):
+    # The benchmark turns the score memo off; put it back for the other tests
+    monkeypatch.setattr(main.scanner, 'score_memo', main.scanner.score_memo)
+    # The same check as `python benchmark.py memory`, over a smaller corpus
+    results = benchmark.bench_memory(argparse.Namespace(size=200, seed=42, memory_budget_kb=None))
+    assert results['failures'] == []
@@ -0,0 +1,52 @@
+from collections import Counter
+
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+import main
+
+
+JOB_DESCRIPTION = 'Senior Python developer: Django, REST APIs, PostgreSQL and AWS. Leadership a plus.'
+PAIRS = [
+    (JOB_DESCRIPTION, 'Python developer, five years of Django and Flask. Built REST APIs on AWS with PostgreSQL.'),
+    (JOB_DESCRIPTION, 'python python python django django aws leadership leadership leadership'),
+    (JOB_DESCRIPTION, 'Pastry chef specialising in laminated doughs and sourdough.'),
+    (JOB_DESCRIPTION, ''),
+    ('', ''),
+    ('the and of', 'a an the'),
+]
+PARAMS = [
+    main.ResumeScanner().vectorizer_params,
+    dict(main.ResumeScanner().vectorizer_params, max_features=5),
+    dict(main.ResumeScanner().vectorizer_params, sublinear_tf=True),
+    {'lowercase': True},
+]
+
+
+def fitted_on_pair(params, job_description, resume):
+    try:
+        matrix = TfidfVectorizer(**params).fit_transform([job_description, resume])
+    except ValueError:
+        # Empty vocabulary: nothing in common
+        return 0.0
+    return float(cosine_similarity(matrix[0], matrix[1])[0, 0])
+
+
+@pytest.mark.parametrize('params', PARAMS)
+@pytest.mark.parametrize('job_description, resume', PAIRS)
+def test_pair_similarity_matches_fitting_sklearn_on_the_pair(params, job_description, resume):
+    analyze = TfidfVectorizer(**params).build_analyzer()
+    similarity = main.pair_tfidf_similarity(
+        Counter(analyze(job_description)), Counter(analyze(resume)),
+        max_features=params.get('max_features'), sublinear_tf=params.get('sublinear_tf', False)
+    )
+    assert similarity == pytest.approx(fitted_on_pair(params, job_description, resume), abs=1e-9)
+
+
+def test_scanner_uses_the_pair_formula_with_the_same_result():
+    scanner = main.ResumeScanner()
+    scanner.score_memo = None
+    for job_description, resume in PAIRS:
+        expected = fitted_on_pair(scanner.vectorizer_params, job_description, resume)
+        assert scanner.calculate_similarity(resume, job_description) == pytest.approx(expected, abs=1e-9)
@@ -0,0 +1,52 @@
+import main
+
+
+JOB_DESCRIPTION = 'senior python developer with django, postgresql and aws'
+
+
+def resume(name, skills):
+    return {'filename': f'{name}.pdf', 'resume_text': f'{name} developer experienced with {skills}'}
+
+
+def store_with_percolator(tmp_path):
+    store = main.CandidateStore(main.ResumeScanner(), path=str(tmp_path / 'candidates.db'))
+    percolator = main.Percolator(store)
+    store.on_insert = percolator.percolate
+    return store, percolator
+
+
+def filenames(percolator, requisition_id):
+    return [c['filename'] for c in percolator.leaderboard(requisition_id)['ranked_candidates']]
+
+
+def test_new_requisition_is_ranked_against_the_stored_pool(tmp_path):
+    store, percolator = store_with_percolator(tmp_path)
+    store.add_many([resume('java', 'java spring'), resume('django', 'python django postgresql aws'),
+                    resume('flask', 'python flask'), resume('chef', 'pastry baking')])
+
+    requisition = percolator.register(JOB_DESCRIPTION, title='Backend', top_k=2)
+
+    assert requisition['candidates_scored'] == 4
+    assert filenames(percolator, requisition['requisition_id']) == ['django.pdf', 'flask.pdf']
+    # The same order as a fresh search of the store
+    assert filenames(percolator, requisition['requisition_id']) == \
+        [c['filename'] for c in store.search(JOB_DESCRIPTION, top=2)[0]]
+
+
+def test_new_resumes_update_open_leaderboards(tmp_path):
+    store, percolator = store_with_percolator(tmp_path)
+    store.add_many([resume('java', 'java spring'), resume('flask', 'python flask')])
+    backend = percolator.register(JOB_DESCRIPTION, top_k=2)['requisition_id']
+    frontend = percolator.register('react typescript frontend developer', top_k=1)['requisition_id']
+
+    store.add_many([resume('django', 'python django postgresql aws'), resume('react', 'react typescript')])
+
+    assert filenames(percolator, backend) == ['django.pdf', 'flask.pdf']
+    assert filenames(percolator, frontend) == ['react.pdf']
+    assert percolator.leaderboard(backend)['candidates_scored'] == 4
+
+    # A closed requisition no longer has a leaderboard or takes new resumes
+    assert percolator.close(frontend)
+    store.add_many([resume('vue', 'vue typescript')])
+    assert percolator.leaderboard(frontend) is None
+    assert percolator.leaderboard(backend)['candidates_scored'] == 5
@@ -0,0 +1,44 @@
+import main
+
+
+JOB_DESCRIPTION = ('Backend engineer: Python, Django, PostgreSQL, Docker, Kubernetes and AWS. '
+                   'You will build REST APIs and data pipelines.')
+SKILLS = ['python', 'django', 'postgresql', 'docker', 'kubernetes', 'aws']
+
+
+def candidate(scanner, filename, text):
+    return {'filename': filename, 'resume_text': text, 'sections': scanner.segment_sections(text)}
+
+
+def pool(scanner):
+    # Candidate i lists the first i skills of the job description, so relevance grows with i
+    candidates = [
+        candidate(scanner, f'{i}.pdf', f'Name {i}\nSkills\n{" ".join(SKILLS[:i]) or "excel"}\n'
+                                       f'Experience\nBuilt REST APIs and data pipelines at company {i}.')
+        for i in range(len(SKILLS) + 1)
+    ]
+    candidates.append(candidate(scanner, 'chef.pdf', 'Name\nSkills\npastry baking\nExperience\nHead chef.'))
+    return candidates
+
+
+def test_cascade_drops_irrelevant_candidates_and_cuts_to_top_n():
+    scanner = main.ResumeScanner()
+    scanner.score_memo = None
+    stats = {}
+    ranked = scanner.rank_candidates(pool(scanner), JOB_DESCRIPTION, cascade=True, top_n=3,
+                                     min_prefilter_score=0.15, stats=stats)
+
+    assert len(ranked) == 3
+    assert 'chef.pdf' not in [c['filename'] for c in ranked]
+    assert stats['input_candidates'] == len(SKILLS) + 2
+    assert stats['stage1_dropped_below_threshold'] == 2      # the chef, and the candidate sharing only a few terms
+    assert stats['stage1_dropped_beyond_top_n'] == len(SKILLS) + 2 - 2 - 3
+
+
+def test_prefilter_keeps_the_true_top_k():
+    scanner = main.ResumeScanner()
+    scanner.score_memo = None
+    exact = scanner.rank_candidates(pool(scanner), JOB_DESCRIPTION)
+    kept, _, _ = scanner.prefilter_candidates(pool(scanner), JOB_DESCRIPTION, top_n=3)
+
+    assert {c['filename'] for c in kept} == {c['filename'] for c in exact[:3]} == {'6.pdf', '5.pdf', '4.pdf'}
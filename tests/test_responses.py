@@ -0,0 +1,38 @@
+import json
+
+import main
+
+
+def stored_scan(size):
+    candidates = [{'rank': rank, 'filename': f'{rank}.pdf', 'similarity_score': 0.5}
+                  for rank in range(1, size + 1)]
+    return {'scan_id': 'scan', 'ranked_candidates': candidates, 'average_match': 50.0,
+            'duplicates_collapsed': 0, 'ranking_stats': {}}
+
+
+def test_largest_scan_page_is_streamed():
+    main.scan_results.put('scan', stored_scan(main.SCAN_MAX_PAGE_SIZE))
+    client = main.app.test_client()
+
+    # Streamed responses are chunked, so they carry no Content-Length
+    response = client.get(f'/scan/scan?top={main.SCAN_MAX_PAGE_SIZE}')
+    assert 'Content-Length' not in response.headers
+    assert len(json.loads(response.get_data())['ranked_candidates']) == main.SCAN_MAX_PAGE_SIZE
+
+    response = client.get('/scan/scan')
+    assert 'Content-Length' in response.headers
+    assert len(json.loads(response.get_data())['ranked_candidates']) == main.SCAN_PAGE_SIZE
+
+
+def test_shard_scores_are_rounded():
+    shard = main.ShardIndex(main.ResumeScanner())
+    added = shard.add([
+        {'filename': 'a.pdf', 'resume_text': 'python developer with django and aws experience'},
+        {'filename': 'b.pdf', 'resume_text': 'java engineer with spring and kubernetes'},
+    ])
+    shard.set_idf(1, added['df_indices'], added['df_counts'], added['n_docs'])
+
+    reply = shard.search('senior python django developer', [], 2, 1)
+    scores = [candidate['similarity_score'] for candidate in reply['ranked_candidates']]
+    assert scores[0] > 0
+    assert scores == [round(score, main.SCORE_DECIMALS) for score in scores]
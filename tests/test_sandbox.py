@@ -0,0 +1,80 @@
+import random
+import resource
+import time
+
+import pytest
+
+import benchmark
+import main
+
+
+WALL_SECONDS = 5
+MEMORY_MB = 256
+# Documents that must be rejected with ExtractionFailed, not parsed or returned as empty
+MALFORMED = [
+    'random bytes (pdf)', 'random bytes (docx)', 'truncated pdf', 'truncated docx',
+    'flate stream bomb', 'operator storm', 'docx xml bomb', 'deeply nested pdf',
+    'deeply nested docx', 'oversized file',
+]
+
+
+@pytest.fixture(scope='module')
+def sandboxed_scanner():
+    sandbox = main.ExtractionSandbox(workers=2, wall_seconds=WALL_SECONDS, cpu_seconds=3, memory_mb=MEMORY_MB)
+    scanner = main.ResumeScanner()
+    scanner.text_extractor = sandbox.extract
+    yield scanner
+    sandbox.close()
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    # Bombs inflate to more than the sandbox's memory limit
+    return {name: (filename, data) for name, filename, data
+            in benchmark.hostile_corpus(random.Random(0), bomb_mb=MEMORY_MB + 64)}
+
+
+def test_corpus_covers_every_malformed_kind(corpus):
+    assert set(MALFORMED) <= set(corpus)
+
+
+@pytest.mark.parametrize('name', MALFORMED)
+def test_malformed_document_is_contained(sandboxed_scanner, corpus, name):
+    filename, data = corpus[name]
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.monotonic()
+
+    with pytest.raises(main.ExtractionFailed):
+        sandboxed_scanner.extract_resume(filename, data)
+
+    assert time.monotonic() - start < WALL_SECONDS + 2
+    # The document is parsed in a worker: the server process never holds its expansion
+    assert resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - peak_kb < MEMORY_MB * 1024
+
+
+@pytest.mark.parametrize('name', ['docx xml bomb', 'flate stream bomb'])
+def test_bombs_hit_the_memory_limit(sandboxed_scanner, corpus, name):
+    filename, data = corpus[name]
+    with pytest.raises(main.ExtractionFailed, match='memory limit'):
+        sandboxed_scanner.extract_resume(filename, data)
+
+
+def test_blank_pages_return_no_text_within_limits(sandboxed_scanner, corpus):
+    filename, data = corpus['5000 blank pages']
+    start = time.monotonic()
+    assert sandboxed_scanner.extract_resume(filename, data) is None
+    assert time.monotonic() - start < WALL_SECONDS + 2
+
+
+def test_valid_documents_still_extract_after_hostile_ones(sandboxed_scanner, corpus):
+    for name in MALFORMED:
+        with pytest.raises(main.ExtractionFailed):
+            sandboxed_scanner.extract_resume(*corpus[name])
+    rng = random.Random(1)
+    for i in range(5):
+        text = benchmark.synthetic_resume(rng)
+        extracted = sandboxed_scanner.extract_resume(f'valid{i}.docx', benchmark._docx_bytes(text))
+        assert extracted is not None
+        assert extracted['text'].split()[:5] == text.split()[:5]
+    valid_pdf = benchmark._pdf_with_stream(b'BT /F1 12 Tf 72 720 Td (Python developer) Tj ET', deflated=False)
+    assert 'Python developer' in sandboxed_scanner.extract_resume('valid.pdf', valid_pdf)['text']
@@ -0,0 +1,25 @@
+import main
+
+
+def test_shared_cache_entries_are_visible_to_other_processes(tmp_path):
+    path = str(tmp_path / 'scan_results.db')
+    # One cache per worker process, sharing the same file
+    writer = main.SharedLRUCache(2, 'scan_results')
+    reader = main.SharedLRUCache(2, 'scan_results')
+    writer.share(path)
+    reader.share(path)
+
+    writer.put('a', {'ranked_candidates': [{'rank': 1, 'similarity_score': 0.5}]})
+    writer.put_many({'b': {'ranked_candidates': []}, 'c': {'ranked_candidates': []}})
+
+    assert reader.get('c') == {'ranked_candidates': []}
+    # Only the most recently written max_entries rows are kept
+    assert reader.get('a') is None
+    assert len(reader) == 1
+
+
+def test_unshared_cache_stays_in_process():
+    cache = main.SharedLRUCache(4, 'resume_texts')
+    cache.put('hash', 'text')
+    assert cache.get('hash') == 'text'
+    assert cache.get('other', 'missing') == 'missing'
@@ -0,0 +1,30 @@
+import main
+
+
+def test_new_version_of_one_kind_keeps_other_kinds():
+    memo = main.ScoreMemo(max_entries=100, path='')
+    memo.version('cosine', 'v1')
+    memo.version('skills', 's1')
+    memo.put_many('cosine', 'v1', {'a': 0.5})
+    memo.put_many('skills', 's1', {'a': {'programming': ['python']}})
+
+    memo.version('cosine', 'v2')
+
+    assert memo.get_many('cosine', 'v1', ['a']) == {}
+    assert memo.get_many('skills', 's1', ['a']) == {'a': {'programming': ['python']}}
+
+
+def test_new_version_retires_rows_on_disk(tmp_path):
+    path = str(tmp_path / 'memo.db')
+    memo = main.ScoreMemo(max_entries=100, path=path)
+    memo.version('cosine', 'v1')
+    memo.version('skills', 's1')
+    memo.put_many('cosine', 'v1', {'a': 0.5})
+    memo.put_many('skills', 's1', {'a': 1})
+
+    restarted = main.ScoreMemo(max_entries=100, path=path)
+    restarted.version('cosine', 'v2')
+    restarted.version('skills', 's1')
+
+    assert restarted.get_many('cosine', 'v1', ['a']) == {}
+    assert restarted.get_many('skills', 's1', ['a']) == {'a': 1}
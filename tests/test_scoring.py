@@ -0,0 +1,34 @@
+import random
+
+import main
+
+
+WORDS = ('python django flask react aws docker kubernetes sql postgresql leadership '
+         'engineer developer built designed led scalable systems data pipelines services').split()
+
+
+def resumes(count, seed=0):
+    rng = random.Random(seed)
+    return [' '.join(rng.choice(WORDS) for _ in range(200)) for _ in range(count)]
+
+
+def test_hashing_engine_rescans_give_identical_scores():
+    scanner = main.ResumeScanner(feature_engine='hashing')
+    scanner.score_memo = None
+    texts = resumes(20)
+    job_description = 'python django developer with aws, docker and sql'
+
+    first = scanner.score_candidates(texts, job_description)
+    second = scanner.score_candidates(texts, job_description)
+
+    assert first == second
+    assert scanner.idf_table.n_docs == len(texts)
+
+
+def test_hashing_engine_counts_new_resumes_once():
+    scanner = main.ResumeScanner(feature_engine='hashing')
+    texts = resumes(10)
+    scanner.score_candidates(texts[:6], 'python developer')
+    scanner.score_candidates(texts[4:], 'python developer')
+
+    assert scanner.idf_table.n_docs == len(texts)
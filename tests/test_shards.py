@@ -0,0 +1,100 @@
+import socket
+import threading
+import time
+from multiprocessing.connection import Listener
+
+import pytest
+
+import main
+
+
+KEY = b'test-key'
+JOB_DESCRIPTION = 'senior python developer with django, postgresql and aws'
+
+
+def resumes(count):
+    topics = ['python django postgresql aws', 'java spring kubernetes', 'python flask docker', 'react typescript']
+    return [{'filename': f'{i}.pdf', 'resume_text': f'candidate {i} {topics[i % len(topics)]} developer'}
+            for i in range(count)]
+
+
+def start_shard(handle=main.serve_shard_connection):
+    """A shard served from this process on an ephemeral port; returns its address"""
+    listener = Listener(('127.0.0.1', 0), authkey=KEY)
+    index = main.ShardIndex(main.scanner)
+    def accept():
+        while True:
+            try:
+                conn = listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=handle, args=(conn, index), daemon=True).start()
+    threading.Thread(target=accept, daemon=True).start()
+    host, port = listener.address
+    return f'{host}:{port}'
+
+
+def hung(conn, index):
+    # Reads requests and never answers
+    while True:
+        try:
+            conn.recv()
+        except (EOFError, OSError):
+            return
+
+
+def unused_address():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return f'127.0.0.1:{sock.getsockname()[1]}'
+
+
+def test_shards_and_coordinators_need_a_key():
+    with pytest.raises(ValueError):
+        main.ShardCoordinator(['127.0.0.1:7001'], authkey=b'')
+    with pytest.raises(ValueError):
+        main.serve_shard('127.0.0.1', 0, authkey=b'')
+
+
+def test_search_merges_every_shard_like_one_index():
+    coordinator = main.ShardCoordinator([start_shard(), start_shard()], authkey=KEY)
+    candidates = resumes(12)
+    assert coordinator.add_many(candidates) == (12, 0, {})
+
+    single = main.ShardIndex(main.scanner)
+    reply = single.add(candidates)
+    single.set_idf(1, reply['df_indices'], reply['df_counts'], reply['n_docs'])
+    expected = single.search(JOB_DESCRIPTION, (), 5, 1)['ranked_candidates']
+
+    ranked, matching, status = coordinator.search(JOB_DESCRIPTION, top=5)
+    assert [(c['filename'], c['similarity_score']) for c in ranked] == \
+        [(c['filename'], c['similarity_score']) for c in expected]
+    assert [c['rank'] for c in ranked] == [1, 2, 3, 4, 5]
+    assert matching == 12
+    assert status == {'total': 2, 'responded': 2, 'failed': {}, 'partial': False}
+
+
+def test_search_with_a_shard_down_returns_partial_results():
+    coordinator = main.ShardCoordinator([start_shard(), unused_address()], authkey=KEY)
+    added, _, failed = coordinator.add_many(resumes(12))
+    assert set(failed) == {1} and 0 < added < 12
+
+    ranked, matching, status = coordinator.search(JOB_DESCRIPTION, top=20)
+    assert matching == added and len(ranked) == added
+    assert all(c['candidate_id'].startswith('0:') for c in ranked)
+    assert status['partial'] and status['responded'] == 1
+    assert list(status['failed']) == ['1'] and 'ConnectionRefusedError' in status['failed']['1']
+
+
+def test_search_with_a_hung_shard_returns_once_the_timeout_expires():
+    coordinator = main.ShardCoordinator([start_shard(), start_shard(hung)], authkey=KEY,
+                                        search_timeout=0.3, ingest_timeout=0.3)
+    added, _, failed = coordinator.add_many(resumes(12))
+    assert set(failed) == {1}
+
+    start = time.monotonic()
+    ranked, matching, status = coordinator.search(JOB_DESCRIPTION, top=20)
+    assert time.monotonic() - start < 2.0
+    assert matching == added and len(ranked) == added
+    assert status['partial'] and status['responded'] == 1
+    assert 'TimeoutError' in status['failed']['1']
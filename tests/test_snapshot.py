@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+import main
+
+
+def test_cached_values_survive_the_snapshot_encoding():
+    value = {
+        ('cosine', 'v1', 'abc'): 0.25,
+        'counts': sparse.csr_matrix(np.array([[0, 2, 0], [1, 0, 3]], dtype=np.int64)),
+        'term_counts': Counter({'python': 2}),
+        'key_terms': {'python', 'django'},
+        'features': np.arange(4, dtype=np.int32),
+        '__init__': [1, (2, 'x')],
+    }
+    decoded = main.snapshot_decode(json.loads(main.encode_json(main.snapshot_encode(value))))
+
+    assert decoded[('cosine', 'v1', 'abc')] == 0.25
+    assert (decoded['counts'] != value['counts']).nnz == 0
+    assert decoded['term_counts'] == Counter({'python': 2}) and isinstance(decoded['term_counts'], Counter)
+    assert decoded['key_terms'] == {'python', 'django'}
+    assert decoded['features'].dtype == np.int32 and decoded['features'].tolist() == [0, 1, 2, 3]
+    assert decoded['__init__'] == [1, (2, 'x')]
+
+
+def test_snapshot_round_trip_and_refuses_files_others_can_write(tmp_path):
+    scanner = main.ResumeScanner()
+    cache = main.LRUCache(10)
+    cache.put((1, 'jd'), {'score': 0.5, 'terms': [('python', 0.1)]})
+    path = str(tmp_path / 'snapshots' / 'cache_snapshot.json')
+    main.CacheSnapshot(scanner, {'explanations': cache}, path=path).save()
+    assert os.stat(path).st_mode & 0o077 == 0
+    assert os.stat(os.path.dirname(path)).st_mode & 0o077 == 0
+
+    restored = main.LRUCache(10)
+    assert main.CacheSnapshot(scanner, {'explanations': restored}, path=path).restore() >= 1
+    assert restored.get((1, 'jd')) == {'score': 0.5, 'terms': [('python', 0.1)]}
+
+    os.chmod(path, 0o666)
+    untouched = main.LRUCache(10)
+    assert main.CacheSnapshot(scanner, {'explanations': untouched}, path=path).restore() == 0
+    assert untouched.get((1, 'jd')) is None
+
+
+def hashing_scanner():
+    scanner = main.ResumeScanner(feature_engine='hashing')
+    scanner.score_memo = None
+    return scanner
+
+
+RESUMES = [f'resume {i}: python django developer with aws and docker, led team {i}' for i in range(5)]
+
+
+def test_restore_does_not_count_a_resume_scanned_since_startup_twice(tmp_path):
+    path = str(tmp_path / 'cache_snapshot.json')
+    before = hashing_scanner()
+    before.score_candidates(RESUMES, 'python developer')
+    main.CacheSnapshot(before, {}, path=path).save()
+
+    scanner = hashing_scanner()
+    scanner.score_candidates(RESUMES[:1], 'python developer')
+    n_docs, idf = scanner.idf_table.n_docs, scanner.idf_table.idf()
+    main.CacheSnapshot(scanner, {}, path=path).restore()
+
+    assert scanner.idf_table.n_docs == n_docs
+    assert np.array_equal(scanner.idf_table.idf(), idf)
+
+
+def test_scans_during_a_background_restore_wait_for_it(tmp_path, monkeypatch):
+    path = str(tmp_path / 'cache_snapshot.json')
+    before = hashing_scanner()
+    before.score_candidates(RESUMES, 'python developer')
+    main.CacheSnapshot(before, {}, path=path).save()
+
+    scanner = hashing_scanner()
+    snapshot = main.CacheSnapshot(scanner, {}, path=path, interval=3600)
+    release = threading.Event()
+    restore = snapshot.restore
+    monkeypatch.setattr(snapshot, 'restore', lambda: release.wait() and restore())
+    snapshot.start()
+    scan = threading.Thread(target=scanner.score_candidates, args=(RESUMES[:1], 'python developer'))
+    scan.start()
+    scan.join(0.2)
+    assert scan.is_alive() and scanner.idf_table.n_docs == 0
+
+    release.set()
+    scan.join(5)
+    assert scanner.idf_table.n_docs == len(RESUMES)
+    assert np.array_equal(scanner.idf_table.idf(), before.idf_table.idf())
+    snapshot._stopping.set()
@@ -0,0 +1,37 @@
+import main
+
+
+def resume(number):
+    return (f'Candidate {number}. Senior software engineer with experience in python, django, '
+            f'postgresql and aws. Led a team of {number % 7 + 2} engineers building data pipelines.')
+
+
+def ingest_one_at_a_time(archive, numbers):
+    for number in numbers:
+        text = resume(number)
+        archive.put_many({main.content_hash(text): text})
+
+
+def test_incremental_ingest_trains_on_stored_records(tmp_path):
+    archive = main.ResumeTextArchive(path=str(tmp_path / 'texts.db'), codec='zlib', train_after=50)
+    trained = []
+    train = archive._train
+    archive._train = lambda texts: trained.append(len(texts)) or train(texts)
+
+    ingest_one_at_a_time(archive, range(60))
+
+    # Trained once, on the whole archive rather than the one new record
+    assert trained == [50]
+    assert archive.connection.execute('SELECT COUNT(*) FROM dictionaries').fetchone()[0] == 1
+    assert archive.get(main.content_hash(resume(3))) == resume(3)
+    assert archive.get(main.content_hash(resume(59))) == resume(59)
+
+
+def test_failed_training_is_retried_once_the_archive_doubles(tmp_path):
+    archive = main.ResumeTextArchive(path=str(tmp_path / 'texts.db'), codec='zlib', train_after=10)
+    trained = []
+    archive._train = lambda texts: trained.append(len(texts)) or 0
+
+    ingest_one_at_a_time(archive, range(45))
+
+    assert trained == [10, 20, 40]
@@ -0,0 +1,63 @@
+import io
+
+import docx
+
+import main
+
+
+def docx_bytes(text):
+    document = docx.Document()
+    for line in text.split('\n'):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def test_batch_is_shared_through_the_staging_directory(tmp_path):
+    # One manager per worker process, all on the same staging directory
+    creating, receiving, collecting = (main.UploadManager(root=str(tmp_path)) for _ in range(3))
+    batch_id = creating.create_batch()
+    data = docx_bytes('Jane Doe\nExperience\nPython developer building Django services')
+
+    half = len(data) // 2
+    batch = receiving.get(batch_id)
+    assert receiving.write_chunk(batch, 'a', 'jane.docx', 0, len(data), data[:half]) == (True, half)
+    # A repeated chunk is rejected with the offset to resume from
+    assert collecting.write_chunk(collecting.get(batch_id), 'a', 'jane.docx', 0, len(data), data[:half]) == (False, half)
+    assert creating.write_chunk(creating.get(batch_id), 'a', 'jane.docx', half, len(data), data[half:]) == (True, len(data))
+    assert collecting.get(batch_id).status()['a']['complete']
+
+    candidates, failed = collecting.collect(batch_id)
+
+    assert failed == []
+    assert [c['filename'] for c in candidates] == ['jane.docx']
+    assert 'Django' in candidates[0]['resume_text']
+    assert creating.get(batch_id) is None
+
+
+def test_incomplete_and_unreadable_files_are_reported(tmp_path):
+    uploads = main.UploadManager(root=str(tmp_path))
+    batch_id = uploads.create_batch()
+    batch = uploads.get(batch_id)
+    uploads.write_chunk(batch, 'partial', 'partial.docx', 0, 100, b'x' * 40)
+    uploads.write_chunk(batch, 'broken', 'broken.docx', 0, 10, b'not a docx')
+
+    candidates, failed = uploads.collect(batch_id)
+
+    assert candidates == []
+    assert sorted(f['filename'] for f in failed) == ['broken.docx', 'partial.docx']
+    assert 'upload incomplete' in next(f['error'] for f in failed if f['filename'] == 'partial.docx')
+
+
+def test_batch_can_be_collected_once(tmp_path):
+    uploads = main.UploadManager(root=str(tmp_path))
+    batch_id = uploads.create_batch()
+    uploads.collect(batch_id)
+    try:
+        uploads.collect(batch_id)
+    except KeyError:
+        pass
+    else:
+        raise AssertionError('collected twice')
+    assert uploads.get('../etc') is None